@@ -0,0 +1,42 @@
+"""
+Compute one year of occurrences for many cron triggers.
+
+Run with ``python -m benchmarks.bench_cron`` from the repository root.
+"""
+import time as sys_time
+import zoneinfo
+from desktop_buddy import cron, time, trigger
+
+START = 1_767_225_600_000
+END = START + 365 * time.MILLIS_PER_DAY
+RULES = [
+    ['0 9 * * mon-fri', '*/15 13-16 * * mon-fri', '0 17 * * mon-fri'],
+    ['*/5 * * * *'],
+    ['0 */2 * * sat,sun'],
+    ['30 8 1,15 * *'],
+    ['0 12 * jan-mar mon'],
+    ['@hourly'],
+]
+TRIGGER_COUNT = 120
+
+
+def main():
+    timezone = zoneinfo.ZoneInfo('Europe/Berlin')
+    triggers = [
+        trigger.CronTrigger([cron.CronExpression(e) for e in RULES[index % len(RULES)]], timezone)
+        for index in range(TRIGGER_COUNT)
+    ]
+    occurrences = 0
+    started = sys_time.perf_counter()
+    for cron_trigger in triggers:
+        active = cron_trigger.activate(START)
+        while active.activation < END:
+            occurrences += 1
+            active = active.activate(active.activation + 1)
+    seconds = sys_time.perf_counter() - started
+    print(f'{TRIGGER_COUNT} cron triggers over one year: {occurrences:,} occurrences in {seconds:.2f} s, '
+          f'{occurrences / seconds:,.0f} per second')
+
+
+if __name__ == '__main__':
+    main()
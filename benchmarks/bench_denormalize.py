@@ -0,0 +1,31 @@
+"""
+Load a machine generated trigger config with many entries.
+
+Run with ``python -m benchmarks.bench_denormalize`` from the repository root.
+"""
+import timeit
+from desktop_buddy import trigger
+
+TRIGGER_COUNT = 20000
+
+
+def _generate_config():
+    config = []
+    for index in range(TRIGGER_COUNT):
+        if index % 3 == 0:
+            config.append({'every': f'{index % 50 + 1} minutes', 'slack': '5s'})
+        elif index % 3 == 1:
+            config.append({'on': [f'{hour:02}:{index % 60:02}' for hour in range(0, 24, 4)]})
+        else:
+            config.append({'cron': f'{index % 60} 9-17 * * mon-fri'})
+    return config
+
+
+def main():
+    config = _generate_config()
+    seconds = min(timeit.repeat(lambda: trigger.load_trigger(config), number=1, repeat=3))
+    print(f'{TRIGGER_COUNT} triggers loaded in {seconds * 1000:.0f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+Measure the import time of every module of the desktop buddy with ``python -X importtime``.
+
+Every module is imported in a fresh interpreter, the median cumulative time of several runs is compared against its
+budget. Run with ``python -m benchmarks.bench_import`` from the repository root, the exit status is 1 when a module
+exceeds its budget. ``--scale`` multiplies all budgets for slow machines.
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+RUNS = 5
+# cumulative import time budgets in milliseconds, about twice the typical time and far below loading wx, PIL or ruamel
+IMPORT_BUDGET_MS = {
+    'desktop_buddy.time': 45,
+    'desktop_buddy.cron': 50,
+    'desktop_buddy.clock': 45,
+    'desktop_buddy.denormalize': 10,
+    'desktop_buddy.trigger': 55,
+    'desktop_buddy.scheduler': 55,
+    'desktop_buddy.config': 40,
+    'desktop_buddy.cache': 50,
+    'desktop_buddy.simulate': 60,
+    'desktop_buddy.snapshot': 80,
+    'desktop_buddy.__main__': 120,
+}
+
+
+def import_time_ms(module: str) -> float:
+    """
+    :param module: name of the module to import
+    :return: cumulative import time of the module in milliseconds as reported by ``-X importtime``
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            check=True, capture_output=True, text=True)
+    # lines look like "import time:       self [us] |  cumulative | imported package"
+    for line in result.stderr.splitlines():
+        _, _, fields = line.partition('import time:')
+        parts = [part.strip() for part in fields.split('|')]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1]) / 1000
+    raise ValueError('Module was not imported: ' + module)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scale', type=float, default=1.0, help='factor applied to all budgets')
+    arguments = parser.parse_args(argv)
+    exceeded = 0
+    for module, budget in IMPORT_BUDGET_MS.items():
+        budget *= arguments.scale
+        milliseconds = statistics.median(import_time_ms(module) for _ in range(RUNS))
+        status = 'ok' if milliseconds <= budget else 'OVER BUDGET'
+        exceeded += milliseconds > budget
+        print(f'{module:28} {milliseconds:7.1f} ms  budget {budget:6.1f} ms  {status}')
+    return 1 if exceeded else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,53 @@
+"""
+Compare the NumPy region mask pipeline with the former per value PIL implementation on a 4K asset.
+
+Run with ``python -m benchmarks.bench_mask`` from the repository root.
+"""
+import timeit
+import numpy
+from PIL import Image
+from desktop_buddy import mask, region
+
+WIDTH = 3840
+HEIGHT = 2160
+REPEAT = 5
+
+
+def _create_alpha_channel():
+    # a large antialiased disc with sparse semi transparent noise around it
+    y, x = numpy.ogrid[:HEIGHT, :WIDTH]
+    distance = numpy.hypot(x - WIDTH / 2, y - HEIGHT / 2)
+    alpha = numpy.clip((HEIGHT * 0.45 - distance) * 64, 0, 255)
+    noise = numpy.random.default_rng(0).random((HEIGHT, WIDTH)) < 0.001
+    alpha[noise] = numpy.maximum(alpha[noise], 24)
+    return alpha.astype(numpy.uint8)
+
+
+def legacy_mask(alpha_channel: Image.Image) -> numpy.ndarray:
+    region_mask = alpha_channel.point(lambda a: a != 0 and 255)
+    return numpy.asarray(region_mask.convert("1"))
+
+
+def _measure(name, function):
+    seconds = min(timeit.repeat(function, number=1, repeat=REPEAT))
+    print(f'{name:<40} {seconds * 1000:9.1f} ms')
+
+
+def main():
+    alpha = _create_alpha_channel()
+    alpha_image = Image.fromarray(alpha, "L")
+    print(f'alpha channel {WIDTH}x{HEIGHT}, best of {REPEAT}')
+    _measure('legacy PIL point', lambda: legacy_mask(alpha_image))
+    _measure('numpy threshold', lambda: mask.create_mask(alpha))
+    options = mask.MaskOptions(threshold=128, erode=1, dilate=1)
+    _measure('numpy threshold 128, erode 1, dilate 1', lambda: mask.create_mask(alpha, options))
+
+    region_options = region.RegionOptions(tolerance=1, min_area=4)
+    for name, region_mask in (('legacy', legacy_mask(alpha_image)), ('cleaned', mask.create_mask(alpha, options))):
+        rectangles = region.mask_rectangles(region_mask)
+        simplified = region.simplify(rectangles, region_options)
+        print(f'{name} mask region rectangles: {len(rectangles)}, simplified: {len(simplified)}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,36 @@
+"""
+Measure how fast the scheduler re-arms triggers, without wx or a display.
+
+Run with ``python -m benchmarks.bench_trigger`` from the repository root.
+"""
+import timeit
+from desktop_buddy import scheduler, time, trigger
+
+TRIGGER_COUNT = 2000
+START = 1_780_000_000_000
+
+
+def _run_day():
+    trigger_scheduler = scheduler.Scheduler()
+    triggers = [trigger.TimeInstantTrigger(index * 17_280 % time.MILLIS_PER_DAY) for index in range(TRIGGER_COUNT)]
+    triggers += [trigger.IntervalTrigger(900_000 + index * 1000) for index in range(TRIGGER_COUNT)]
+    triggers += [trigger.TimeInstantListTrigger(range(offset, time.MILLIS_PER_DAY, 172_800)) for offset in range(10)]
+    trigger_scheduler.add_all(triggers, START)
+    end = START + time.MILLIS_PER_DAY
+    firings = 0
+    while True:
+        wakeup = trigger_scheduler.next_wakeup()
+        if wakeup > end:
+            return firings
+        firings += len(trigger_scheduler.pop_due(wakeup))
+
+
+def main():
+    firings = _run_day()
+    seconds = min(timeit.repeat(_run_day, number=1, repeat=3))
+    print(f'{2 * TRIGGER_COUNT + 10} triggers over one day: {firings} firings in {seconds:.2f} s, '
+          f'{firings / seconds:,.0f} firings per second')
+
+
+if __name__ == '__main__':
+    main()
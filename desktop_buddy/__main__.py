@@ -1,75 +1,55 @@
-import pathlib
-import wx
-from ruamel.yaml import YAML
-from . import trigger, asset
+import argparse
+import sys
+from . import config, simulate, snapshot
 
 
-class DeskyFrame(wx.Frame):
+def _report_error(event):
+    # errors of loading and reloading in the background keep the buddy running, they are only reported
+    if event.error is not None:
+        # the exceptions of this package describe themselves with get_message
+        message = event.error.get_message() if hasattr(event.error, 'get_message') else None
+        print('desktop_buddy:', message or event.error, file=sys.stderr)
+    event.Skip()
 
-    def __init__(self, config):
-        window_config = config['window']
-        title = window_config['title']
-        self.background_color = wx.Colour(window_config['background'])
 
-        self.assets = asset.load_assets(config.get('assets', []))
-
-        full_region = wx.Region()
-        for single_asset in self.assets.values():
-            full_region.Union(single_asset.region)
-
-        box = full_region.GetBox()
-        for single_asset in self.assets.values():
-            single_asset.move(-box.GetX(), -box.GetY())
-        size = box.GetSize()
-
-        style = wx.FRAME_NO_TASKBAR | wx.STAY_ON_TOP | wx.FRAME_SHAPED | wx.BORDER_NONE
-        super(DeskyFrame, self).__init__(None, title=title, size=size, style=style)
-        self.active_region = wx.Region()
-        self.calculate_active_region()
-
-        self.trigger = trigger.load_trigger(config.get('trigger', []))
-        self.trigger = self.trigger.activate()
-
-        self.timer = wx.Timer(self, 1)
-        self.timer.StartOnce(self.trigger.millis_until_activation())
-
-        self.Bind(wx.EVT_PAINT, self.on_paint)
-        self.Bind(wx.EVT_TIMER, self.on_timer)
-
-    def on_paint(self, event: wx.PaintEvent):
-        dc = wx.PaintDC(self)
-        dc.SetBackground(wx.Brush(self.background_color, wx.BRUSHSTYLE_SOLID))
-        dc.Clear()
-
-        gc = wx.GraphicsContext.Create(dc)
-        for a in self.assets.values():
-            a.draw_active(gc)
-
-    def on_timer(self, event: wx.TimerEvent):
-        self.assets['speech_bubble'].toggle_active()
-        self.calculate_active_region()
-        self.Refresh()
-
-        self.trigger = self.trigger.activate()
-        event.GetTimer().StartOnce(self.trigger.millis_until_activation())
-
-    def calculate_active_region(self):
-        self.active_region.Clear()
-        for single_asset in self.assets.values():
-            if single_asset.active:
-                self.active_region.Union(single_asset.region)
-        self.SetShape(self.active_region)
-
-
-if __name__ == '__main__':
-    desky_config_file = pathlib.Path('config.yaml')
-
-    yaml = YAML()
-    desky_config = yaml.load(desky_config_file)
+def run(arguments):
+    compiled, compilation = snapshot.load_or_start_compilation(arguments.config, arguments.snapshot)
 
+    # the GUI toolkit is only loaded by the command showing the buddy
+    import wx
+    from . import frame
     app = wx.App()
 
-    desky_frame = DeskyFrame(desky_config)
+    desky_frame = frame.DeskyFrame(compiled)
+    desky_frame.Bind(frame.EVT_ASSETS_LOADED, _report_error)
+    desky_frame.Bind(frame.EVT_CONFIG_RELOADED, _report_error)
 
     desky_frame.Show()
+    if compilation is not None:
+        desky_frame.load_remaining_assets(compilation, arguments.snapshot)
+    if not arguments.no_reload:
+        desky_frame.watch(arguments.config, arguments.snapshot)
     app.MainLoop()
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='desktop_buddy', description='A fully customizable desktop companion.')
+    parser.set_defaults(command=run)
+    parser.add_argument('--config', default=str(config.DEFAULT_CONFIG_FILE), help='configuration file')
+    parser.add_argument('--snapshot', help='compiled snapshot of the configuration, defaults to the cache directory')
+    parser.add_argument('--no-reload', action='store_true',
+                        help='do not apply changes of the configuration while running')
+    subparsers = parser.add_subparsers()
+    # subcommands share the configuration and snapshot options of the main parser
+    compile_parser = subparsers.add_parser('compile', help='compile the configuration into a snapshot ahead of time')
+    compile_parser.set_defaults(command=snapshot.main)
+    simulate_parser = subparsers.add_parser('simulate', help='replay the triggers over a simulated time range')
+    simulate.add_arguments(simulate_parser)
+    simulate_parser.set_defaults(command=simulate.main)
+    arguments = parser.parse_args(argv)
+    return arguments.command(arguments)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,4 +1,54 @@
-from desktop_buddy import asset
+from __future__ import annotations
+
+from . import denormalize, scheduler, time, trigger
+
+# asset changes of an action config and the active state they set, None toggles the asset
+ASSET_CHANGES = {'show': True, 'hide': False, 'toggle': None}
+
+
+class Transaction:
+    """
+    Collects the asset changes of all actions run in one tick, so they are applied at once.
+
+    Actions read and write the active state of assets through the transaction. Actions that have to run later, like
+    the inversion of an action with a duration, are deferred and scheduled once the tick is done.
+
+    :param states: active state of the assets by their id before the tick
+    """
+
+    def __init__(self, states) -> None:
+        self._states = states
+        self._changes = {}
+        # states of the changed assets before the tick, the states may be updated before the changes are read
+        self._before = {}
+        self.deferred = []
+        self.firings = []
+
+    def is_active(self, asset_id) -> bool:
+        return self._changes.get(asset_id, self._states.get(asset_id, False))
+
+    def set_active(self, asset_id, active: bool):
+        if asset_id not in self._states:
+            # removed by a reload while an inversion was pending
+            return
+        if asset_id not in self._before:
+            self._before[asset_id] = self._states[asset_id]
+        self._changes[asset_id] = active
+
+    def defer(self, action: Action, delay: int):
+        """
+        Run an action after a delay.
+
+        :param action: action to run
+        :param delay: milliseconds from the tick until the action runs
+        """
+        self.deferred.append((action, delay))
+
+    def changes(self) -> dict:
+        """
+        :return: new active state by asset id of every asset whose state differs from before the tick
+        """
+        return {asset_id: active for asset_id, active in self._changes.items() if active != self._before[asset_id]}
 
 
 class Action:
@@ -9,6 +59,12 @@ class Action:
     def is_invertible(self) -> bool:
         return False
 
+    def asset_ids(self) -> set:
+        """
+        :return: ids of the assets the action may change
+        """
+        return set()
+
 
 class InvertibleAction(Action):
 
@@ -16,6 +72,9 @@ class InvertibleAction(Action):
         raise NotImplementedError()
 
     def create_inverted_action(self, context=None) -> Action:
+        """
+        Create the action undoing this action, it has to be created before this action is activated.
+        """
         raise NotImplementedError()
 
     def is_invertible(self) -> bool:
@@ -35,7 +94,7 @@ class ActionGroupAction(InvertibleAction):
 
     def create_inverted_action(self, context=None) -> Action:
         inverted_actions = []
-        for action in self.actions:
+        for action in reversed(self.actions):
             inverted = action.create_inverted_action(context)
             inverted_actions.append(inverted)
         return ActionGroupAction(inverted_actions)
@@ -43,24 +102,202 @@ class ActionGroupAction(InvertibleAction):
     def is_invertible(self) -> bool:
         return all(action.is_invertible() for action in self.actions)
 
+    def asset_ids(self) -> set:
+        return set().union(*(action.asset_ids() for action in self.actions))
+
 
 class AssetAction(InvertibleAction):
+    """
+    Toggle an asset, the action is its own inversion.
+    """
 
-    graphics_asset: asset.GraphicAsset
+    asset_id: str
 
-    def __init__(self, graphics_asset: asset.GraphicAsset) -> None:
+    def __init__(self, asset_id: str) -> None:
         super().__init__()
-        self.graphics_asset = graphics_asset
+        self.asset_id = asset_id
 
     def activate(self, context=None):
-        self.graphics_asset.toggle_active()
+        context.set_active(self.asset_id, not context.is_active(self.asset_id))
 
     def create_inverted_action(self, context=None) -> Action:
         return self
 
+    def asset_ids(self) -> set:
+        return {self.asset_id}
+
+
+class SetAssetAction(AssetAction):
+    """
+    Show or hide an asset, the inversion restores the state the asset had before.
+    """
+
+    def __init__(self, asset_id: str, active: bool) -> None:
+        super().__init__(asset_id)
+        self.active = active
+
+    def activate(self, context=None):
+        context.set_active(self.asset_id, self.active)
+
+    def create_inverted_action(self, context=None) -> Action:
+        return SetAssetAction(self.asset_id, context.is_active(self.asset_id))
+
+
+class ConfiguredAction(InvertibleAction):
+    """
+    Action of the configuration with its priority and an optional duration.
+
+    Actions fired in the same tick run in ascending priority, so on conflicting changes the highest priority wins.
+    With a duration the inversion of the action is deferred by that many milliseconds.
+
+    :param action: action to run
+    :param priority: order among the actions of a tick
+    :param duration: milliseconds until the action is inverted, None to keep its changes
+    """
+
+    def __init__(self, action: Action, priority: int = 0, duration: int = None) -> None:
+        super().__init__()
+        self.action = action
+        self.priority = priority
+        self.duration = duration
+
+    def activate(self, context=None):
+        if self.duration is not None:
+            context.defer(ConfiguredAction(self.action.create_inverted_action(context), self.priority), self.duration)
+        self.action.activate(context)
+
+    def create_inverted_action(self, context=None) -> Action:
+        return ConfiguredAction(self.action.create_inverted_action(context), self.priority)
+
+    def is_invertible(self) -> bool:
+        return self.action.is_invertible()
+
+    def asset_ids(self) -> set:
+        return self.action.asset_ids()
+
+
+def _load_asset_action(asset_id, change) -> AssetAction:
+    if isinstance(change, bool):
+        return SetAssetAction(asset_id, change)
+    if not isinstance(change, str) or change not in ASSET_CHANGES:
+        raise denormalize.UnsupportedException(config=change, message=f'Unknown change of asset {asset_id}: {change}')
+    active = ASSET_CHANGES[change]
+    return AssetAction(asset_id) if active is None else SetAssetAction(asset_id, active)
+
+
+class ActionDenormalizer(denormalize.Denormalizer):
+
+    def denormalize(self, config):
+        if not self.supports_denormalization(config):
+            raise denormalize.UnsupportedException(config=config, message='Action without assets to change.')
+        changes = config['assets']
+        if not hasattr(changes, 'items'):
+            raise denormalize.UnsupportedException(config=config, message='Assets have to map asset ids to changes.')
+        action = ActionGroupAction([_load_asset_action(asset_id, change) for asset_id, change in changes.items()])
+        duration = None
+        if 'for' in config:
+            try:
+                duration = time.parse_time_duration(config['for'])
+            except time.TimeException as exception:
+                raise denormalize.UnsupportedException(
+                    exception, config=config, message=f'Invalid for: {config["for"]!r}. {exception.get_message()}')
+            if not action.is_invertible():
+                raise denormalize.UnsupportedException(config=config, message='Action cannot be undone in time.')
+        try:
+            priority = int(config.get('priority', 0))
+        except (TypeError, ValueError) as exception:
+            raise denormalize.UnsupportedException(exception, config=config, message='Priority has to be an integer.')
+        return ConfiguredAction(action, priority, duration)
+
+    def supports_denormalization(self, config) -> bool:
+        try:
+            return 'assets' in config
+        except TypeError:
+            return False
+
+    def discriminating_keys(self) -> tuple:
+        return 'assets',
+
+
+_action_denormalizer = denormalize.DictDenormalizer(ActionDenormalizer())
+
+
+def load_actions(config) -> dict:
+    """
+    Denormalize the actions section of the configuration.
+
+    :return: configured actions by their name
+    :raise denormalize.UnsupportedException: listing every action that cannot be loaded
+    """
+    return _action_denormalizer.denormalize(config)
+
+
+def check_actions(actions: dict, triggers, asset_ids):
+    """
+    Check that triggers only refer to defined actions and actions only change existing assets.
+
+    :param actions: configured actions by their name
+    :param triggers: time triggers with the names of their actions
+    :param asset_ids: ids of all assets
+    :raise denormalize.UnsupportedException: on the first unknown name
+    """
+    for time_trigger in triggers:
+        for name in time_trigger.actions:
+            if name not in actions:
+                raise denormalize.UnsupportedException(config=name, message='Unknown action: ' + name)
+    for name, action in actions.items():
+        unknown = action.asset_ids() - set(asset_ids)
+        if unknown:
+            raise denormalize.UnsupportedException(config=name, message=f'Action {name} changes unknown assets: '
+                                                                        + ', '.join(sorted(unknown)))
+
+
+class ActionEngine:
+    """
+    Runs the actions of the triggers fired by a scheduler.
+
+    All actions of a tick are applied to one :class:`Transaction`, the caller applies its changes at once. Deferred
+    actions are scheduled as one-shot triggers, so they follow the same clock, slack and misfire handling as all others.
+
+    :param actions: configured actions by their name
+    :param trigger_scheduler: scheduler firing the triggers
+    """
+
+    def __init__(self, actions: dict, trigger_scheduler: scheduler.Scheduler) -> None:
+        self.actions = actions
+        self.scheduler = trigger_scheduler
+
+    def add_triggers(self, triggers, now=None) -> list:
+        """
+        Schedule triggers with the actions named by them.
+
+        :return: handles of the scheduled triggers
+        """
+        all_scheduled = self.scheduler.add_all(triggers, now)
+        for scheduled in all_scheduled:
+            scheduled.actions = [self.actions[name] for name in scheduled.trigger.actions]
+        return all_scheduled
+
+    def run_due(self, states, now=None) -> Transaction:
+        """
+        Run the actions of all due triggers.
 
-def load_actions(config):
-    for action_name, action_config in config.items():
-        duration = action_config.get('for', False)
-        priority = action_config.get('priority', 0)
-        changes = action_config['assets']
+        :param states: active state of the assets by their id
+        :param now: override the current time in epoch milliseconds
+        :return: transaction holding the firings and the resulting changes
+        """
+        if now is None:
+            now = self.scheduler.clock.now_millis()
+        transaction = Transaction(states)
+        transaction.firings = self.scheduler.pop_due(now)
+        queued = []
+        for order, firing in enumerate(transaction.firings):
+            for action in firing.scheduled.actions:
+                queued.append((action.priority, order, action))
+        queued.sort(key=lambda entry: entry[:2])
+        for _, _, action in queued:
+            action.activate(transaction)
+        for action, delay in transaction.deferred:
+            scheduled = self.scheduler.add(trigger.DelayTrigger(delay), now)
+            scheduled.actions = [action]
+        return transaction
@@ -1,79 +1,835 @@
+from __future__ import annotations
+
 import collections
+import concurrent.futures
+import hashlib
+import itertools
 import math
+import multiprocessing
 import os
-import wx.svg
-from PIL import Image
+import sys
+import typing
+import numpy
+from . import cache, mask, region, time
+
+# wx and PIL take long to import and are only needed once images are rasterized or shown
+if typing.TYPE_CHECKING:
+    import wx
+    from PIL import Image
+
+IMAGE_FILE = 'image.png'
+REGION_FILE = 'region.npz'
+
+# increment whenever the generated images change for identical input
+_PREPARATION_VERSION = 6
+# memory for the pixels of unreferenced bitmaps kept for later use
+DEFAULT_BITMAP_MEMORY = 64 * 1024 * 1024
+
 
+def _rasterize_svg(image_file, scale: float = 1.0) -> numpy.ndarray:
+    import wx.svg
+    # noinspection PyArgumentList
+    svg_image = wx.svg.SVGimage.CreateFromFile(image_file)
+    width = math.ceil(svg_image.width * scale)
+    height = math.ceil(svg_image.height * scale)
+    buffer = bytearray(width * height * 4)
+    svg_image.RasterizeToBuffer(buffer, scale=scale, width=width, height=height, stride=width * 4)
+    return numpy.frombuffer(buffer, dtype=numpy.uint8).reshape((height, width, 4))
 
-def prepare_image(image_file):
-    file_without_extension, image_type = os.path.splitext(image_file)
 
-    if image_type.casefold() == ".svg":
-        # noinspection PyArgumentList
-        svg_image = wx.svg.SVGimage.CreateFromFile(image_file)
-        image_file = file_without_extension + ".png"
-        width = math.ceil(svg_image.width)
-        height = math.ceil(svg_image.height)
-        png_image = svg_image.ConvertToBitmap(width=width, height=height)
-        png_image.SaveFile(image_file, wx.BITMAP_TYPE_PNG)
+def _image_type(image_file) -> str:
+    return os.path.splitext(image_file)[1].casefold()
 
+
+def _scaled_image(image_file, scale: float) -> Image.Image:
+    from PIL import Image
+    if _image_type(image_file) == ".svg":
+        return Image.fromarray(_rasterize_svg(image_file, scale), "RGBA")
     image = Image.open(image_file)
+    if scale != 1:
+        size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+        image = image.resize(size, Image.Resampling.LANCZOS)
+    return image
+
+
+def _rasterize(image_file, digest: str, file_cache: cache.FileCache, scale: float) -> str:
+    image_type = _image_type(image_file)
+    if image_type != ".svg" and scale == 1:
+        return str(image_file)
+    key = cache.cache_key(_PREPARATION_VERSION, 'raster', digest, image_type, scale)
+
+    def write_entry(directory):
+        _scaled_image(image_file, scale).save(directory / IMAGE_FILE, "PNG")
+
+    entry = file_cache.lookup(key, IMAGE_FILE)
+    if entry is None:
+        entry = file_cache.store(key, write_entry)
+    return str(entry / IMAGE_FILE)
+
+
+def rasterize_image(image_file, file_cache: cache.FileCache, scale: float = 1.0) -> str:
+    """
+    Get a raster image of an image at a scale.
+
+    SVG images are rendered at their scaled intrinsic size, so they stay sharp at every scale, raster images are
+    resampled. Results are stored in the file cache keyed by the content of the image and the scale, raster images at
+    scale 1 are used in place.
+
+    :param image_file: path of the image
+    :param file_cache: cache to store the raster images in
+    :param scale: factor applied to the intrinsic size of the image
+    :return: path of the raster image
+    """
+    return _rasterize(image_file, cache.file_digest(image_file), file_cache, scale)
+
+
+def _create_region_mask(image: Image.Image, mask_options: mask.MaskOptions) -> numpy.ndarray:
     if "A" in image.getbands():
-        alpha_channel = image.getchannel("A")
-        region_mask = alpha_channel.point(lambda a: a != 0 and 255)
-        region_mask = region_mask.convert("1")
-    else:
-        region_mask = Image.new("1", image.size, 1)
-    region_mask_file = file_without_extension + "_region_mask.png"
-    region_mask.save(region_mask_file, "PNG")
+        alpha_channel = numpy.asarray(image.getchannel("A"))
+        return mask.create_mask(alpha_channel, mask_options)
+    return numpy.ones((image.height, image.width), dtype=bool)
+
+
+def prepare_image(image_file, file_cache: cache.FileCache, mask_options: mask.MaskOptions = mask.MaskOptions(),
+                  region_options: region.RegionOptions = region.RegionOptions(), scale: float = 1.0):
+    """
+    Rasterize an image if necessary and calculate the rectangles making up its region.
+
+    Results are stored in the file cache keyed by the content of the image, the scale and the mask and region options,
+    so unchanged images are only prepared once. See :func:`rasterize_image` for the raster image.
+
+    :param image_file: path of the image to prepare
+    :param file_cache: cache to store the prepared images in
+    :param mask_options: how to derive the region mask from the alpha channel
+    :param region_options: how to simplify the region
+    :param scale: factor applied to the intrinsic size of the image
+    :return: dictionary with the path and size of the raster image, the simplified region rectangles as returned by
+             :func:`region.simplify` and the region statistics
+    """
+    image_type = _image_type(image_file)
+    digest = cache.file_digest(image_file)
+    raster_file = _rasterize(image_file, digest, file_cache, scale)
+    key = cache.cache_key(_PREPARATION_VERSION, digest, image_type, scale, tuple(mask_options), tuple(region_options))
+
+    def write_entry(directory):
+        from PIL import Image
+        image = Image.open(raster_file)
+        region_mask = _create_region_mask(image, mask_options)
+        rectangles = region.mask_rectangles(region_mask)
+        simplified = region.simplify(rectangles, region_options)
+        numpy.savez(directory / REGION_FILE, rectangles=simplified, rectangles_before=len(rectangles), size=image.size)
+
+    entry = file_cache.lookup(key, REGION_FILE)
+    if entry is None:
+        entry = file_cache.store(key, write_entry)
+
+    with numpy.load(entry / REGION_FILE) as region_file:
+        rectangles = region_file['rectangles']
+        statistics = region.RegionStatistics(int(region_file['rectangles_before']), len(rectangles))
+        size = tuple(int(length) for length in region_file['size'])
 
     return {
-        "image": image_file,
-        "region_mask": region_mask_file,
+        "image": raster_file,
+        "size": size,
+        "region": rectangles,
+        "region_statistics": statistics,
     }
 
 
+def create_region(rectangles: numpy.ndarray) -> wx.Region:
+    """
+    Build a region as union of rectangles.
+
+    :param rectangles: integer array of shape (n, 4) holding x, y, width and height of every rectangle
+    """
+    import wx
+    created_region = wx.Region()
+    for x, y, width, height in rectangles.tolist():
+        created_region.Union(x, y, width, height)
+    return created_region
+
+
 Point = collections.namedtuple('Point', ['x', 'y'])
 
+PreparedAsset = collections.namedtuple('PreparedAsset', ['image', 'size', 'rectangles', 'region_statistics', 'offset',
+                                                         'active', 'source', 'scale'], defaults=[None, 1.0])
+PreparedAsset.__doc__ = """
+Plain data describing a graphic asset, everything is prepared except for the wx objects.
+
+image: path of the raster image
+size: width and height of the raster image, which is the size of the asset on screen
+rectangles: region rectangles relative to the image as returned by :func:`region.simplify`
+region_statistics: rectangle counts before and after simplification
+offset: where to draw the image, chosen so the top left corner of the region lies at the configured position
+active: whether the asset is shown initially
+source: path of the configured image, rasterized again for displays with more pixels per screen unit
+scale: factor applied to the intrinsic size of the source
+"""
+
+
+def load_scale(config) -> float:
+    """
+    Read the ``scale`` option of an asset.
+
+    :param config: asset config
+    :raise ValueError: when the scale is not a positive number
+    """
+    scale = float(config.get('scale', 1.0))
+    if not scale > 0 or math.isinf(scale):
+        raise ValueError('Scale of an asset must be a positive number.', scale)
+    return scale
+
+
+def prepare_asset(config, file_cache: cache.FileCache) -> PreparedAsset:
+    if 'animation' in config:
+        return prepare_animation(config, file_cache)
+    mask_options = mask.load_mask_options(config.get('mask'))
+    region_options = region.load_region_options(config.get('region'))
+    scale = load_scale(config)
+    prepared_images = prepare_image(config['file'], file_cache, mask_options, region_options, scale)
+    position_config = config.get('position', {'x': 0, 'y': 0})
+    box_x, box_y, _, _ = region.bounding_box(prepared_images['region'])
+    offset = Point(position_config.get('x', 0) - box_x, position_config.get('y', 0) - box_y)
+    return PreparedAsset(prepared_images['image'], prepared_images['size'], prepared_images['region'],
+                         prepared_images['region_statistics'], offset, config.get('active', True), config['file'],
+                         scale)
+
+
+AnimationOptions = collections.namedtuple('AnimationOptions', ['sheet', 'files', 'columns', 'rows', 'frames',
+                                                               'interval'])
+AnimationOptions.__doc__ = """
+Frames of an animated asset, taken either from a sprite sheet or from a sequence of image files.
+
+sheet: path of an image with the frames laid out in a grid of columns and rows, read row by row, or None
+files: paths of the frame images, empty with a sprite sheet
+columns and rows: grid of the sprite sheet
+frames: number of frames
+interval: milliseconds each frame is shown
+"""
+
+
+def load_animation_options(config) -> AnimationOptions:
+    """
+    Read the ``animation`` section of an asset config.
+
+    The frames come from a ``sheet`` split into ``columns`` and ``rows`` or from ``files``, a list of paths or a
+    pattern like ``"idle_{:02}.svg"`` numbered from ``start`` for the given number of ``frames``.
+
+    :param config: animation config
+    :raise ValueError: when the frames or the interval are missing or out of range
+    """
+    if ('sheet' in config) == ('files' in config):
+        raise ValueError('Animation needs either a sprite sheet or frame files.')
+    try:
+        interval = time.parse_time_duration(str(config.get('interval', '100ms')))
+    except time.TimeException as exception:
+        raise ValueError('Invalid animation interval.', exception.get_message()) from exception
+    if interval <= 0:
+        raise ValueError('Animation interval must be positive.', config.get('interval'))
+    if 'sheet' in config:
+        columns = int(config.get('columns', 1))
+        rows = int(config.get('rows', 1))
+        if columns < 1 or rows < 1:
+            raise ValueError('Sprite sheet needs at least one column and row.', columns, rows)
+        frames = int(config.get('frames', columns * rows))
+        if not 0 < frames <= columns * rows:
+            raise ValueError('Number of frames does not fit the sprite sheet.', frames)
+        return AnimationOptions(config['sheet'], (), columns, rows, frames, interval)
+    files = config['files']
+    if isinstance(files, str):
+        if 'frames' not in config:
+            raise ValueError('Number of frames is required with a file pattern.', files)
+        start = int(config.get('start', 1))
+        files = [files.format(number) for number in range(start, start + int(config['frames']))]
+    files = tuple(str(file) for file in files)
+    if not files:
+        raise ValueError('Animation without frames.')
+    columns, rows = _atlas_grid(len(files))
+    return AnimationOptions(None, files, columns, rows, len(files), interval)
+
+
+def _atlas_grid(count: int):
+    # nearly square, so the atlas stays within the bitmap size limits of the platforms
+    columns = math.ceil(math.sqrt(count))
+    return columns, math.ceil(count / columns)
+
+
+def frame_boxes(width: int, height: int, options: AnimationOptions) -> numpy.ndarray:
+    """
+    Locate the frames in an atlas, the boxes scale with the atlas.
+
+    :param width: width of the atlas
+    :param height: height of the atlas
+    :param options: animation options
+    :return: integer array of shape (frames, 4) holding x, y, width and height of every frame
+    """
+    xs = [round(column * width / options.columns) for column in range(options.columns + 1)]
+    ys = [round(row * height / options.rows) for row in range(options.rows + 1)]
+    boxes = numpy.zeros((options.frames, 4), dtype=numpy.int32)
+    for index in range(options.frames):
+        row, column = divmod(index, options.columns)
+        boxes[index] = xs[column], ys[row], xs[column + 1] - xs[column], ys[row + 1] - ys[row]
+    return boxes
+
+
+def rasterize_animation(options: AnimationOptions, file_cache: cache.FileCache, scale: float = 1.0) -> str:
+    """
+    Get the atlas of an animation at a scale, all frames packed into one image in the grid of the options.
+
+    A sprite sheet is its own atlas, see :func:`rasterize_image`. Frame files are rasterized and packed into cells of
+    the size of the largest frame, the atlas is stored in the file cache keyed by the content of all frames.
+
+    :param options: animation options
+    :param file_cache: cache to store the atlas in
+    :param scale: factor applied to the intrinsic size of the frames
+    :return: path of the atlas image
+    """
+    if options.sheet is not None:
+        return rasterize_image(options.sheet, file_cache, scale)
+    digests = tuple(cache.file_digest(file) for file in options.files)
+    key = cache.cache_key(_PREPARATION_VERSION, 'atlas', digests, tuple(_image_type(file) for file in options.files),
+                          scale)
+
+    def write_entry(directory):
+        from PIL import Image
+        images = [_scaled_image(file, scale).convert("RGBA") for file in options.files]
+        cell_width = max(image.width for image in images)
+        cell_height = max(image.height for image in images)
+        atlas = Image.new("RGBA", (cell_width * options.columns, cell_height * options.rows))
+        for index, image in enumerate(images):
+            row, column = divmod(index, options.columns)
+            atlas.paste(image, (column * cell_width, row * cell_height))
+        atlas.save(directory / IMAGE_FILE, "PNG")
+
+    entry = file_cache.lookup(key, IMAGE_FILE)
+    if entry is None:
+        entry = file_cache.store(key, write_entry)
+    return str(entry / IMAGE_FILE)
+
+
+PreparedAnimation = collections.namedtuple('PreparedAnimation', PreparedAsset._fields + ('frame_rectangles',),
+                                           defaults=[None])
+PreparedAnimation.__doc__ = """
+Plain data describing an animated asset, see :class:`PreparedAsset`.
+
+image: path of the atlas holding all frames
+size: width and height of a frame
+rectangles: region rectangles of all frames together, they determine the layout
+source: animation options, the atlas is rasterized again for displays with more pixels per screen unit
+frame_rectangles: region rectangles relative to its frame for every frame
+"""
+
+
+def prepare_animation(config, file_cache: cache.FileCache) -> PreparedAnimation:
+    """
+    Rasterize the frames of an animated asset into an atlas and calculate the region of every frame.
+
+    :param config: asset config with an ``animation`` section
+    :param file_cache: cache to store the atlas and the regions in
+    """
+    options = load_animation_options(config['animation'])
+    mask_options = mask.load_mask_options(config.get('mask'))
+    region_options = region.load_region_options(config.get('region'))
+    scale = load_scale(config)
+    atlas_file = rasterize_animation(options, file_cache, scale)
+    key = cache.cache_key(_PREPARATION_VERSION, 'frames', cache.file_digest(atlas_file), tuple(options), scale,
+                          tuple(mask_options), tuple(region_options))
+
+    def write_entry(directory):
+        from PIL import Image
+        atlas = Image.open(atlas_file)
+        frame_rectangles = []
+        rectangles_before = 0
+        for x, y, width, height in frame_boxes(atlas.width, atlas.height, options).tolist():
+            frame = atlas.crop((x, y, x + width, y + height))
+            rectangles = region.mask_rectangles(_create_region_mask(frame, mask_options))
+            rectangles_before += len(rectangles)
+            frame_rectangles.append(region.simplify(rectangles, region_options))
+        counts = [len(rectangles) for rectangles in frame_rectangles]
+        numpy.savez(directory / REGION_FILE, rectangles=numpy.concatenate(frame_rectangles), counts=counts,
+                    rectangles_before=rectangles_before, size=atlas.size)
+
+    entry = file_cache.lookup(key, REGION_FILE)
+    if entry is None:
+        entry = file_cache.store(key, write_entry)
+
+    with numpy.load(entry / REGION_FILE) as region_file:
+        rectangles = region_file['rectangles']
+        frame_rectangles = numpy.split(rectangles, numpy.cumsum(region_file['counts'])[:-1])
+        statistics = region.RegionStatistics(int(region_file['rectangles_before']), len(rectangles))
+        atlas_width, atlas_height = (int(length) for length in region_file['size'])
+
+    _, _, width, height = frame_boxes(atlas_width, atlas_height, options)[0].tolist()
+    position_config = config.get('position', {'x': 0, 'y': 0})
+    box_x, box_y, _, _ = region.bounding_box(rectangles)
+    offset = Point(position_config.get('x', 0) - box_x, position_config.get('y', 0) - box_y)
+    return PreparedAnimation(atlas_file, (width, height), rectangles, statistics, offset, config.get('active', True),
+                             options, scale, frame_rectangles)
+
+
+def source_files(config) -> list:
+    """
+    :param config: asset config
+    :return: paths of the image files an asset is prepared from
+    """
+    if 'animation' in config:
+        options = load_animation_options(config['animation'])
+        return [options.sheet] if options.sheet is not None else list(options.files)
+    return [config['file']]
+
+
+def _bitmap_bytes(bitmap: wx.Bitmap) -> int:
+    return bitmap.GetWidth() * bitmap.GetHeight() * 4
+
+
+def _region_key(rectangles: numpy.ndarray) -> str:
+    return hashlib.blake2b(numpy.ascontiguousarray(rectangles, dtype=numpy.int64).tobytes(), digest_size=16).hexdigest()
+
+
+class _Shared:
+    __slots__ = ('value', 'bytes', 'references')
+
+    def __init__(self, value, size: int) -> None:
+        self.value = value
+        self.bytes = size
+        self.references = 0
+
+
+ResourceUsage = collections.namedtuple('ResourceUsage', ['kind', 'key', 'bytes', 'references'])
+ResourceUsage.__doc__ = """
+Memory held by a bitmap or region of an :class:`AssetStore`.
+
+kind: ``'bitmap'`` or ``'region'``
+key: raster image and pixel scale of a bitmap, digest of the rectangles of a region
+bytes: pixel memory of a bitmap, rectangle memory of a region without the overhead of the platform
+references: number of assets sharing it, 0 for bitmaps kept for later use
+"""
+
+MemoryReport = collections.namedtuple('MemoryReport', ['resources', 'bitmap_bytes', 'region_bytes', 'references'])
+MemoryReport.__doc__ = """
+Memory held by an :class:`AssetStore`.
+
+resources: usage of every bitmap and region, largest first
+bitmap_bytes and region_bytes: totals of all bitmaps and regions
+references: number of references held by assets
+"""
+
+
+class AssetStore:
+    """
+    Bitmaps and regions shared by all assets, so assets showing the same image are only placements of it.
+
+    Bitmaps are shared by raster image and pixel scale, regions by their rectangles, both are counted by reference. The
+    pixel scale is the number of physical pixels per screen unit of a display, on displays with a pixel scale other than
+    1 the source of an asset is rasterized again at its scale times the pixel scale, so it stays sharp.
+
+    Unreferenced regions are dropped. Unreferenced bitmaps are kept up to a memory budget and the least recently used
+    are dropped first, so moving the buddy back to a display with a known pixel scale needs neither rasterizing nor
+    loading. Rasterized images are kept in the file cache as well.
+
+    :param file_cache: cache to store rasterized images in, None to use the prepared raster images at every pixel scale
+    :param max_bytes: memory for the pixels of unreferenced bitmaps
+    """
+
+    def __init__(self, file_cache: cache.FileCache = None, max_bytes: int = DEFAULT_BITMAP_MEMORY) -> None:
+        self.file_cache = file_cache
+        self.max_bytes = max_bytes
+        self.unused_bytes = 0
+        self._bitmaps = {}
+        self._unused_bitmaps = collections.OrderedDict()
+        self._regions = {}
+
+    def _load_bitmap(self, prepared: PreparedAsset, pixel_scale: float) -> wx.Bitmap:
+        import wx
+        image_file = prepared.image
+        if pixel_scale != 1 and self.file_cache is not None:
+            scale = prepared.scale * pixel_scale
+            if isinstance(prepared.source, AnimationOptions):
+                image_file = rasterize_animation(prepared.source, self.file_cache, scale)
+            elif prepared.source is not None:
+                image_file = rasterize_image(prepared.source, self.file_cache, scale)
+        return wx.Bitmap(image_file)
+
+    def acquire_bitmap(self, prepared: PreparedAsset, pixel_scale: float = 1.0) -> wx.Bitmap:
+        """
+        :param prepared: prepared asset
+        :param pixel_scale: pixel scale of the display the asset is shown on
+        :return: bitmap of the asset with its size multiplied by the pixel scale, release it with
+                 :meth:`release_bitmap`
+        """
+        key = (prepared.image, pixel_scale)
+        shared = self._bitmaps.get(key)
+        if shared is None:
+            shared = self._unused_bitmaps.pop(key, None)
+            if shared is None:
+                bitmap = self._load_bitmap(prepared, pixel_scale)
+                shared = _Shared(bitmap, _bitmap_bytes(bitmap))
+            else:
+                self.unused_bytes -= shared.bytes
+            self._bitmaps[key] = shared
+        shared.references += 1
+        return shared.value
+
+    def release_bitmap(self, prepared: PreparedAsset, pixel_scale: float = 1.0):
+        key = (prepared.image, pixel_scale)
+        shared = self._bitmaps[key]
+        shared.references -= 1
+        if shared.references == 0:
+            del self._bitmaps[key]
+            self._unused_bitmaps[key] = shared
+            self.unused_bytes += shared.bytes
+            while self.unused_bytes > self.max_bytes:
+                _, evicted = self._unused_bitmaps.popitem(last=False)
+                self.unused_bytes -= evicted.bytes
+
+    def acquire_region(self, rectangles: numpy.ndarray) -> wx.Region:
+        """
+        :param rectangles: region rectangles as returned by :func:`region.simplify`
+        :return: region relative to the image, it must not be changed, release it with :meth:`release_region`
+        """
+        key = _region_key(rectangles)
+        shared = self._regions.get(key)
+        if shared is None:
+            shared = _Shared(create_region(rectangles), len(rectangles) * 16)
+            self._regions[key] = shared
+        shared.references += 1
+        return shared.value
+
+    def release_region(self, rectangles: numpy.ndarray):
+        key = _region_key(rectangles)
+        shared = self._regions[key]
+        shared.references -= 1
+        if shared.references == 0:
+            del self._regions[key]
+
+    def discard(self, image):
+        """
+        Drop the unreferenced bitmaps of a raster image at all pixel scales, e.g. because its file changed.
+
+        :param image: path of the raster image of a prepared asset
+        """
+        for key in [key for key in self._unused_bitmaps if key[0] == image]:
+            self.unused_bytes -= self._unused_bitmaps.pop(key).bytes
+
+    def memory_report(self) -> MemoryReport:
+        resources = [ResourceUsage('bitmap', key, shared.bytes, shared.references)
+                     for bitmaps in (self._bitmaps, self._unused_bitmaps) for key, shared in bitmaps.items()]
+        resources.extend(ResourceUsage('region', key, shared.bytes, shared.references)
+                         for key, shared in self._regions.items())
+        resources.sort(key=lambda usage: usage.bytes, reverse=True)
+        return MemoryReport(resources, sum(usage.bytes for usage in resources if usage.kind == 'bitmap'),
+                            sum(usage.bytes for usage in resources if usage.kind == 'region'),
+                            sum(usage.references for usage in resources))
+
 
 class GraphicAsset:
+    """
+    Placement of a prepared image in the frame.
+
+    The bitmap and the region are shared with all assets showing the same image through an :class:`AssetStore`, an
+    asset only holds its position and state. A lazy asset only knows its layout up front, it acquires its bitmap and
+    region on first use or by :meth:`materialize`, e.g. when it is activated or while the user interface is idle.
+
+    The bitmap may have more pixels than the asset has screen units, it is drawn at the size of the asset.
+
+    :param prepared: prepared data of the asset
+    :param lazy: defer acquiring the bitmap and the region
+    :param store: store to share the bitmap and the region through, by default the asset has a store of its own
+    :param pixel_scale: pixel scale of the display the asset is shown on, see :class:`AssetStore`
+    """
+
+    __slots__ = ('prepared', 'store', 'pixel_scale', 'x', 'y', 'active', '_image', '_region')
+
+    def __init__(self, prepared: PreparedAsset, lazy: bool = False, store: AssetStore = None,
+                 pixel_scale: float = 1.0) -> None:
+        self.prepared = prepared
+        self.store = AssetStore() if store is None else store
+        self.pixel_scale = pixel_scale
+        self.x, self.y = prepared.offset
+        self.active = prepared.active
+        self._image = None
+        # shared region relative to the image
+        self._region = None
+        if not lazy:
+            self.materialize()
+
+    @property
+    def offset(self) -> Point:
+        return Point(self.x, self.y)
+
+    @property
+    def size(self) -> wx.Size:
+        import wx
+        return wx.Size(*self.prepared.size)
+
+    @property
+    def region_box(self):
+        return region.bounding_box(self.prepared.rectangles)
 
-    def __init__(self, config) -> None:
-        super().__init__()
-        prepared_images = prepare_image(config['file'])
-        self.image = wx.Bitmap(prepared_images['image'])
-        region_mask = wx.Bitmap(prepared_images['region_mask'])
-        assert region_mask.GetSize() == self.image.GetSize()
-        self.size = region_mask.GetSize()
-        offset_config = config.get('position', {'x': 0, 'y': 0})
-        self.offset = Point(offset_config.get('x', 0), offset_config.get('y', 0))
-        self.region = wx.Region(region_mask, wx.Colour(0, 0, 0))
-        box = self.region.GetBox()
-        self.move(-box.GetX(), -box.GetY())
-        self.region.Offset(self.offset.x, self.offset.y)
-        self.active = config.get('active', True)
+    @property
+    def region_statistics(self) -> region.RegionStatistics:
+        return self.prepared.region_statistics
+
+    @property
+    def is_materialized(self) -> bool:
+        return self._image is not None and self._region is not None
+
+    def materialize(self):
+        """
+        Acquire the bitmap and the region unless the asset holds them already.
+        """
+        if self._image is None:
+            self._image = self.store.acquire_bitmap(self.prepared, self.pixel_scale)
+        if self._region is None:
+            self._region = self.store.acquire_region(self.prepared.rectangles)
+
+    def release(self):
+        """
+        Give the bitmap and the region back to the store, e.g. before the asset is removed.
+        """
+        if self._image is not None:
+            self.store.release_bitmap(self.prepared, self.pixel_scale)
+            self._image = None
+        if self._region is not None:
+            self.store.release_region(self.prepared.rectangles)
+            self._region = None
+
+    def set_pixel_scale(self, pixel_scale: float):
+        """
+        Show the asset on a display with another pixel scale, the bitmap is replaced on its next use.
+
+        The size, region and position of the asset are in screen units and stay the same.
+        """
+        if pixel_scale != self.pixel_scale:
+            if self._image is not None:
+                self.store.release_bitmap(self.prepared, self.pixel_scale)
+                self._image = None
+            self.pixel_scale = pixel_scale
+
+    @property
+    def image(self) -> wx.Bitmap:
+        self.materialize()
+        return self._image
+
+    @property
+    def region(self) -> wx.Region:
+        """
+        Region of the asset at its position, a new region is created on every access.
+        """
+        import wx
+        self.materialize()
+        placed_region = wx.Region(self._region)
+        placed_region.Offset(self.x, self.y)
+        return placed_region
 
     def move(self, offset_x, offset_y):
-        self.region.Offset(offset_x, offset_y)
-        self.offset = Point(self.offset.x + offset_x, self.offset.y + offset_y)
+        self.x += offset_x
+        self.y += offset_y
+
+    @property
+    def bounds(self) -> wx.Rect:
+        import wx
+        width, height = self.prepared.size
+        return wx.Rect(self.x, self.y, width, height)
+
+    @property
+    def region_bounds(self) -> wx.Rect:
+        """
+        Bounding box of the region, available without materializing the asset.
+        """
+        import wx
+        x, y, width, height = self.region_box
+        return wx.Rect(self.x + x, self.y + y, width, height)
 
     def draw_active(self, context):
         if self.active:
-            context.DrawBitmap(self.image, self.offset.x, self.offset.y, self.size.width, self.size.height)
+            self.draw(context)
 
     def draw(self, context):
-        context.DrawBitmap(self.image, self.offset.x, self.offset.y, self.size.width, self.size.height)
+        width, height = self.prepared.size
+        context.DrawBitmap(self.image, self.x, self.y, width, height)
 
     def toggle_active(self):
         self.active = not self.active
 
 
-def load_assets(assets_config):
-    assets = collections.OrderedDict()
+class AnimatedAsset(GraphicAsset):
+    """
+    Graphic asset showing the frames of an animation one after another.
+
+    All frames share one atlas bitmap, a frame is drawn as sub-bitmap of it and the regions of all frames are acquired
+    once, so showing another frame neither decodes nor converts anything.
+
+    :param prepared: prepared data of the animation
+    """
+
+    __slots__ = ('frame', '_frame_regions', '_frame_bitmaps', '_renderer')
+
+    def __init__(self, prepared: PreparedAnimation, lazy: bool = False, store: AssetStore = None,
+                 pixel_scale: float = 1.0) -> None:
+        self.frame = 0
+        self._frame_regions = None
+        # sub-bitmaps of the atlas for the renderer that created them
+        self._frame_bitmaps = None
+        self._renderer = None
+        super().__init__(prepared, lazy, store, pixel_scale)
+
+    @property
+    def frame_count(self) -> int:
+        return len(self.prepared.frame_rectangles)
+
+    def materialize(self):
+        if self._frame_regions is None:
+            self._frame_regions = [self.store.acquire_region(rectangles)
+                                   for rectangles in self.prepared.frame_rectangles]
+            self._region = self._frame_regions[self.frame]
+        super().materialize()
+
+    def release(self):
+        if self._frame_regions is not None:
+            for rectangles in self.prepared.frame_rectangles:
+                self.store.release_region(rectangles)
+            self._frame_regions = None
+            self._region = None
+        self._frame_bitmaps = None
+        super().release()
+
+    def set_pixel_scale(self, pixel_scale: float):
+        if pixel_scale != self.pixel_scale:
+            self._frame_bitmaps = None
+        super().set_pixel_scale(pixel_scale)
+
+    def advance(self, frames: int = 1):
+        """
+        Show a later frame, the animation starts over after its last frame.
+        """
+        self.frame = (self.frame + frames) % self.frame_count
+        if self._frame_regions is not None:
+            self._region = self._frame_regions[self.frame]
+
+    def frame_bitmaps(self, context) -> list:
+        """
+        :param context: graphics context to draw on
+        :return: graphics bitmap of every frame, created by the renderer of the context
+        """
+        renderer = context.GetRenderer()
+        if self._frame_bitmaps is None or self._renderer is not renderer:
+            image = self.image
+            atlas = renderer.CreateBitmap(image)
+            boxes = frame_boxes(image.GetWidth(), image.GetHeight(), self.prepared.source)
+            self._frame_bitmaps = [renderer.CreateSubBitmap(atlas, *box) for box in boxes.tolist()]
+            self._renderer = renderer
+        return self._frame_bitmaps
+
+    def draw(self, context):
+        width, height = self.prepared.size
+        context.DrawBitmap(self.frame_bitmaps(context)[self.frame], self.x, self.y, width, height)
+
+
+def create_asset(prepared: PreparedAsset, lazy: bool = False, store: AssetStore = None,
+                 pixel_scale: float = 1.0) -> GraphicAsset:
+    """
+    Create the graphic asset matching the prepared data, see :class:`GraphicAsset` for the parameters.
+    """
+    asset_class = AnimatedAsset if isinstance(prepared, PreparedAnimation) else GraphicAsset
+    return asset_class(prepared, lazy, store, pixel_scale)
+
+
+LoadingOptions = collections.namedtuple('LoadingOptions', ['workers', 'lazy', 'prefetch', 'progressive', 'primary',
+                                                           'bitmap_memory'],
+                                        defaults=[0, True, True, True, None, DEFAULT_BITMAP_MEMORY])
+LoadingOptions.__doc__ = """
+Options for loading the assets of a configuration.
+
+workers: number of processes preparing assets, 0 for one per CPU and 1 to prepare them in the calling process
+lazy: create bitmap and region of inactive assets when they are first activated
+prefetch: create bitmap and region of lazy assets while the user interface is idle
+progressive: show the frame with the primary asset and add the other assets as they are prepared
+primary: id of the asset prepared before the frame is shown, None for the first asset
+bitmap_memory: bytes of unreferenced bitmaps kept for the pixel scales of displays, see :class:`AssetStore`
+"""
+
+
+def load_loading_options(config) -> LoadingOptions:
+    """
+    Read the ``loading`` section of the configuration.
+
+    :param config: loading config, may be None
+    :raise ValueError: when the number of workers or the bitmap memory is negative
+    """
+    if config is None:
+        return LoadingOptions()
+    options = LoadingOptions(int(config.get('workers', 0)), bool(config.get('lazy', True)),
+                             bool(config.get('prefetch', True)), bool(config.get('progressive', True)),
+                             config.get('primary'), int(config.get('bitmap_memory', DEFAULT_BITMAP_MEMORY)))
+    if options.workers < 0:
+        raise ValueError('Number of loading workers must not be negative.', options.workers)
+    if options.bitmap_memory < 0:
+        raise ValueError('Bitmap memory must not be negative.', options.bitmap_memory)
+    return options
+
+
+def iterate_prepared_assets(assets_config, file_cache: cache.FileCache, workers: int = 1):
+    """
+    Prepare assets and yield each of them as soon as it and all assets before it are ready.
+
+    Assets are independent of each other, with more than one worker their images are prepared in a process pool. When
+    no pool can be started or it breaks, the remaining assets are prepared one after another in the calling process.
+
+    :param assets_config: asset configs by their id
+    :param file_cache: cache to store the prepared images in
+    :param workers: number of processes, 0 for one per CPU and 1 to prepare in the calling process
+    :return: iterator of asset ids and prepared assets in the order of the configuration
+    """
     for asset_id, asset_config in assets_config.items():
-        if 'file' in asset_config:
-            # TODO: Move config extraction from constructor to here (or sub-methods)
-            assets[asset_id] = GraphicAsset(asset_config)
-        else:
-            raise NotImplementedError('Unknown trigger: ' + asset_id, asset_config)
+        if 'file' not in asset_config and 'animation' not in asset_config:
+            raise NotImplementedError('Unknown asset: ' + asset_id, asset_config)
+    if workers == 0:
+        workers = os.cpu_count() or 1
+    asset_ids = list(assets_config.keys())
+    workers = min(workers, len(asset_ids))
+    done = 0
+    if workers > 1:
+        try:
+            # forking a process that runs a GUI toolkit is unsafe, fresh interpreters are started instead
+            context = multiprocessing.get_context('spawn') if 'wx' in sys.modules else None
+            with concurrent.futures.ProcessPoolExecutor(workers, mp_context=context) as executor:
+                configs = [assets_config[asset_id] for asset_id in asset_ids]
+                for prepared in executor.map(prepare_asset, configs, itertools.repeat(file_cache)):
+                    yield asset_ids[done], prepared
+                    done += 1
+        except (OSError, concurrent.futures.process.BrokenProcessPool):
+            # processes may not be available, e.g. in sandboxes, an OSError of an asset is raised again when preparing
+            # serially
+            pass
+    for asset_id in asset_ids[done:]:
+        yield asset_id, prepare_asset(assets_config[asset_id], file_cache)
+
+
+def prepare_assets(assets_config, file_cache: cache.FileCache, workers: int = 1):
+    """
+    Prepare all assets of a configuration, see :func:`iterate_prepared_assets`.
+
+    :return: prepared assets by their id in the order of the configuration
+    """
+    return collections.OrderedDict(iterate_prepared_assets(assets_config, file_cache, workers))
+
+
+def create_assets(prepared_assets, lazy: bool = False, store: AssetStore = None, pixel_scale: float = 1.0):
+    """
+    :param prepared_assets: prepared assets by their id
+    :param lazy: create inactive assets lazily
+    :param store: store to share bitmaps and regions through, by default a new store shared by the created assets
+    :param pixel_scale: pixel scale of the display the assets are shown on
+    :return: graphic assets by their id
+    """
+    if store is None:
+        store = AssetStore()
+    assets = collections.OrderedDict()
+    for asset_id, prepared in prepared_assets.items():
+        assets[asset_id] = create_asset(prepared, lazy and not prepared.active, store, pixel_scale)
     return assets
+
+
+def load_assets(assets_config, file_cache: cache.FileCache, workers: int = 1):
+    return create_assets(prepare_assets(assets_config, file_cache, workers))
@@ -0,0 +1,193 @@
+import collections
+import hashlib
+import os
+import pathlib
+import shutil
+import sys
+import tempfile
+
+DEFAULT_MAX_SIZE = 256 * 1024 * 1024
+
+
+def default_cache_directory() -> pathlib.Path:
+    """
+    Find the platform specific directory for cached files of the desktop buddy.
+
+    :return: path of the cache directory, it may not exist yet
+    """
+    if sys.platform.startswith('win'):
+        base = os.environ.get('LOCALAPPDATA') or pathlib.Path.home() / 'AppData' / 'Local'
+    elif sys.platform == 'darwin':
+        base = pathlib.Path.home() / 'Library' / 'Caches'
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or pathlib.Path.home() / '.cache'
+    return pathlib.Path(base) / 'desktop_buddy'
+
+
+def file_digest(file) -> str:
+    """
+    Hash the content of a file.
+
+    :param file: path of the file to hash
+    :return: hex encoded SHA-256 digest of the file content
+    """
+    digest = hashlib.sha256()
+    with open(file, 'rb') as opened_file:
+        for chunk in iter(lambda: opened_file.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_key(*parts) -> str:
+    """
+    Combine several values into a single key usable as a cache entry name.
+
+    :param parts: values identifying the cached content, their string representation must be stable
+    :return: hex encoded key
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(repr(part).encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class FileCache:
+    """
+    Persistent content addressed cache of generated files.
+
+    Every entry is a directory named by its key containing one or more files. Entries are written to a temporary
+    directory first and renamed into place, so readers never observe partially written entries. The modification time
+    of an entry directory records its last use and the least recently used entries are removed when the total size of
+    the cache exceeds its limit.
+    """
+
+    def __init__(self, directory=None, max_size: int = DEFAULT_MAX_SIZE) -> None:
+        if directory is None:
+            directory = default_cache_directory()
+        self.directory = pathlib.Path(directory)
+        self.max_size = max_size
+
+    def entry_path(self, key: str) -> pathlib.Path:
+        return self.directory / key
+
+    def lookup(self, key: str, *names: str):
+        """
+        Find a complete cache entry and mark it as recently used.
+
+        :param key: key of the entry
+        :param names: file names that have to be present in the entry
+        :return: path of the entry directory or None when there is no such entry
+        """
+        entry = self.entry_path(key)
+        if not all((entry / name).is_file() for name in names):
+            return None
+        try:
+            os.utime(entry)
+        except OSError:
+            pass
+        return entry
+
+    def store(self, key: str, writer: callable) -> pathlib.Path:
+        """
+        Atomically create a cache entry.
+
+        :param key: key of the entry
+        :param writer: called with the path of a temporary directory to write the entry files into
+        :return: path of the entry directory
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        entry = self.entry_path(key)
+        temporary = pathlib.Path(tempfile.mkdtemp(prefix='.' + key[:16] + '-', dir=self.directory))
+        try:
+            writer(temporary)
+            try:
+                os.replace(temporary, entry)
+            except OSError:
+                # another process stored the same entry in the meantime, its content is identical
+                if not entry.is_dir():
+                    raise
+        finally:
+            if temporary.exists():
+                shutil.rmtree(temporary, ignore_errors=True)
+        self.evict(keep=key)
+        return entry
+
+    def evict(self, keep: str = None) -> int:
+        """
+        Remove least recently used entries until the cache fits its size limit.
+
+        :param keep: key of an entry that must not be removed
+        :return: number of removed entries
+        """
+        entries = []
+        total_size = 0
+        try:
+            children = list(self.directory.iterdir())
+        except FileNotFoundError:
+            return 0
+        for entry in children:
+            if entry.name.startswith('.') or not entry.is_dir():
+                continue
+            size = sum(file.stat().st_size for file in entry.iterdir() if file.is_file())
+            total_size += size
+            if entry.name != keep:
+                entries.append((entry.stat().st_mtime_ns, size, entry))
+        entries.sort(key=lambda e: e[0])
+        removed = 0
+        for _, size, entry in entries:
+            if total_size <= self.max_size:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total_size -= size
+            removed += 1
+        return removed
+
+    def clear(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+class LruCache:
+    """
+    Bounded in memory mapping that forgets the least recently used entries first.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries = collections.OrderedDict()
+
+    def get(self, key, default=None):
+        try:
+            self._entries.move_to_end(key)
+        except KeyError:
+            return default
+        return self._entries[key]
+
+    def put(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def load_cache(config) -> FileCache:
+    """
+    Create the file cache described by the ``cache`` section of the configuration.
+
+    :param config: cache configuration, may be None
+    """
+    if config is None:
+        config = {}
+    directory = config.get('directory')
+    if directory is not None:
+        directory = os.path.expanduser(directory)
+    return FileCache(directory, config.get('size', DEFAULT_MAX_SIZE))
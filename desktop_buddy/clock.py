@@ -0,0 +1,37 @@
+from abc import ABC
+from . import time
+
+
+class Clock(ABC):
+
+    def now_millis(self) -> int:
+        """
+        :return: current time in epoch milliseconds
+        """
+        raise NotImplementedError()
+
+
+class SystemClock(Clock):
+
+    def now_millis(self) -> int:
+        return time.now_millis()
+
+
+class VirtualClock(Clock):
+    """
+    Clock that only moves when told to, for simulations and tests.
+    """
+
+    def __init__(self, start: int = 0) -> None:
+        self._now = start
+
+    def now_millis(self) -> int:
+        return self._now
+
+    def set(self, now: int):
+        if now < self._now:
+            raise ValueError('A virtual clock cannot go backwards.', now)
+        self._now = now
+
+    def advance(self, millis: int):
+        self.set(self._now + millis)
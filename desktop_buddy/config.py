@@ -0,0 +1,39 @@
+import pathlib
+
+DEFAULT_CONFIG_FILE = pathlib.Path('config.yaml')
+
+
+def load_config(config_file=DEFAULT_CONFIG_FILE):
+    """
+    Parse the YAML configuration of the desktop buddy.
+
+    :param config_file: path of the configuration file
+    """
+    # ruamel is only imported when a configuration is parsed, compiled snapshots do not need it
+    from ruamel.yaml import YAML
+    yaml = YAML()
+    return yaml.load(pathlib.Path(config_file))
+
+
+def to_plain(value):
+    """
+    Convert a loaded configuration into plain dictionaries, lists and scalars.
+
+    The round-trip loader returns subclasses carrying comments and formatting, the plain copy does not depend on
+    ruamel and can be pickled compactly.
+
+    :param value: configuration or part of it as returned by :func:`load_config`
+    """
+    if isinstance(value, dict):
+        return {to_plain(key): to_plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_plain(item) for item in value]
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, int):
+        return int(value)
+    if isinstance(value, float):
+        return float(value)
+    if isinstance(value, str):
+        return str(value)
+    return value
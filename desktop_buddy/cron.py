@@ -0,0 +1,159 @@
+import calendar
+import datetime
+from . import time
+
+MINUTES_PER_DAY = 24 * 60
+# without a match within this many days an expression never matches, covers the 29th of February
+_MAX_SEARCH_DAYS = 5 * 366
+
+_MONTH_NAMES = ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec']
+_WEEKDAY_NAMES = ['sun', 'mon', 'tue', 'wed', 'thu', 'fri', 'sat']
+_MACROS = {
+    '@yearly': '0 0 1 1 *',
+    '@annually': '0 0 1 1 *',
+    '@monthly': '0 0 1 * *',
+    '@weekly': '0 0 * * 0',
+    '@daily': '0 0 * * *',
+    '@midnight': '0 0 * * *',
+    '@hourly': '0 * * * *',
+}
+
+
+def _parse_value(value: str, names, offset: int) -> int:
+    if names is not None and value.casefold() in names:
+        return names.index(value.casefold()) + offset
+    return int(value)
+
+
+def _parse_field(field: str, minimum: int, maximum: int, names=None) -> int:
+    """
+    Parse one field of a cron expression into a bitset, bit n is set when value n matches.
+    """
+    bits = 0
+    for part in field.split(','):
+        range_part, _, step = part.partition('/')
+        step = int(step) if step else 1
+        if range_part == '*':
+            start, end = minimum, maximum
+        else:
+            start_value, _, end_value = range_part.partition('-')
+            start = _parse_value(start_value, names, minimum)
+            end = _parse_value(end_value, names, minimum) if end_value else (maximum if step > 1 else start)
+        if step < 1 or not minimum <= start <= end <= maximum:
+            raise ValueError(part)
+        for value in range(start, end + 1, step):
+            bits |= 1 << value
+    return bits
+
+
+def _lowest_bit_from(bits: int, position: int):
+    remaining = bits >> position
+    if not remaining:
+        return None
+    return position + (remaining & -remaining).bit_length() - 1
+
+
+class CronExpression:
+    """
+    Parsed cron expression with the fields minute, hour, day of month, month and day of week.
+
+    Every field is stored as a bitset and minute and hour are combined into one bitset of the minutes of a day, so the
+    next matching minute is found with a few integer operations. Like in cron a day matches when either the day of
+    month or the day of week matches if both are restricted.
+    """
+
+    def __init__(self, expression: str) -> None:
+        if not isinstance(expression, str):
+            raise InvalidCronException(message=f'Cron expression has to be a string: {expression!r}')
+        self.expression = expression
+        fields = _MACROS.get(expression.strip().casefold(), expression).split()
+        if len(fields) != 5:
+            raise InvalidCronException(message='Cron expression needs five fields: ' + expression)
+        minute, hour, day, month, weekday = fields
+        try:
+            minutes = _parse_field(minute, 0, 59)
+            hours = _parse_field(hour, 0, 23)
+            self.days = _parse_field(day, 1, 31)
+            self.months = _parse_field(month, 1, 12, _MONTH_NAMES)
+            weekdays = _parse_field(weekday, 0, 7, _WEEKDAY_NAMES)
+        except ValueError as exception:
+            raise InvalidCronException(exception, message='Invalid cron expression: ' + expression)
+        # cron counts weekdays from Sunday, both 0 and 7, python from Monday
+        self.weekdays = 0
+        for cron_weekday in range(8):
+            if weekdays >> cron_weekday & 1:
+                self.weekdays |= 1 << (cron_weekday - 1) % 7
+        self.days_restricted = not day.startswith('*')
+        self.weekdays_restricted = not weekday.startswith('*')
+        self.minutes_of_day = 0
+        for hour_of_day in range(24):
+            if hours >> hour_of_day & 1:
+                self.minutes_of_day |= minutes << hour_of_day * 60
+        if not self._can_match_a_day():
+            raise InvalidCronException(message='Cron expression never matches: ' + expression)
+
+    def _can_match_a_day(self) -> bool:
+        if self.weekdays_restricted or not self.days_restricted:
+            return True
+        for month in range(1, 13):
+            if self.months >> month & 1 and self.days & (1 << calendar.monthrange(2000, month)[1] + 1) - 1:
+                return True
+        return False
+
+    def matches_date(self, date: datetime.date) -> bool:
+        if not self.months >> date.month & 1:
+            return False
+        day_matches = self.days >> date.day & 1
+        weekday_matches = self.weekdays >> date.weekday() & 1
+        if self.days_restricted and self.weekdays_restricted:
+            return bool(day_matches or weekday_matches)
+        return bool(day_matches and weekday_matches)
+
+    def next_minute_of_day(self, minute_of_day: int):
+        """
+        :param minute_of_day: first minute of the day to consider
+        :return: first matching minute of the day not before the given one or None
+        """
+        return _lowest_bit_from(self.minutes_of_day, minute_of_day)
+
+    def __repr__(self) -> str:
+        return f'CronExpression({self.expression!r})'
+
+
+def next_occurrence(expressions, now: int, timezone=None) -> int:
+    """
+    Find the first minute matching any of the expressions that is not before now.
+
+    :param expressions: cron expressions to match
+    :param now: epoch milliseconds to start from
+    :param timezone: timezone of the wall clock, None for the local timezone of the system
+    :return: epoch milliseconds of the occurrence
+    """
+    day = time.local_day(now, timezone)
+    # round up to the next full minute
+    minute_of_day = -(-day.time_of_day(now) // 60000)
+    ordinal = day.ordinal
+    for _ in range(_MAX_SEARCH_DAYS):
+        date = datetime.date.fromordinal(ordinal)
+        best = None
+        for expression in expressions:
+            if expression.matches_date(date):
+                minute = expression.next_minute_of_day(minute_of_day)
+                if minute is not None and (best is None or minute < best):
+                    best = minute
+        if best is not None:
+            if day.ordinal != ordinal:
+                day = time.local_day_of_ordinal(ordinal, timezone)
+            occurrence = day.to_epoch_millis(best * 60000)
+            if occurrence >= now:
+                return occurrence
+            # a minute skipped by a clock change resolved to an instant before now
+            minute_of_day = best + 1
+            continue
+        ordinal += 1
+        minute_of_day = 0
+    raise InvalidCronException(message='Cron expressions never match: ' + ', '.join(e.expression for e in expressions))
+
+
+class InvalidCronException(time.TimeException):
+    pass
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import collections.abc
 from abc import ABC
 
 
@@ -16,6 +17,32 @@ class UnsupportedException(Exception):
     def get_config(self):
         return self._config
 
+    def __str__(self):
+        if self._message is not None:
+            return self._message
+        return super().__str__()
+
+
+class DenormalizationErrors(UnsupportedException):
+    """
+    All errors found while denormalizing the items of a collection in a single pass.
+    """
+
+    def __init__(self, errors: list, config=None) -> None:
+        lines = [f'{len(errors)} item(s) cannot be denormalized:']
+        for key, error in errors:
+            # nested errors span several lines, they are indented below their key
+            description = str(error) or type(error).__name__
+            lines.append(f'{key}: ' + description.replace('\n', '\n    '))
+        super().__init__(*errors, message='\n'.join(lines), config=config)
+        self._errors = errors
+
+    def get_errors(self) -> list:
+        """
+        :return: list of tuples with the index or name of the failed item and its exception
+        """
+        return self._errors
+
 
 class Denormalizer(ABC):
 
@@ -36,26 +63,53 @@ class Denormalizer(ABC):
         """
         raise NotImplementedError()
 
+    def discriminating_keys(self) -> tuple:
+        """
+        Keys of mapping configs of which at least one has to be present to support denormalization.
+
+        An empty tuple means that the denormalizer cannot be selected by key.
+        """
+        return ()
+
 
 class PriorityDenormalizer(Denormalizer):
 
     def __init__(self) -> None:
         super().__init__()
         self._priority_list = []
+        # positions in the priority list of denormalizers by their discriminating keys
+        self._key_index = {}
+        self._unindexed = []
 
     def register(self, denormalizer: Denormalizer, priority: int = 0) -> PriorityDenormalizer:
         self._priority_list.append((priority, denormalizer))
         self._priority_list.sort(key=lambda p: p[0], reverse=True)
+        self._key_index = {}
+        self._unindexed = []
+        for position, (_, registered) in enumerate(self._priority_list):
+            keys = registered.discriminating_keys()
+            if not keys:
+                self._unindexed.append(position)
+            for key in keys:
+                self._key_index.setdefault(key, []).append(position)
         return self
 
+    def _candidates(self, config):
+        if not isinstance(config, collections.abc.Mapping):
+            return self._priority_list
+        positions = set(self._unindexed)
+        for key in config:
+            positions.update(self._key_index.get(key, ()))
+        return [self._priority_list[position] for position in sorted(positions)]
+
     def denormalize(self, config):
-        for (_, denormalizer) in self._priority_list:
+        for (_, denormalizer) in self._candidates(config):
             if denormalizer.supports_denormalization(config):
                 return denormalizer.denormalize(config)
         raise UnsupportedException(config=config, message='No denormalizer available.')
 
     def supports_denormalization(self, config) -> bool:
-        for _, denormalizer in self._priority_list:
+        for _, denormalizer in self._candidates(config):
             if denormalizer.supports_denormalization(config):
                 return True
         return False
@@ -75,12 +129,22 @@ class ListDenormalizer(Denormalizer):
         self._list_supplier = list_supplier
 
     def denormalize(self, config):
+        """
+        Denormalize all items in a single pass, errors of all items are collected and raised together at the end.
+
+        :raise DenormalizationErrors: when at least one item cannot be denormalized
+        """
+        if isinstance(config, (str, collections.abc.Mapping)) or not isinstance(config, collections.abc.Iterable):
+            raise UnsupportedException(config=config, message='Config is not a list.')
         object_list = self._list_supplier()
-        for object_config in config:
-            if not self._denormalizer.supports_denormalization(object_config):
-                raise UnsupportedException(config=object_config, message='List item cannot be denormalized.')
-            denormalized = self._denormalizer.denormalize(object_config)
-            object_list.append(denormalized)
+        errors = []
+        for index, object_config in enumerate(config):
+            try:
+                object_list.append(self._denormalizer.denormalize(object_config))
+            except UnsupportedException as exception:
+                errors.append((index, exception))
+        if errors:
+            raise DenormalizationErrors(errors, config=config)
         return object_list
 
     def supports_denormalization(self, config) -> bool:
@@ -107,19 +171,29 @@ class DictDenormalizer(Denormalizer):
         self._dict_supplier = dict_supplier
 
     def denormalize(self, config):
+        """
+        Denormalize all values in a single pass, errors of all values are collected and raised together at the end.
+
+        :raise DenormalizationErrors: when at least one value cannot be denormalized
+        """
+        if not isinstance(config, collections.abc.Mapping):
+            raise UnsupportedException(config=config, message='Config is not a mapping.')
         object_dict = self._dict_supplier()
-        for object_name, object_config in config:
-            if not self._denormalizer.supports_denormalization(object_config):
-                raise UnsupportedException(config=object_config, message='List item cannot be denormalized.')
-            denormalized = self._denormalizer.denormalize(object_config)
-            object_dict[object_name](denormalized)
+        errors = []
+        for object_name, object_config in config.items():
+            try:
+                object_dict[object_name] = self._denormalizer.denormalize(object_config)
+            except UnsupportedException as exception:
+                errors.append((object_name, exception))
+        if errors:
+            raise DenormalizationErrors(errors, config=config)
         return object_dict
 
     def supports_denormalization(self, config) -> bool:
         try:
-            for object_name, object_config in config:
+            for object_name, object_config in config.items():
                 if not self._denormalizer.supports_denormalization(object_config):
                     return False
             return True
-        except TypeError:
+        except (AttributeError, TypeError):
             return False
@@ -0,0 +1,570 @@
+import collections
+import threading
+import wx
+import wx.lib.newevent
+from . import action, asset, cache, reload, scheduler, snapshot, trigger, watch
+
+# number of distinct combinations of active assets without animation whose union region is kept
+REGION_CACHE_SIZE = 32
+# longest timer wait in milliseconds, wx takes a C int and the scheduler checks again on every early wake-up
+MAX_TIMER_WAIT = 24 * 60 * 60 * 1000
+# milliseconds between checks of a polling watcher, a reload waits this long without further changes
+WATCH_INTERVAL = 500
+
+# posted to the frame once every asset is loaded, ``error`` holds the exception that stopped loading or None
+AssetsLoadedEvent, EVT_ASSETS_LOADED = wx.lib.newevent.NewEvent()
+# posted to the frame after a reload, ``error`` holds the exception that kept the configuration unchanged or None
+ConfigReloadedEvent, EVT_CONFIG_RELOADED = wx.lib.newevent.NewEvent()
+
+
+def _dynamic_asset_ids(compiled: snapshot.CompiledConfig) -> list:
+    # animated assets and assets changed by actions in the order of the configuration
+    assets_config = compiled.settings.get('assets', {})
+    changed = set().union(*(configured_action.asset_ids() for configured_action in compiled.actions.values()))
+    return [asset_id for asset_id, asset_config in assets_config.items()
+            if 'animation' in asset_config or asset_id in changed]
+
+
+class DeskyFrame(wx.Frame):
+
+    def __init__(self, compiled: snapshot.CompiledConfig):
+        self.compiled = compiled
+        window_config = compiled.settings['window']
+        title = window_config['title']
+        self.background_color = wx.Colour(window_config['background'])
+
+        self.loading_options = asset.load_loading_options(compiled.settings.get('loading'))
+        assets_config = compiled.settings.get('assets', {})
+        # ids of all configured assets in drawing order, assets still being loaded are missing from self.assets
+        self.asset_order = list(assets_config)
+        # active state of all configured assets, including those still being loaded
+        self.asset_states = {asset_id: asset_config.get('active', True)
+                             for asset_id, asset_config in assets_config.items()}
+        # bitmaps and regions shared by assets showing the same image
+        self.asset_store = asset.AssetStore(cache.load_cache(compiled.settings.get('cache')),
+                                            self.loading_options.bitmap_memory)
+        # physical pixels per screen unit of the display, known once the frame exists, the layout does not need bitmaps
+        self.pixel_scale = 1.0
+        # nothing is materialized before the pixel scale is known
+        self.assets = collections.OrderedDict(
+            (asset_id, asset.create_asset(prepared, True, self.asset_store))
+            for asset_id, prepared in compiled.prepared_assets.items())
+        self.region_cache = cache.LruCache(REGION_CACHE_SIZE)
+        # signature of the active assets the window shape was calculated for
+        self.region_signature = None
+        self.changed_assets = set()
+        self.background_asset_ids = set()
+        self.foreground_asset_ids = []
+        self.split_layers(compiled)
+        self.static_layer = None
+        # offset of the frame coordinates to the configured asset positions
+        self.origin = asset.Point(0, 0)
+
+        box = self.layout_box()
+        self.move_assets(-box.GetX(), -box.GetY())
+        size = box.GetSize()
+
+        style = wx.FRAME_NO_TASKBAR | wx.STAY_ON_TOP | wx.FRAME_SHAPED | wx.BORDER_NONE
+        super(DeskyFrame, self).__init__(None, title=title, size=size, style=style)
+        self.pixel_scale = self.GetContentScaleFactor()
+        for single_asset in self.assets.values():
+            single_asset.set_pixel_scale(self.pixel_scale)
+            if single_asset.active or not self.loading_options.lazy:
+                single_asset.materialize()
+        self.active_region = None
+        self.calculate_active_region()
+
+        self.scheduler = scheduler.Scheduler()
+        self.action_engine = action.ActionEngine(compiled.actions, self.scheduler)
+        # handles of the configured triggers in the order of the configuration
+        self.scheduled_triggers = self.action_engine.add_triggers(compiled.triggers)
+        # handles of the triggers advancing the shown animated assets by their id
+        self.animations = {}
+        for asset_id in self.assets:
+            self.start_animation(asset_id)
+
+        self.timer = wx.Timer(self, 1)
+        self.start_timer()
+
+        self.Bind(wx.EVT_PAINT, self.on_paint)
+        self.Bind(wx.EVT_TIMER, self.on_timer, self.timer)
+        self.Bind(wx.EVT_DPI_CHANGED, self.on_dpi_changed)
+        self.Bind(wx.EVT_MOVE, self.on_move)
+        self.Bind(wx.EVT_WINDOW_DESTROY, self.on_destroy)
+
+        self.prefetch_queue = collections.deque()
+        self.prefetch(self.assets.keys())
+
+        # assets are prepared in the background, no reload is started meanwhile
+        self.loading = False
+        self.reload_pending = False
+        self.config_file = None
+        self.snapshot_path = None
+        self.watcher = None
+        self.watch_timer = None
+        # restarted by every change, a reload starts once it runs out
+        self.reload_timer = wx.Timer(self)
+        self.Bind(wx.EVT_TIMER, self.on_reload_timer, self.reload_timer)
+
+    def split_layers(self, compiled: snapshot.CompiledConfig):
+        """
+        Split the assets at the lowest dynamic asset, the assets below it never change and are cached in the static
+        layer, all assets from it upwards are drawn on every paint in the configured order.
+        """
+        dynamic_asset_ids = _dynamic_asset_ids(compiled)
+        split = self.asset_order.index(dynamic_asset_ids[0]) if dynamic_asset_ids else len(self.asset_order)
+        self.background_asset_ids = set(self.asset_order[:split])
+        self.foreground_asset_ids = self.asset_order[split:]
+
+    def layout_box(self) -> wx.Rect:
+        """
+        Bounding box of the regions of all loaded assets, it is known without materializing lazy assets.
+        """
+        box = wx.Rect()
+        for single_asset in self.assets.values():
+            box = box.Union(single_asset.region_bounds)
+        return box
+
+    def load_remaining_assets(self, compilation: snapshot.Compilation, snapshot_path=None):
+        """
+        Prepare the assets missing from the frame in a background thread and add each of them once it is ready.
+
+        :class:`AssetsLoadedEvent` is posted to the frame when all assets are loaded.
+
+        The compilation is only used by the background thread, its results are merged into :attr:`compiled` on the
+        thread of the user interface.
+
+        :param compilation: compilation started by :func:`snapshot.load_or_start_compilation`
+        :param snapshot_path: path of the snapshot file to update
+        """
+        def load():
+            error = None
+            try:
+                for asset_id, prepared in snapshot.finish_compilation(compilation, snapshot_path):
+                    wx.CallAfter(self.add_asset, asset_id, prepared)
+            except Exception as exception:
+                error = exception
+            wx.CallAfter(self.finish_loading, dict(compilation.compiled.sources), error)
+
+        self.loading = True
+        threading.Thread(target=load, name='asset loader', daemon=True).start()
+
+    def add_asset(self, asset_id, prepared: asset.PreparedAsset):
+        """
+        Show an asset prepared after the frame was created, the frame grows to fit it.
+        """
+        if not self:
+            # the frame was closed while the asset was prepared
+            return
+        # the compilation of the loader thread is never shared, the frame keeps its own prepared assets in order
+        self.compiled.prepared_assets[asset_id] = prepared
+        self.compiled.prepared_assets = collections.OrderedDict(
+            (ordered_id, self.compiled.prepared_assets[ordered_id])
+            for ordered_id in self.asset_order if ordered_id in self.compiled.prepared_assets)
+        active = self.asset_states[asset_id]
+        new_asset = self.create_asset(prepared, active)
+        new_asset.move(self.origin.x, self.origin.y)
+        self.assets[asset_id] = new_asset
+        self.start_animation(asset_id)
+        # drawing order and region cache signatures follow the order of the configuration
+        self.assets = collections.OrderedDict(
+            (ordered_id, self.assets[ordered_id]) for ordered_id in self.asset_order if ordered_id in self.assets)
+        self.invalidate_layout()
+        self.fit_to_assets()
+        self.calculate_active_region()
+        self.Refresh()
+        self.prefetch([asset_id])
+
+    def create_asset(self, prepared: asset.PreparedAsset, active: bool) -> asset.GraphicAsset:
+        new_asset = asset.create_asset(prepared, self.loading_options.lazy and not active, self.asset_store,
+                                       self.pixel_scale)
+        new_asset.active = active
+        return new_asset
+
+    def start_animation(self, asset_id):
+        """
+        Schedule the frames of an asset if it is animated and shown, hidden assets keep their frame.
+        """
+        animated = self.assets[asset_id]
+        if isinstance(animated, asset.AnimatedAsset) and animated.active and asset_id not in self.animations:
+            animation_trigger = trigger.AnimationTrigger(animated.prepared.source.interval, asset_id)
+            self.animations[asset_id] = self.scheduler.add(animation_trigger)
+
+    def stop_animation(self, asset_id):
+        scheduled = self.animations.pop(asset_id, None)
+        if scheduled is not None:
+            self.scheduler.remove(scheduled)
+
+    def fit_to_assets(self):
+        """
+        Resize the frame to the regions of all assets, content already shown keeps its place on the screen.
+        """
+        box = self.layout_box()
+        if box.GetX() != 0 or box.GetY() != 0:
+            self.move_assets(-box.GetX(), -box.GetY())
+            self.Move(self.GetPosition() + box.GetTopLeft())
+        if box.GetSize() != self.GetClientSize():
+            self.SetClientSize(box.GetSize())
+            self.invalidate_layout()
+
+    def finish_loading(self, sources: dict, error=None):
+        self.loading = False
+        if not self:
+            return
+        self.compiled.sources.update(sources)
+        if self.watcher is not None:
+            # the files of the assets loaded meanwhile are known now
+            self.watcher.set_paths(self.compiled.sources)
+        wx.PostEvent(self, AssetsLoadedEvent(error=error))
+
+    def watch(self, config_file, snapshot_path=None):
+        """
+        Reload the configuration whenever it or one of its asset files changes.
+
+        Watchers notified of changes wait for them in a background thread, other watchers are polled by a timer.
+
+        :param config_file: path of the configuration file
+        :param snapshot_path: path of the snapshot file to update, defaults to :func:`snapshot.default_snapshot_path`
+        """
+        self.config_file = config_file
+        self.snapshot_path = snapshot_path
+        self.watcher = watch.create_watcher(self.compiled.sources)
+        if isinstance(self.watcher, watch.PollingWatcher):
+            self.watch_timer = wx.Timer(self)
+            self.Bind(wx.EVT_TIMER, self.on_watch_timer, self.watch_timer)
+            self.watch_timer.Start(WATCH_INTERVAL)
+        else:
+            threading.Thread(target=self.wait_for_changes, args=(self.watcher,), name='config watcher',
+                             daemon=True).start()
+
+    def wait_for_changes(self, watcher: watch.Watcher):
+        # runs in the watcher thread until the watcher is closed
+        while True:
+            changed = watcher.wait()
+            if not changed:
+                break
+            wx.CallAfter(self.on_files_changed, changed)
+
+    def on_watch_timer(self, event: wx.TimerEvent):
+        self.on_files_changed(self.watcher.poll())
+
+    def on_files_changed(self, changed):
+        if not self or not changed:
+            return
+        # editors may write several files or write in steps, wait until nothing changes anymore
+        self.reload_pending = True
+        self.reload_timer.StartOnce(WATCH_INTERVAL)
+
+    def on_reload_timer(self, event: wx.TimerEvent):
+        if self.loading:
+            # assets are still loaded or the previous reload is running, try again later
+            self.reload_timer.StartOnce(WATCH_INTERVAL)
+        elif self.reload_pending:
+            self.reload_pending = False
+            self.reload()
+
+    def on_destroy(self, event: wx.WindowDestroyEvent):
+        if event.GetEventObject() is self:
+            self.timer.Stop()
+            self.reload_timer.Stop()
+            if self.watch_timer is not None:
+                self.watch_timer.Stop()
+            if self.watcher is not None:
+                # also ends the watcher thread
+                self.watcher.close()
+        event.Skip()
+
+    def reload(self):
+        """
+        Compile the changed configuration in a background thread and apply the difference to the running buddy.
+
+        :class:`ConfigReloadedEvent` is posted to the frame when the reload is done. When the configuration has errors,
+        the event holds them and the buddy keeps running with its current configuration.
+        """
+        previous = self.compiled
+        snapshot_path = self.snapshot_path
+        if snapshot_path is None:
+            snapshot_path = snapshot.default_snapshot_path(self.config_file)
+
+        def compile_changes():
+            error = None
+            try:
+                compiled = snapshot.recompile(self.config_file, previous)
+            except Exception as exception:
+                compiled = None
+                error = exception
+            else:
+                try:
+                    snapshot.save_snapshot(compiled, snapshot_path)
+                except OSError:
+                    pass
+            wx.CallAfter(self.finish_reload, compiled, error)
+
+        self.loading = True
+        threading.Thread(target=compile_changes, name='config reloader', daemon=True).start()
+
+    def finish_reload(self, compiled, error=None):
+        self.loading = False
+        if not self:
+            return
+        if compiled is not None:
+            self.apply_config(compiled)
+        # the set of asset files may have changed, failed reloads are retried on the next change
+        self.watcher.set_paths((compiled or self.compiled).sources)
+        wx.PostEvent(self, ConfigReloadedEvent(error=error))
+
+    def apply_config(self, compiled: snapshot.CompiledConfig):
+        """
+        Apply a new compilation of the configuration, only what changed is replaced.
+
+        Unchanged assets keep their bitmap, region and active state and unchanged triggers keep their schedule.
+        """
+        config_diff = reload.diff(self.compiled, compiled)
+        assets_config = compiled.settings.get('assets', {})
+        for asset_id in config_diff.removed_assets + config_diff.changed_assets:
+            self.stop_animation(asset_id)
+            old_asset = self.assets[asset_id]
+            old_asset.release()
+            # the image of a changed asset may have been changed in place
+            self.asset_store.discard(old_asset.prepared.image)
+        for asset_id in config_diff.removed_assets:
+            del self.assets[asset_id]
+            del self.asset_states[asset_id]
+            self.changed_assets.discard(asset_id)
+        for asset_id in config_diff.changed_assets + config_diff.added_assets:
+            active = assets_config[asset_id].get('active', True)
+            new_asset = self.create_asset(compiled.prepared_assets[asset_id], active)
+            new_asset.move(self.origin.x, self.origin.y)
+            self.assets[asset_id] = new_asset
+            self.asset_states[asset_id] = active
+            self.start_animation(asset_id)
+        self.asset_order = list(assets_config)
+        self.assets = collections.OrderedDict((asset_id, self.assets[asset_id]) for asset_id in self.asset_order)
+
+        if config_diff.window_changed:
+            window_config = compiled.settings['window']
+            self.SetTitle(window_config['title'])
+            self.background_color = wx.Colour(window_config['background'])
+
+        self.action_engine.actions = compiled.actions
+        for index in config_diff.removed_triggers:
+            self.scheduler.remove(self.scheduled_triggers[index])
+        added_triggers = [time_trigger for time_trigger, match in zip(compiled.triggers, config_diff.trigger_matches)
+                          if match is None]
+        added_scheduled = iter(self.action_engine.add_triggers(added_triggers))
+        scheduled_triggers = []
+        for match in config_diff.trigger_matches:
+            if match is None:
+                scheduled = next(added_scheduled)
+            else:
+                scheduled = self.scheduled_triggers[match]
+                scheduled.actions = [compiled.actions[name] for name in scheduled.trigger.actions]
+            scheduled_triggers.append(scheduled)
+        self.scheduled_triggers = scheduled_triggers
+
+        self.split_layers(compiled)
+        self.compiled = compiled
+        self.invalidate_layout()
+        self.fit_to_assets()
+        self.calculate_active_region()
+        self.Refresh()
+        self.prefetch(config_diff.changed_assets + config_diff.added_assets)
+        self.start_timer()
+
+    def prefetch(self, asset_ids):
+        """
+        Queue lazy assets to be materialized while the user interface is idle.
+        """
+        if not self.loading_options.prefetch:
+            return
+        was_empty = not self.prefetch_queue
+        self.prefetch_queue.extend(asset_id for asset_id in asset_ids if not self.assets[asset_id].is_materialized)
+        if was_empty and self.prefetch_queue:
+            self.Bind(wx.EVT_IDLE, self.on_idle)
+
+    def on_paint(self, event: wx.PaintEvent):
+        dc = wx.PaintDC(self)
+        dc.DrawBitmap(self.get_static_layer(), 0, 0)
+
+        update_region = self.GetUpdateRegion()
+        gc = wx.GraphicsContext.Create(dc)
+        for asset_id in self.foreground_asset_ids:
+            a = self.assets.get(asset_id)
+            if a is not None and a.active and update_region.Contains(a.bounds) != wx.OutRegion:
+                a.draw(gc)
+
+    def on_dpi_changed(self, event: wx.DPIChangedEvent):
+        self.update_pixel_scale()
+        event.Skip()
+
+    def on_move(self, event: wx.MoveEvent):
+        # not every platform reports a changed pixel scale when the frame moves to another display
+        self.update_pixel_scale()
+        event.Skip()
+
+    def update_pixel_scale(self):
+        """
+        Switch to the bitmaps for the pixel scale of the display the frame is on, layout and regions stay the same.
+        """
+        pixel_scale = self.GetContentScaleFactor()
+        if pixel_scale == self.pixel_scale:
+            return
+        self.pixel_scale = pixel_scale
+        for a in self.assets.values():
+            a.set_pixel_scale(pixel_scale)
+        self.static_layer = None
+        self.Refresh()
+        self.prefetch(self.assets.keys())
+
+    def on_idle(self, event: wx.IdleEvent):
+        """
+        Materialize one lazy asset per idle event, so pending input is handled in between.
+        """
+        while self.prefetch_queue:
+            lazy_asset = self.assets.get(self.prefetch_queue.popleft())
+            if lazy_asset is not None and not lazy_asset.is_materialized:
+                lazy_asset.materialize()
+                break
+        if self.prefetch_queue:
+            event.RequestMore()
+        else:
+            self.Unbind(wx.EVT_IDLE, handler=self.on_idle)
+
+    def get_static_layer(self) -> wx.Bitmap:
+        """
+        Get the background with all static assets drawn onto it, it is rendered once and reused until invalidated.
+        """
+        if self.static_layer is None:
+            size = self.GetClientSize()
+            self.static_layer = wx.Bitmap()
+            self.static_layer.CreateScaled(size.width, size.height, wx.BITMAP_SCREEN_DEPTH, self.pixel_scale)
+            dc = wx.MemoryDC(self.static_layer)
+            dc.SetBackground(wx.Brush(self.background_color, wx.BRUSHSTYLE_SOLID))
+            dc.Clear()
+            gc = wx.GraphicsContext.Create(dc)
+            for asset_id, a in self.assets.items():
+                if asset_id in self.background_asset_ids:
+                    a.draw_active(gc)
+            del gc
+            dc.SelectObject(wx.NullBitmap)
+        return self.static_layer
+
+    def on_timer(self, event: wx.TimerEvent):
+        transaction = self.action_engine.run_due(self.asset_states)
+        self.advance_animations(transaction.firings)
+        self.commit(transaction.changes())
+
+        self.start_timer()
+
+    def advance_animations(self, firings):
+        """
+        Show the next frame of every animated asset whose trigger fired, shown frames are refreshed on the next commit.
+
+        :param firings: firings of one tick
+        """
+        for firing in firings:
+            time_trigger = firing.scheduled.trigger
+            if isinstance(time_trigger, trigger.AnimationTrigger) and time_trigger.asset_id in self.assets:
+                # only shown assets are animated
+                self.assets[time_trigger.asset_id].advance()
+                self.changed_assets.add(time_trigger.asset_id)
+
+    def commit(self, changes: dict):
+        """
+        Apply the asset changes of one tick with a single region calculation and refresh.
+
+        :param changes: new active state by asset id
+        """
+        if not changes and not self.changed_assets:
+            return
+        for asset_id, active in changes.items():
+            self.set_asset_active(asset_id, active)
+        self.calculate_active_region()
+        self.refresh_changed_assets()
+
+    def start_timer(self):
+        millis_until_next = self.scheduler.millis_until_next()
+        if millis_until_next is not None:
+            self.timer.StartOnce(min(max(1, millis_until_next), MAX_TIMER_WAIT))
+
+    def set_asset_active(self, asset_id, active: bool):
+        self.asset_states[asset_id] = active
+        if asset_id not in self.assets:
+            # still being loaded, the state is applied once the asset is added
+            return
+        self.assets[asset_id].active = active
+        if active:
+            self.start_animation(asset_id)
+        else:
+            self.stop_animation(asset_id)
+        self.changed_assets.add(asset_id)
+        if asset_id in self.background_asset_ids:
+            self.static_layer = None
+
+    def refresh_changed_assets(self):
+        """
+        Invalidate only the areas of assets that changed since the last refresh, they are repainted together.
+        """
+        for asset_id in self.changed_assets:
+            self.RefreshRect(self.assets[asset_id].bounds)
+        self.changed_assets.clear()
+
+    def move_assets(self, offset_x, offset_y):
+        for single_asset in self.assets.values():
+            single_asset.move(offset_x, offset_y)
+        self.origin = asset.Point(self.origin.x + offset_x, self.origin.y + offset_y)
+        self.invalidate_layout()
+
+    def invalidate_layout(self):
+        self.region_cache.clear()
+        self.region_signature = None
+        self.static_layer = None
+
+    def active_signature(self) -> tuple:
+        """
+        Identify the set of active assets as bitmask over the asset order together with the shown frames of the active
+        animated assets, their regions differ from frame to frame.
+        """
+        signature = 0
+        frames = []
+        for index, single_asset in enumerate(self.assets.values()):
+            if single_asset.active:
+                signature |= 1 << index
+                if isinstance(single_asset, asset.AnimatedAsset):
+                    frames.append(single_asset.frame)
+        return signature, tuple(frames)
+
+    def calculate_active_region(self):
+        """
+        Shape the window to the active assets.
+
+        The union of the active assets without animation is cached per set of them, the regions of the shown frames of
+        active animations are added to it only when the active assets or the frames changed.
+        """
+        signature = self.active_signature()
+        if signature == self.region_signature:
+            return
+        self.region_signature = signature
+        static_signature = 0
+        animated_assets = []
+        for index, single_asset in enumerate(self.assets.values()):
+            if single_asset.active:
+                if isinstance(single_asset, asset.AnimatedAsset):
+                    animated_assets.append(single_asset)
+                else:
+                    static_signature |= 1 << index
+        active_region = self.region_cache.get(static_signature)
+        if active_region is None:
+            active_region = wx.Region()
+            for index, single_asset in enumerate(self.assets.values()):
+                if static_signature & 1 << index:
+                    active_region.Union(single_asset.region)
+            self.region_cache.put(static_signature, active_region)
+        if animated_assets:
+            # the cached union stays untouched, the frames are added to a copy
+            active_region = wx.Region(active_region)
+            for animated in animated_assets:
+                active_region.Union(animated.region)
+        if active_region is not self.active_region:
+            self.active_region = active_region
+            self.SetShape(self.active_region)
@@ -0,0 +1,72 @@
+import collections
+import numpy
+
+MaskOptions = collections.namedtuple('MaskOptions', ['threshold', 'erode', 'dilate'], defaults=[1, 0, 0])
+MaskOptions.__doc__ = """
+Options for turning an alpha channel into a region mask.
+
+threshold: smallest alpha value that belongs to the region
+erode: number of erosion steps applied after thresholding, removes specks and thin antialiasing seams
+dilate: number of dilation steps applied after erosion, grows the mask back and closes small holes
+"""
+
+
+def load_mask_options(config) -> MaskOptions:
+    """
+    Read the ``mask`` section of an asset config.
+
+    :param config: mask config, may be None
+    :raise ValueError: when an option is out of range
+    """
+    if config is None:
+        return MaskOptions()
+    options = MaskOptions(
+        int(config.get('threshold', 1)),
+        int(config.get('erode', 0)),
+        int(config.get('dilate', 0)),
+    )
+    if not 0 <= options.threshold <= 255:
+        raise ValueError('Mask threshold must be between 0 and 255.', options.threshold)
+    if options.erode < 0 or options.dilate < 0:
+        raise ValueError('Mask erode and dilate steps must not be negative.', options)
+    return options
+
+
+def _neighbourhood(mask: numpy.ndarray, combine, border: bool) -> numpy.ndarray:
+    # a 3x3 square neighbourhood is separable into a horizontal and a vertical pass
+    padded = numpy.pad(mask, 1, constant_values=border)
+    horizontal = combine(combine(padded[:, :-2], padded[:, 1:-1]), padded[:, 2:])
+    return combine(combine(horizontal[:-2, :], horizontal[1:-1, :]), horizontal[2:, :])
+
+
+def erode(mask: numpy.ndarray, steps: int = 1) -> numpy.ndarray:
+    """
+    Shrink a mask, keeping only pixels whose whole 3x3 neighbourhood is set.
+
+    Pixels outside the mask count as set, so shapes touching the border are not eaten away from there.
+    """
+    for _ in range(steps):
+        mask = _neighbourhood(mask, numpy.logical_and, True)
+    return mask
+
+
+def dilate(mask: numpy.ndarray, steps: int = 1) -> numpy.ndarray:
+    """
+    Grow a mask, setting every pixel with at least one set pixel in its 3x3 neighbourhood.
+    """
+    for _ in range(steps):
+        mask = _neighbourhood(mask, numpy.logical_or, False)
+    return mask
+
+
+def create_mask(alpha: numpy.ndarray, options: MaskOptions = MaskOptions()) -> numpy.ndarray:
+    """
+    Create a region mask from an alpha channel.
+
+    :param alpha: array of shape (height, width) with alpha values from 0 to 255
+    :param options: threshold and clean up steps to apply
+    :return: boolean array of shape (height, width)
+    """
+    mask = alpha >= options.threshold
+    mask = erode(mask, options.erode)
+    return dilate(mask, options.dilate)
@@ -0,0 +1,111 @@
+import collections
+import numpy
+
+RegionOptions = collections.namedtuple('RegionOptions', ['tolerance', 'min_area'], defaults=[0, 0])
+RegionOptions.__doc__ = """
+Options for simplifying the rectangles making up a region.
+
+tolerance: number of pixels the left and right edges of vertically adjacent rectangles may differ to still be merged
+min_area: rectangles with a smaller area are dropped after merging
+"""
+
+RegionStatistics = collections.namedtuple('RegionStatistics', ['rectangles_before', 'rectangles_after'])
+
+
+def load_region_options(config) -> RegionOptions:
+    """
+    Read the ``region`` section of an asset config.
+
+    :param config: region config, may be None
+    :raise ValueError: when an option is negative
+    """
+    if config is None:
+        return RegionOptions()
+    options = RegionOptions(int(config.get('tolerance', 0)), int(config.get('min_area', 0)))
+    if options.tolerance < 0 or options.min_area < 0:
+        raise ValueError('Region tolerance and minimal area must not be negative.', options)
+    return options
+
+
+def mask_rectangles(mask: numpy.ndarray) -> numpy.ndarray:
+    """
+    Run-length encode a two dimensional mask into one pixel high rectangles.
+
+    Every horizontal run of set pixels in a row becomes one rectangle, so the union of all rectangles covers exactly
+    the set pixels of the mask.
+
+    :param mask: boolean array of shape (height, width)
+    :return: integer array of shape (n, 4) holding x, y, width and height of every rectangle
+    """
+    height, width = mask.shape
+    padded = numpy.zeros((height, width + 2), dtype=numpy.int8)
+    padded[:, 1:-1] = mask
+    edges = numpy.diff(padded, axis=1)
+    start_rows, start_columns = numpy.nonzero(edges == 1)
+    _, end_columns = numpy.nonzero(edges == -1)
+    rectangles = numpy.empty((len(start_rows), 4), dtype=numpy.int32)
+    rectangles[:, 0] = start_columns
+    rectangles[:, 1] = start_rows
+    rectangles[:, 2] = end_columns - start_columns
+    rectangles[:, 3] = 1
+    return rectangles
+
+
+def bounding_box(rectangles: numpy.ndarray):
+    """
+    Calculate the smallest rectangle containing all given rectangles.
+
+    :param rectangles: integer array of shape (n, 4) holding x, y, width and height of every rectangle
+    :return: tuple of x, y, width and height, all zero when there are no rectangles
+    """
+    if len(rectangles) == 0:
+        return 0, 0, 0, 0
+    left = int(rectangles[:, 0].min())
+    top = int(rectangles[:, 1].min())
+    right = int((rectangles[:, 0] + rectangles[:, 2]).max())
+    bottom = int((rectangles[:, 1] + rectangles[:, 3]).max())
+    return left, top, right - left, bottom - top
+
+
+def simplify(rectangles: numpy.ndarray, options: RegionOptions = RegionOptions()) -> numpy.ndarray:
+    """
+    Reduce the number of rectangles making up a region.
+
+    Rectangles are merged with the rectangle directly above them while the left and right edges of all rectangles
+    merged so far differ by at most the tolerance, the merged rectangle spans all of them. So every row covers at most
+    the tolerance more on each side. Afterwards rectangles smaller than the minimal area are dropped. With the default
+    options the covered area stays exactly the same.
+
+    :param rectangles: integer array of shape (n, 4) holding x, y, width and height of every rectangle, ordered by y
+                       and then x as returned by :func:`mask_rectangles`
+    :param options: tolerance and minimal area to apply
+    :return: integer array of shape (m, 4) with m <= n
+    """
+    tolerance = options.tolerance
+    # merged rectangles as [left, top, right, bottom, largest left edge, smallest right edge], the span from left to
+    # the largest left edge and from the smallest right edge to right must stay within the tolerance
+    merged = []
+    # indices of merged rectangles by their bottom edge, they may be extended downwards
+    open_by_bottom = collections.defaultdict(list)
+    for x, y, width, height in rectangles.tolist():
+        right = x + width
+        candidates = open_by_bottom.get(y, ())
+        for position, index in enumerate(candidates):
+            candidate = merged[index]
+            left, max_left = min(candidate[0], x), max(candidate[4], x)
+            min_right, max_right = min(candidate[5], right), max(candidate[2], right)
+            if max_left - left <= tolerance and max_right - min_right <= tolerance:
+                del candidates[position]
+                candidate[:] = [left, candidate[1], max_right, y + height, max_left, min_right]
+                open_by_bottom[y + height].append(index)
+                break
+        else:
+            open_by_bottom[y + height].append(len(merged))
+            merged.append([x, y, right, y + height, x, right])
+
+    simplified = numpy.array([candidate[:4] for candidate in merged], dtype=numpy.int32).reshape((-1, 4))
+    simplified[:, 2] -= simplified[:, 0]
+    simplified[:, 3] -= simplified[:, 1]
+    if options.min_area > 0:
+        simplified = simplified[simplified[:, 2] * simplified[:, 3] >= options.min_area]
+    return simplified
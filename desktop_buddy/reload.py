@@ -0,0 +1,61 @@
+"""
+Difference between two compilations of a configuration, so a running buddy applies only what changed.
+"""
+import collections
+import json
+from . import snapshot
+
+ConfigDiff = collections.namedtuple('ConfigDiff', ['kept_assets', 'changed_assets', 'added_assets', 'removed_assets',
+                                                   'trigger_matches', 'removed_triggers', 'window_changed'])
+ConfigDiff.__doc__ = """
+Changes between a running and a new compilation.
+
+kept_assets: ids of assets whose prepared data is the same object in both compilations
+changed_assets: ids of assets present in both compilations that were prepared again
+added_assets and removed_assets: ids of assets present in only one of the compilations
+trigger_matches: for every new trigger the index of an equally configured old trigger or None
+removed_triggers: indices of old triggers without an equally configured new trigger
+window_changed: whether the window section changed
+"""
+
+
+def _canonical(trigger_config) -> str:
+    return json.dumps(trigger_config, sort_keys=True, default=str)
+
+
+def match_triggers(old_configs: list, new_configs: list):
+    """
+    Pair triggers with identical configs, every old trigger is paired at most once.
+
+    :param old_configs: plain configs of the running triggers
+    :param new_configs: plain configs of the new triggers
+    :return: tuple of the old index for every new trigger or None and the list of unpaired old indices
+    """
+    unpaired = collections.defaultdict(collections.deque)
+    for index, trigger_config in enumerate(old_configs):
+        unpaired[_canonical(trigger_config)].append(index)
+    matches = []
+    for trigger_config in new_configs:
+        candidates = unpaired.get(_canonical(trigger_config))
+        matches.append(candidates.popleft() if candidates else None)
+    removed = sorted(index for indices in unpaired.values() for index in indices)
+    return matches, removed
+
+
+def diff(old: snapshot.CompiledConfig, new: snapshot.CompiledConfig) -> ConfigDiff:
+    """
+    :param old: compilation the buddy runs with
+    :param new: compilation created by :func:`snapshot.recompile` from the old one
+    """
+    kept, changed, added = [], [], []
+    for asset_id, prepared in new.prepared_assets.items():
+        if asset_id not in old.prepared_assets:
+            added.append(asset_id)
+        elif old.prepared_assets[asset_id] is prepared:
+            kept.append(asset_id)
+        else:
+            changed.append(asset_id)
+    removed = [asset_id for asset_id in old.prepared_assets if asset_id not in new.prepared_assets]
+    matches, removed_triggers = match_triggers(old.settings.get('trigger', []), new.settings.get('trigger', []))
+    window_changed = old.settings.get('window') != new.settings.get('window')
+    return ConfigDiff(kept, changed, added, removed, matches, removed_triggers, window_changed)
@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import collections
+import heapq
+import itertools
+from . import clock, trigger
+
+# activations later than this are handled according to the misfire policy of their trigger
+DEFAULT_MISFIRE_GRACE = 1000
+# upper bound of missed activations fired at once by triggers with the policy to fire all of them
+MAX_CATCH_UP = 1000
+
+Firing = collections.namedtuple('Firing', ['scheduled', 'deadline'])
+
+
+class ScheduledTrigger:
+    """
+    Handle of a trigger registered at a scheduler.
+
+    The handle keeps its identity while the trigger is re-armed, so state like attached actions can be stored on it.
+    """
+
+    def __init__(self, time_trigger) -> None:
+        self.trigger = time_trigger
+        self.active = None
+        self.deadline = None
+        self.actions = []
+        self.cancelled = False
+        self._sequence = None
+
+    @property
+    def latest(self):
+        """
+        Latest time in epoch milliseconds the trigger may fire at without misfiring, its deadline plus its slack.
+        """
+        return self.deadline + self.trigger.slack
+
+    def _is_current(self, sequence) -> bool:
+        return not self.cancelled and self._sequence == sequence
+
+    def __repr__(self) -> str:
+        return f'ScheduledTrigger({self.trigger!r}, deadline={self.deadline})'
+
+
+class Scheduler:
+    """
+    Priority queue of triggers ordered by their next activation in epoch milliseconds.
+
+    Only a trigger that fired is re-armed, which costs O(log n) independent of the number of scheduled triggers.
+
+    Triggers with slack may fire up to their slack later than their deadline. The scheduler wakes up at the earliest
+    latest allowed time and fires every trigger whose deadline passed by then, so triggers with overlapping windows
+    share a single wake-up. The statistics ``wakeups``, ``firings`` and ``saved_wakeups`` count the wake-ups that fired
+    triggers, the fired triggers and the wake-ups avoided by firing several triggers at once.
+    """
+
+    def __init__(self, misfire_grace: int = DEFAULT_MISFIRE_GRACE, scheduler_clock: clock.Clock = None) -> None:
+        if scheduler_clock is None:
+            scheduler_clock = clock.SystemClock()
+        self.clock = scheduler_clock
+        # ordered by deadline to find all due triggers
+        self._queue = []
+        # ordered by deadline plus slack to find the next wake-up, re-armed triggers leave stale entries behind
+        self._latest_queue = []
+        self._sequence = itertools.count()
+        self.misfire_grace = misfire_grace
+        self.wakeups = 0
+        self.firings = 0
+        self.saved_wakeups = 0
+
+    def add(self, time_trigger, now=None) -> ScheduledTrigger:
+        """
+        Activate and schedule a trigger.
+
+        :param time_trigger: time trigger to schedule
+        :param now: override the current time in epoch milliseconds
+        :return: handle of the scheduled trigger
+        """
+        if now is None:
+            now = self.clock.now_millis()
+        scheduled = ScheduledTrigger(time_trigger)
+        self._arm(scheduled, time_trigger.activate(now), now)
+        return scheduled
+
+    def add_all(self, triggers, now=None) -> list:
+        if now is None:
+            now = self.clock.now_millis()
+        return [self.add(time_trigger, now) for time_trigger in triggers]
+
+    def remove(self, scheduled: ScheduledTrigger):
+        # removed entries stay in the queues and are dropped once they reach their head
+        scheduled.cancelled = True
+
+    def _arm(self, scheduled: ScheduledTrigger, active, now: int):
+        scheduled.active = active
+        scheduled.deadline = now + active.millis_until_activation(now)
+        scheduled._sequence = next(self._sequence)
+        heapq.heappush(self._queue, (scheduled.deadline, scheduled._sequence, scheduled))
+        heapq.heappush(self._latest_queue, (scheduled.latest, scheduled._sequence, scheduled))
+
+    @staticmethod
+    def _discard_stale(queue):
+        while queue and not queue[0][2]._is_current(queue[0][1]):
+            heapq.heappop(queue)
+
+    def next_deadline(self):
+        """
+        :return: epoch milliseconds of the next activation or None when nothing is scheduled
+        """
+        self._discard_stale(self._queue)
+        if not self._queue:
+            return None
+        return self._queue[0][0]
+
+    def next_wakeup(self):
+        """
+        :return: epoch milliseconds at which the next triggers have to fire or None when nothing is scheduled
+        """
+        self._discard_stale(self._latest_queue)
+        if not self._latest_queue:
+            return None
+        return self._latest_queue[0][0]
+
+    def millis_until_next(self, now=None):
+        """
+        :param now: override the current time in epoch milliseconds
+        :return: milliseconds until the next wake-up, never negative, or None when nothing is scheduled
+        """
+        wakeup = self.next_wakeup()
+        if wakeup is None:
+            return None
+        if now is None:
+            now = self.clock.now_millis()
+        return max(0, wakeup - now)
+
+    def pop_due(self, now=None) -> list:
+        """
+        Take all due triggers and re-arm each of them for its next activation after now.
+
+        Activations missed by more than the grace period are fired once, fired all or skipped depending on the misfire
+        policy of their trigger.
+
+        :param now: override the current time in epoch milliseconds
+        :return: firings ordered by their deadline, a trigger may fire multiple times
+        """
+        if now is None:
+            now = self.clock.now_millis()
+        firings = []
+        fired_triggers = 0
+        while True:
+            deadline = self.next_deadline()
+            if deadline is None or deadline > now:
+                break
+            _, _, scheduled = heapq.heappop(self._queue)
+            scheduled_firings = self._fire(scheduled, now)
+            firings.extend(scheduled_firings)
+            fired_triggers += len(scheduled_firings) > 0
+        firings.sort(key=lambda firing: firing.deadline)
+        if fired_triggers:
+            self.wakeups += 1
+            self.firings += len(firings)
+            self.saved_wakeups += fired_triggers - 1
+        return firings
+
+    def _fire(self, scheduled: ScheduledTrigger, now: int) -> list:
+        deadline = scheduled.deadline
+        active = scheduled.active
+        misfire = scheduled.trigger.misfire
+        missed = now - scheduled.latest > self.misfire_grace
+        firings = []
+        if not missed or misfire != trigger.MISFIRE_SKIP:
+            firings.append(Firing(scheduled, deadline))
+        if not scheduled.trigger.repeat:
+            scheduled.cancelled = True
+            return firings
+        if missed and misfire == trigger.MISFIRE_ALL:
+            while len(firings) < MAX_CATCH_UP:
+                next_active = active.activate(deadline + 1)
+                next_deadline = deadline + 1 + next_active.millis_until_activation(deadline + 1)
+                if next_deadline > now:
+                    break
+                active, deadline = next_active, next_deadline
+                firings.append(Firing(scheduled, deadline))
+        rearm_time = max(now, deadline + 1)
+        self._arm(scheduled, active.activate(rearm_time), rearm_time)
+        return firings
+
+    def __len__(self):
+        return sum(1 for _, _, scheduled in self._queue if not scheduled.cancelled)
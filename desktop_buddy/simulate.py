@@ -0,0 +1,120 @@
+"""
+Replay the triggers of a configuration over a simulated time range as fast as possible.
+"""
+import collections
+import datetime
+import sys
+import time as sys_time
+from . import action, clock, config, scheduler, time, trigger
+
+FiringRecord = collections.namedtuple('FiringRecord', ['time', 'deadline', 'trigger_index'])
+ChangeRecord = collections.namedtuple('ChangeRecord', ['time', 'asset_id', 'active'])
+
+
+class SimulationResult:
+
+    def __init__(self, start: int, end: int) -> None:
+        self.start = start
+        self.end = end
+        self.firings = []
+        self.changes = []
+        # ticks whose actions changed at least one asset, each is one region calculation and repaint in the frame
+        self.commits = 0
+        self.wakeups = 0
+        self.saved_wakeups = 0
+        self.wall_seconds = 0.0
+
+    def firings_per_second(self) -> float:
+        if self.wall_seconds <= 0:
+            return float('inf')
+        return len(self.firings) / self.wall_seconds
+
+
+def simulate(triggers, start: int, end: int, actions: dict = None, asset_states: dict = None) -> SimulationResult:
+    """
+    Run a scheduler on a virtual clock from start to end and apply the actions of the fired triggers.
+
+    :param triggers: time triggers to schedule
+    :param start: epoch milliseconds the simulation starts at
+    :param end: epoch milliseconds the simulation stops at, firings at this instant are included
+    :param actions: configured actions by their name, needed when triggers name actions
+    :param asset_states: initial active state of the assets by their id
+    :return: every firing, every asset change and statistics of the run
+    """
+    virtual_clock = clock.VirtualClock(start)
+    trigger_scheduler = scheduler.Scheduler(scheduler_clock=virtual_clock)
+    engine = action.ActionEngine({} if actions is None else actions, trigger_scheduler)
+    indices = {id(scheduled): index for index, scheduled in enumerate(engine.add_triggers(triggers))}
+    states = {} if asset_states is None else dict(asset_states)
+    result = SimulationResult(start, end)
+    started = sys_time.perf_counter()
+    while True:
+        wakeup = trigger_scheduler.next_wakeup()
+        if wakeup is None or wakeup > end:
+            break
+        virtual_clock.set(max(wakeup, virtual_clock.now_millis()))
+        now = virtual_clock.now_millis()
+        transaction = engine.run_due(states, now)
+        for firing in transaction.firings:
+            # deferred actions fire through one-shot triggers that are not part of the configuration
+            if id(firing.scheduled) in indices:
+                result.firings.append(FiringRecord(now, firing.deadline, indices[id(firing.scheduled)]))
+        changes = transaction.changes()
+        for asset_id, active in changes.items():
+            states[asset_id] = active
+            result.changes.append(ChangeRecord(now, asset_id, active))
+        result.commits += bool(changes)
+    result.wall_seconds = sys_time.perf_counter() - started
+    result.wakeups = trigger_scheduler.wakeups
+    result.saved_wakeups = trigger_scheduler.saved_wakeups
+    return result
+
+
+def _format_millis(epoch_millis: int) -> str:
+    return datetime.datetime.fromtimestamp(epoch_millis / 1000).astimezone().isoformat(timespec='seconds')
+
+
+def _describe_trigger(trigger_config) -> str:
+    return ', '.join(f'{key}: {value}' for key, value in dict(trigger_config).items())
+
+
+def add_arguments(parser):
+    parser.add_argument('--start', help='ISO date and time to start at, defaults to now')
+    parser.add_argument('--duration', default='30 days', help='simulated time span, e.g. "30 days"')
+    parser.add_argument('--quiet', action='store_true', help='only print the statistics')
+
+
+def main(arguments, output=sys.stdout) -> int:
+    desky_config = config.load_config(arguments.config)
+    trigger_configs = desky_config.get('trigger', [])
+    triggers = trigger.load_trigger(trigger_configs).trigger_list
+    assets_config = desky_config.get('assets', {})
+    actions = action.load_actions(desky_config.get('actions', {}))
+    action.check_actions(actions, triggers, assets_config.keys())
+    asset_states = {asset_id: asset_config.get('active', True) for asset_id, asset_config in assets_config.items()}
+    if arguments.start is None:
+        start = time.now_millis()
+    else:
+        start = time.to_milli_seconds(datetime.datetime.fromisoformat(arguments.start).astimezone())
+    end = start + time.parse_time_duration(arguments.duration)
+
+    result = simulate(triggers, start, end, actions, asset_states)
+
+    if not arguments.quiet:
+        lines = []
+        for record in result.firings:
+            late = record.time - record.deadline
+            description = _describe_trigger(trigger_configs[record.trigger_index])
+            line = f'{_format_millis(record.time)}  +{late}ms  #{record.trigger_index} {description}'
+            lines.append((record.time, 0, line))
+        for record in result.changes:
+            change = 'shown' if record.active else 'hidden'
+            lines.append((record.time, 1, f'{_format_millis(record.time)}  {record.asset_id} {change}'))
+        for _, _, line in sorted(lines, key=lambda entry: entry[:2]):
+            print(line, file=output)
+    print(f'simulated {_format_millis(start)} to {_format_millis(end)}', file=output)
+    print(f'{len(result.firings)} firings in {result.wakeups} wake-ups, '
+          f'{result.saved_wakeups} wake-ups saved by coalescing', file=output)
+    print(f'{len(result.changes)} asset changes in {result.commits} commits', file=output)
+    print(f'{result.wall_seconds:.3f} s wall time, {result.firings_per_second():,.0f} firings per second', file=output)
+    return 0
@@ -0,0 +1,320 @@
+"""
+Compiled snapshot of a configuration, so startup can skip parsing, denormalizing and preparing images.
+"""
+import collections
+import hashlib
+import os
+import pathlib
+import pickle
+import tempfile
+from . import action, cache, config, trigger
+
+SNAPSHOT_SUFFIX = '.snapshot'
+_MAGIC = b'desktop_buddy snapshot\n'
+# increment whenever the content of compiled configs changes
+_SNAPSHOT_VERSION = 4
+
+SourceSignature = collections.namedtuple('SourceSignature', ['size', 'mtime_ns', 'digest'])
+SourceSignature.__doc__ = """
+Identity of a file a snapshot was compiled from.
+
+size and mtime_ns: cheap to compare, when both match the file is assumed unchanged
+digest: SHA-256 of the content, compared when the file was touched without necessarily changing
+"""
+
+
+def source_signature(file) -> SourceSignature:
+    stat = os.stat(file)
+    return SourceSignature(stat.st_size, stat.st_mtime_ns, cache.file_digest(file))
+
+
+def _is_unchanged(file, signature: SourceSignature) -> bool:
+    try:
+        stat = os.stat(file)
+    except OSError:
+        return False
+    if stat.st_size != signature.size:
+        return False
+    if stat.st_mtime_ns == signature.mtime_ns:
+        return True
+    return cache.file_digest(file) == signature.digest
+
+
+class CompiledConfig:
+    """
+    Configuration with its triggers denormalized and its assets prepared, everything needed to show the buddy.
+
+    :param settings: plain copy of the configuration as returned by :func:`config.to_plain`
+    :param prepared_assets: prepared assets by their id
+    :param triggers: denormalized time triggers
+    :param sources: signatures of the configuration and asset files by their path
+    :param actions: configured actions by their name
+    """
+
+    def __init__(self, settings: dict, prepared_assets: collections.OrderedDict, triggers: list,
+                 sources: dict, actions: dict = None) -> None:
+        self.settings = settings
+        self.prepared_assets = prepared_assets
+        self.triggers = triggers
+        self.sources = sources
+        self.actions = {} if actions is None else actions
+
+    def copy(self) -> 'CompiledConfig':
+        """
+        Copy whose prepared assets and sources can be changed without affecting this compiled configuration.
+        """
+        return CompiledConfig(self.settings, collections.OrderedDict(self.prepared_assets), self.triggers,
+                              dict(self.sources), self.actions)
+
+    def is_valid(self) -> bool:
+        """
+        Check that no source file changed and that all cached images still exist.
+        """
+        for file, signature in self.sources.items():
+            if not _is_unchanged(file, signature):
+                return False
+        return all(os.path.isfile(prepared.image) for prepared in self.prepared_assets.values())
+
+
+class Compilation:
+    """
+    Compiled configuration that is filled asset by asset, so assets can be shown before all of them are prepared.
+
+    The configuration is parsed and the triggers are denormalized right away, :attr:`compiled` holds them together with
+    the assets prepared so far.
+
+    :param config_file: path of the configuration file
+    """
+
+    def __init__(self, config_file=config.DEFAULT_CONFIG_FILE) -> None:
+        # asset preparation needs numpy, loading a snapshot only imports the modules of the pickled objects
+        from . import asset
+        self.config_file = config_file
+        desky_config = config.load_config(config_file)
+        self.assets_config = desky_config.get('assets', {})
+        self.file_cache = cache.load_cache(desky_config.get('cache'))
+        self.loading_options = asset.load_loading_options(desky_config.get('loading'))
+        triggers = trigger.load_trigger(desky_config.get('trigger', [])).trigger_list
+        actions = action.load_actions(desky_config.get('actions', {}))
+        action.check_actions(actions, triggers, self.assets_config.keys())
+        sources = {str(config_file): source_signature(config_file)}
+        self.compiled = CompiledConfig(config.to_plain(desky_config), collections.OrderedDict(), triggers, sources,
+                                       actions)
+
+    @property
+    def primary_asset_id(self):
+        """
+        Id of the asset to show first or None when there are no assets.
+        """
+        primary = self.loading_options.primary
+        if primary is None:
+            return next(iter(self.assets_config), None)
+        if primary not in self.assets_config:
+            raise ValueError('Unknown primary asset.', primary)
+        return primary
+
+    def reuse(self, previous: CompiledConfig) -> list:
+        """
+        Take over the prepared assets of a previous compilation whose config and image file did not change.
+
+        :param previous: earlier compilation of the same configuration file
+        :return: ids of the reused assets
+        """
+        from . import asset
+        reused = []
+        previous_assets_config = previous.settings.get('assets', {})
+        for asset_id, asset_config in self.assets_config.items():
+            prepared = previous.prepared_assets.get(asset_id)
+            if prepared is None or config.to_plain(asset_config) != previous_assets_config.get(asset_id):
+                continue
+            signatures = {file: previous.sources.get(file) for file in asset.source_files(asset_config)}
+            if not all(signature is not None and _is_unchanged(file, signature)
+                       for file, signature in signatures.items()):
+                continue
+            if not os.path.isfile(prepared.image):
+                continue
+            self.compiled.sources.update(signatures)
+            self.compiled.prepared_assets[asset_id] = prepared
+            reused.append(asset_id)
+        return reused
+
+    @property
+    def remaining_asset_ids(self) -> list:
+        return [asset_id for asset_id in self.assets_config if asset_id not in self.compiled.prepared_assets]
+
+    def prepare(self, asset_ids):
+        """
+        Prepare assets and add them to the compiled configuration.
+
+        :param asset_ids: ids of the assets to prepare
+        :return: iterator of asset ids and prepared assets as they become ready
+        """
+        from . import asset
+        assets_config = collections.OrderedDict((asset_id, self.assets_config[asset_id]) for asset_id in asset_ids)
+        prepared_items = asset.iterate_prepared_assets(assets_config, self.file_cache, self.loading_options.workers)
+        for asset_id, prepared in prepared_items:
+            for image_file in asset.source_files(assets_config[asset_id]):
+                self.compiled.sources[image_file] = source_signature(image_file)
+            self.compiled.prepared_assets[asset_id] = prepared
+            yield asset_id, prepared
+        # keep the order of the configuration no matter in which order the assets were prepared
+        self.compiled.prepared_assets = collections.OrderedDict(
+            (asset_id, self.compiled.prepared_assets[asset_id])
+            for asset_id in self.assets_config if asset_id in self.compiled.prepared_assets)
+
+
+def compile_config(config_file=config.DEFAULT_CONFIG_FILE) -> CompiledConfig:
+    """
+    Load a configuration and do all the work that only depends on its files.
+
+    :param config_file: path of the configuration file
+    """
+    compilation = Compilation(config_file)
+    for _ in compilation.prepare(compilation.remaining_asset_ids):
+        pass
+    return compilation.compiled
+
+
+def recompile(config_file, previous: CompiledConfig) -> CompiledConfig:
+    """
+    Compile a configuration again after it or one of its files changed.
+
+    Only assets whose config or image file changed are prepared again, all others keep their prepared data, so callers
+    can tell unchanged assets by identity.
+
+    :param config_file: path of the configuration file
+    :param previous: current compilation of the configuration
+    """
+    compilation = Compilation(config_file)
+    compilation.reuse(previous)
+    for _ in compilation.prepare(compilation.remaining_asset_ids):
+        pass
+    return compilation.compiled
+
+
+def default_snapshot_path(config_file=config.DEFAULT_CONFIG_FILE) -> pathlib.Path:
+    """
+    :param config_file: path of the configuration file
+    :return: path of the snapshot in the cache directory, distinct for every configuration file
+    """
+    name = hashlib.sha256(os.fsencode(os.path.abspath(config_file))).hexdigest()[:16]
+    return cache.default_cache_directory() / 'snapshots' / (name + SNAPSHOT_SUFFIX)
+
+
+def save_snapshot(compiled: CompiledConfig, path) -> pathlib.Path:
+    """
+    Atomically write a compiled configuration to a file.
+
+    :param compiled: compiled configuration to save
+    :param path: path of the snapshot file
+    :return: path of the snapshot file
+    """
+    path = pathlib.Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    descriptor, temporary = tempfile.mkstemp(prefix='.' + path.name + '-', dir=path.parent)
+    try:
+        with os.fdopen(descriptor, 'wb') as snapshot_file:
+            snapshot_file.write(_MAGIC)
+            pickle.dump((_SNAPSHOT_VERSION, compiled), snapshot_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary, path)
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+    return path
+
+
+def load_snapshot(path):
+    """
+    Read a compiled configuration from a file.
+
+    :param path: path of the snapshot file
+    :return: the compiled configuration or None when the snapshot is missing, unreadable or outdated
+    """
+    try:
+        with open(path, 'rb') as snapshot_file:
+            if snapshot_file.read(len(_MAGIC)) != _MAGIC:
+                return None
+            version, compiled = pickle.load(snapshot_file)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, TypeError, ValueError):
+        # snapshots written by other versions may refer to classes that changed or no longer exist
+        return None
+    if version != _SNAPSHOT_VERSION or not compiled.is_valid():
+        return None
+    return compiled
+
+
+def _save_if_possible(compiled: CompiledConfig, path):
+    try:
+        save_snapshot(compiled, path)
+    except OSError:
+        # a read-only cache only costs startup time
+        pass
+
+
+def load_or_compile(config_file=config.DEFAULT_CONFIG_FILE, path=None) -> CompiledConfig:
+    """
+    Use the snapshot of a configuration when it is valid, otherwise compile the configuration and update the snapshot.
+
+    :param config_file: path of the configuration file
+    :param path: path of the snapshot file, defaults to :func:`default_snapshot_path`
+    """
+    if path is None:
+        path = default_snapshot_path(config_file)
+    compiled = load_snapshot(path)
+    if compiled is None:
+        compiled = compile_config(config_file)
+        _save_if_possible(compiled, path)
+    return compiled
+
+
+def load_or_start_compilation(config_file=config.DEFAULT_CONFIG_FILE, path=None):
+    """
+    Use the snapshot of a configuration when it is valid, otherwise compile as much as needed to show the buddy.
+
+    With progressive loading only the primary asset is prepared, :func:`finish_compilation` prepares the remaining
+    assets and updates the snapshot.
+
+    :param config_file: path of the configuration file
+    :param path: path of the snapshot file, defaults to :func:`default_snapshot_path`
+    :return: tuple of the compiled configuration and the compilation of the remaining assets, the compilation is None
+             when nothing remains to be done, otherwise it keeps filling its own copy of the compiled configuration
+    """
+    if path is None:
+        path = default_snapshot_path(config_file)
+    compiled = load_snapshot(path)
+    if compiled is not None:
+        return compiled, None
+    compilation = Compilation(config_file)
+    asset_ids = compilation.remaining_asset_ids
+    if compilation.loading_options.progressive and asset_ids:
+        asset_ids = [compilation.primary_asset_id]
+    for _ in compilation.prepare(asset_ids):
+        pass
+    if compilation.remaining_asset_ids:
+        # the remaining assets are usually prepared in another thread than the one using the returned configuration
+        return compilation.compiled.copy(), compilation
+    _save_if_possible(compilation.compiled, path)
+    return compilation.compiled, None
+
+
+def finish_compilation(compilation: Compilation, path=None):
+    """
+    Prepare the remaining assets of a compilation and update the snapshot.
+
+    :param compilation: compilation started by :func:`load_or_start_compilation`
+    :param path: path of the snapshot file, defaults to :func:`default_snapshot_path`
+    :return: iterator of asset ids and prepared assets as they become ready
+    """
+    if path is None:
+        path = default_snapshot_path(compilation.config_file)
+    yield from compilation.prepare(compilation.remaining_asset_ids)
+    _save_if_possible(compilation.compiled, path)
+
+
+def main(arguments) -> int:
+    path = arguments.snapshot
+    if path is None:
+        path = default_snapshot_path(arguments.config)
+    path = save_snapshot(compile_config(arguments.config), path)
+    print(f'compiled {arguments.config} to {path}')
+    return 0
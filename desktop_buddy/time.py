@@ -1,9 +1,13 @@
+import datetime
+import functools
 import math
 import re
 import time as sys_time
-import wx
+import zoneinfo
 
 duration_pattern = re.compile(r'(\d+)\s*([a-zA-Z]*)')
+# allowed between the parts of a duration like "2 minutes, 30 seconds"
+_DURATION_SEPARATORS = ' \t,'
 
 
 def parse_time_duration(time_duration_string: str):
@@ -26,12 +30,22 @@ def parse_time_duration(time_duration_string: str):
 
     :param time_duration_string: string to parse
     :return: duration in milliseconds
+    :raise InvalidDurationException: when the string is not made of durations
+    :raise InvalidUnitException: when a unit is unknown
     """
+    if not isinstance(time_duration_string, str):
+        raise InvalidDurationException(message=f'Duration has to be a string: {time_duration_string!r}')
     time = 0
+    end = 0
     for time_duration_match in duration_pattern.finditer(time_duration_string):
+        if time_duration_string[end:time_duration_match.start()].strip(_DURATION_SEPARATORS):
+            break
         time_in_units = int(time_duration_match.group(1))
         time_unit = time_duration_match.group(2).lower()
         time += time_to_milli_seconds(time_in_units, time_unit)
+        end = time_duration_match.end()
+    if end == 0 or time_duration_string[end:].strip(_DURATION_SEPARATORS):
+        raise InvalidDurationException(message='Invalid duration: ' + time_duration_string)
     return time
 
 
@@ -63,52 +77,217 @@ def time_to_milli_seconds(time: int, unit: str) -> int:
     raise InvalidUnitException(message='Invalid unit: ' + unit)
 
 
-def parse_time_instant(time_instant_string: str) -> wx.DateTime:
-    time = wx.DateTime()
-    if time.ParseTime(time_instant_string) == -1:
+MILLIS_PER_DAY = 24 * 60 * 60 * 1000
+
+instant_pattern = re.compile(r'^\s*(\d{1,2})(?::(\d{2}))?(?::(\d{2})(?:\.(\d{1,3}))?)?\s*([ap]\.?m\.?)?\s*$',
+                             re.IGNORECASE)
+named_instants = {
+    'midnight': 0,
+    'noon': MILLIS_PER_DAY // 2,
+}
+
+
+def parse_time_instant(time_instant_string: str) -> int:
+    """
+    Parse strings depicting a time of day to milliseconds since midnight.
+
+    The format follows the pattern "13:05", "13:05:30", "13:05:30.250" or "1:05 pm". Hours without minutes are only
+    accepted together with am or pm. The names "midnight" and "noon" are understood as well.
+
+    :param time_instant_string: string to parse
+    :return: milliseconds since midnight in local wall clock time
+    :raise InvalidInstantException: when the string is not a valid time of day
+    """
+    if not isinstance(time_instant_string, str):
+        raise InvalidInstantException(message=f'Instant has to be a string: {time_instant_string!r}')
+    named_instant = named_instants.get(time_instant_string.strip().casefold())
+    if named_instant is not None:
+        return named_instant
+    match = instant_pattern.match(time_instant_string)
+    if match is None:
         raise InvalidInstantException(message='Invalid instant: ' + time_instant_string)
-    return time
+    hours, minutes, seconds, fraction, meridiem = match.groups()
+    hours = int(hours)
+    if meridiem is None:
+        if minutes is None or hours > 23:
+            raise InvalidInstantException(message='Invalid instant: ' + time_instant_string)
+    else:
+        if not 1 <= hours <= 12:
+            raise InvalidInstantException(message='Invalid instant: ' + time_instant_string)
+        hours = hours % 12 + (12 if meridiem[0].casefold() == 'p' else 0)
+    minutes = int(minutes or 0)
+    seconds = int(seconds or 0)
+    if minutes > 59 or seconds > 59:
+        raise InvalidInstantException(message='Invalid instant: ' + time_instant_string)
+    millis = int((fraction or '0').ljust(3, '0'))
+    return ((hours * 60 + minutes) * 60 + seconds) * 1000 + millis
 
 
-def set_to_future(date_time: wx.DateTime, now: wx.DateTime = None) -> wx.DateTime:
+def get_timezone(name):
     """
-    Set date so that the time is nearest to now but in the future.
+    Look up a timezone by its IANA name.
 
-    :param date_time: DateTime to modify
-    :param now: Override now to compare to
-    :return: same modified DateTime
+    :param name: name like "Europe/Berlin", None selects the local timezone of the system
+    :return: timezone or None for the local timezone
+    :raise InvalidTimezoneException: when there is no such timezone
     """
-    now = to_date_time(now)
-    diff = now.DiffAsDateSpan(date_time)
-    date_time.Add(diff)
-    now.IsLaterThan(date_time) and date_time.Add(wx.DateSpan.Day())
-    return date_time
+    if name is None:
+        return None
+    try:
+        return zoneinfo.ZoneInfo(name)
+    except (zoneinfo.ZoneInfoNotFoundError, ValueError, TypeError) as exception:
+        raise InvalidTimezoneException(exception, message='Invalid timezone: ' + str(name))
 
 
-def milli_seconds_until(date_time: wx.DateTime, now: wx.DateTime = None):
-    if now is None:
-        now = wx.DateTime.UNow()
-    time_span = date_time.Subtract(now)
-    return time_span.GetMilliseconds()
+_EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
 
 
-def to_milli_seconds(now):
-    if isinstance(now, wx.DateTime):
-        return now.GetValue()
-    if isinstance(now, int):
-        return now
-    raise TimeException(message='cannot convert ' + type(now) + ' to milli seconds')
+def _midnight_millis(date: datetime.date, timezone) -> int:
+    midnight = datetime.datetime.combine(date, datetime.time.min, tzinfo=timezone)
+    # naive datetimes are interpreted in the local timezone of the system
+    return round(midnight.timestamp() * 1000)
 
 
-def to_date_time(now) -> wx.DateTime:
-    if isinstance(now, wx.DateTime):
-        return now
-    date_time = wx.DateTime()
+def _wall_clock_millis(date: datetime.date) -> int:
+    # local midnight of the date read as if it were UTC, minus its epoch milliseconds gives the offset at midnight
+    return (date.toordinal() - _EPOCH_ORDINAL) * MILLIS_PER_DAY
+
+
+def _utc_offset_millis(epoch_millis: int, timezone) -> int:
+    utc = datetime.datetime.fromtimestamp(epoch_millis // 1000, datetime.timezone.utc)
+    local = utc.astimezone(timezone) if timezone is not None else utc.astimezone()
+    return local.utcoffset() // datetime.timedelta(milliseconds=1)
+
+
+class LocalDay:
+    """
+    One calendar day in a timezone, mapping between local times of day and epoch milliseconds with integer arithmetic.
+
+    A day contains at most one offset change. Times of day skipped by a forward change resolve to the moment of the
+    change, times of day repeated by a backward change resolve to their first occurrence.
+    """
+
+    __slots__ = ('ordinal', 'timezone', 'midnight', 'end', 'transition', 'shift')
+
+    def __init__(self, ordinal: int, timezone=None) -> None:
+        date = datetime.date.fromordinal(ordinal)
+        self.ordinal = ordinal
+        self.timezone = timezone
+        self.midnight = _midnight_millis(date, timezone)
+        self.end = _midnight_millis(date + datetime.timedelta(days=1), timezone)
+        # offsets of the wall clock at the start and the end of the day, when a change skips midnight the day starts
+        # with the offset from before the change
+        start_offset = _wall_clock_millis(date) - self.midnight
+        end_offset = _wall_clock_millis(date + datetime.timedelta(days=1)) - self.end
+        # elapsed milliseconds since midnight when the offset changes and by how much the wall clock jumps forward
+        self.transition = None
+        self.shift = end_offset - start_offset
+        if self.shift:
+            # the change may happen right at the first instant of the day
+            lower, upper = self.midnight - 1000, self.end
+            while upper - lower > 1000:
+                middle = (lower + upper) // 2 // 1000 * 1000
+                if middle <= lower:
+                    break
+                if _utc_offset_millis(middle, timezone) == start_offset:
+                    lower = middle
+                else:
+                    upper = middle
+            self.transition = upper - self.midnight
+
+    def to_epoch_millis(self, time_of_day: int) -> int:
+        """
+        :param time_of_day: milliseconds since midnight in local wall clock time
+        :return: epoch milliseconds of that time on this day
+        """
+        transition = self.transition
+        if transition is None or time_of_day < transition:
+            return self.midnight + time_of_day
+        if time_of_day < transition + self.shift:
+            return self.midnight + transition
+        return self.midnight + time_of_day - self.shift
+
+    def time_of_day(self, epoch_millis: int) -> int:
+        """
+        :param epoch_millis: instant within this day
+        :return: milliseconds since midnight in local wall clock time
+        """
+        elapsed = epoch_millis - self.midnight
+        if self.transition is None or elapsed < self.transition:
+            return elapsed
+        return elapsed + self.shift
+
+    def __contains__(self, epoch_millis: int) -> bool:
+        return self.midnight <= epoch_millis < self.end
+
+    def following(self) -> 'LocalDay':
+        return local_day_of_ordinal(self.ordinal + 1, self.timezone)
+
+    def weekday(self) -> int:
+        """
+        :return: day of the week, Monday is 0 and Sunday is 6
+        """
+        return (self.ordinal - 1) % 7
+
+    def date(self) -> datetime.date:
+        return datetime.date.fromordinal(self.ordinal)
+
+
+@functools.lru_cache(maxsize=64)
+def local_day_of_ordinal(ordinal: int, timezone=None) -> LocalDay:
+    """
+    :param ordinal: proleptic Gregorian ordinal of the date, see :meth:`datetime.date.toordinal`
+    :param timezone: timezone of the calendar, None for the local timezone of the system
+    """
+    return LocalDay(ordinal, timezone)
+
+
+_last_local_days = {}
+
+
+def local_day(epoch_millis: int, timezone=None) -> LocalDay:
+    """
+    Find the calendar day containing an instant.
+
+    :param epoch_millis: instant to look up
+    :param timezone: timezone of the calendar, None for the local timezone of the system
+    """
+    day = _last_local_days.get(timezone)
+    if day is not None and day.midnight <= epoch_millis < day.end:
+        return day
+    utc = datetime.datetime.fromtimestamp(epoch_millis // 1000, datetime.timezone.utc)
+    local = utc.astimezone(timezone) if timezone is not None else utc.astimezone()
+    day = local_day_of_ordinal(local.toordinal(), timezone)
+    if epoch_millis < day.midnight:
+        day = local_day_of_ordinal(day.ordinal - 1, timezone)
+    elif epoch_millis >= day.end:
+        day = day.following()
+    _last_local_days[timezone] = day
+    return day
+
+
+def next_time_of_day(time_of_day: int, now: int, timezone=None) -> int:
+    """
+    Find the next occurrence of a time of day that is not before now.
+
+    :param time_of_day: milliseconds since midnight in local wall clock time
+    :param now: epoch milliseconds to start from
+    :param timezone: timezone of the wall clock, None for the local timezone of the system
+    :return: epoch milliseconds of the occurrence
+    """
+    day = local_day(now, timezone)
+    occurrence = day.to_epoch_millis(time_of_day)
+    if occurrence < now:
+        occurrence = day.following().to_epoch_millis(time_of_day)
+    return occurrence
+
+
+def to_milli_seconds(now) -> int:
     if isinstance(now, int):
-        date_time.SetTimeT(now // 1000)
-        date_time.SetMillisecond(now % 1000)
-        return date_time
-    raise TimeException(message='cannot convert ' + type(now) + ' to date time')
+        return now
+    if isinstance(now, datetime.datetime):
+        return round(now.timestamp() * 1000)
+    raise TimeException(message='cannot convert ' + str(type(now)) + ' to milli seconds')
 
 
 def now_millis():
@@ -131,3 +310,11 @@ class InvalidInstantException(TimeException):
 
 class InvalidUnitException(TimeException):
     pass
+
+
+class InvalidDurationException(TimeException):
+    pass
+
+
+class InvalidTimezoneException(TimeException):
+    pass
@@ -2,8 +2,13 @@ from __future__ import annotations
 
 from abc import ABC
 
-import wx
-from . import time, denormalize
+from . import cron, time, denormalize
+
+# how a scheduler handles activations missed by more than its grace period, e.g. while the machine was suspended
+MISFIRE_ONCE = 'once'
+MISFIRE_ALL = 'all'
+MISFIRE_SKIP = 'skip'
+MISFIRE_POLICIES = (MISFIRE_ONCE, MISFIRE_ALL, MISFIRE_SKIP)
 
 
 class ActiveTimeTrigger(ABC):
@@ -31,6 +36,14 @@ class ActiveTimeTrigger(ABC):
 
 class TimeTrigger(ABC):
 
+    misfire = MISFIRE_ONCE
+    # milliseconds the activation may be delayed to share a wake-up with other triggers
+    slack = 0
+    # False for triggers that fire only once after being scheduled
+    repeat = True
+    # names of the actions run when the trigger fires
+    actions = ()
+
     def activate(self, now=None) -> ActiveTimeTrigger:
         raise NotImplementedError()
 
@@ -66,62 +79,195 @@ class ActiveTriggerList(TriggerList, ActiveTimeTrigger):
         return self.trigger_list[0].millis_until_activation(now)
 
 
-class TimeInstantTrigger(TimeTrigger, ActiveTimeTrigger):
+class TimeInstantTrigger(TimeTrigger):
 
-    def __init__(self, trigger_time: wx.DateTime) -> None:
-        self.trigger_time = trigger_time
-        self.trigger_time_millis = time.to_milli_seconds(trigger_time)
+    def __init__(self, time_of_day: int, timezone=None) -> None:
+        """
+        :param time_of_day: milliseconds since midnight in local wall clock time
+        :param timezone: timezone of the wall clock, None for the local timezone of the system
+        """
+        self.time_of_day = time_of_day
+        self.timezone = timezone
 
-    def activate(self, now=None) -> ActiveTimeTrigger:
+    def activate(self, now=None) -> ActiveTimeInstantTrigger:
         if now is None:
             now = time.now_millis()
-        trigger_time = wx.DateTime(self.trigger_time)
-        time.set_to_future(trigger_time, now)
-        return TimeInstantTrigger(trigger_time)
+        else:
+            now = time.to_milli_seconds(now)
+        activation = time.next_time_of_day(self.time_of_day, now, self.timezone)
+        return ActiveTimeInstantTrigger(self.time_of_day, activation, self.timezone)
+
+    def __eq__(self, other):
+        if type(other) is TimeInstantTrigger:
+            return self.time_of_day == other.time_of_day and self.timezone == other.timezone
+        else:
+            return NotImplemented
+
+    def __lt__(self, other):
+        if type(other) is TimeInstantTrigger:
+            return self.time_of_day < other.time_of_day
+        else:
+            return NotImplemented
+
+
+class ActiveTimeInstantTrigger(TimeInstantTrigger, ActiveTimeTrigger):
+
+    def __init__(self, time_of_day: int, activation: int, timezone=None) -> None:
+        """
+        :param time_of_day: milliseconds since midnight in local wall clock time
+        :param activation: epoch milliseconds of the next occurrence
+        :param timezone: timezone of the wall clock, None for the local timezone of the system
+        """
+        super().__init__(time_of_day, timezone)
+        self.activation = activation
 
     def millis_until_activation(self, now=None) -> int:
         if now is None:
             now = time.now_millis()
-        return self.trigger_time_millis - time.to_milli_seconds(now)
+        return self.activation - time.to_milli_seconds(now)
 
     def __eq__(self, other):
-        if isinstance(other, TimeInstantTrigger):
-            return self.trigger_time.IsEqualTo(other.trigger_time)
+        if isinstance(other, ActiveTimeInstantTrigger):
+            return self.activation == other.activation
         else:
-            return super().__eq__(other)
+            return ActiveTimeTrigger.__eq__(self, other)
 
     def __lt__(self, other):
-        if isinstance(other, TimeInstantTrigger):
-            return self.trigger_time.IsEarlierThan(other.trigger_time)
+        if isinstance(other, ActiveTimeInstantTrigger):
+            return self.activation < other.activation
         else:
-            return super().__lt__(other)
+            return ActiveTimeTrigger.__lt__(self, other)
 
 
-class TimeInstantListTrigger(TimeTrigger, ActiveTimeTrigger):
+class TimeInstantListTrigger(TimeTrigger):
 
-    def __init__(self, trigger_times) -> None:
-        if len(trigger_times) <= 1:
+    def __init__(self, times_of_day, timezone=None) -> None:
+        """
+        :param times_of_day: milliseconds since midnight in local wall clock time, sorted and deduplicated here once
+        :param timezone: timezone of the wall clock, None for the local timezone of the system
+        """
+        self.times_of_day = tuple(sorted(set(times_of_day)))
+        if not self.times_of_day:
             raise ValueError()
-        self.sub_trigger = []
-        for trigger in trigger_times:
-            if isinstance(trigger, wx.DateTime):
-                trigger = TimeInstantTrigger(trigger)
-            elif not isinstance(trigger, TimeInstantTrigger):
-                raise TypeError()
-            self.sub_trigger.append(trigger)
-        self.sub_trigger.sort()
+        self.timezone = timezone
 
-    def activate(self, now=None) -> ActiveTimeTrigger:
+    def activate(self, now=None) -> ActiveTimeInstantListTrigger:
+        if now is None:
+            now = time.now_millis()
+        else:
+            now = time.to_milli_seconds(now)
+        day = time.local_day(now, self.timezone)
+        return ActiveTimeInstantListTrigger(self.times_of_day, self.timezone, day, self._search(day, 0, now))
+
+    def _search(self, day: time.LocalDay, lower: int, now: int) -> int:
+        # occurrences within a day grow monotonically with the time of day
+        times_of_day = self.times_of_day
+        upper = len(times_of_day)
+        while lower < upper:
+            middle = (lower + upper) // 2
+            if day.to_epoch_millis(times_of_day[middle]) < now:
+                lower = middle + 1
+            else:
+                upper = middle
+        return lower
+
+
+class ActiveTimeInstantListTrigger(TimeInstantListTrigger, ActiveTimeTrigger):
+    """
+    Cursor pointing at the next occurrence within the sorted times of day of a list trigger.
+    """
+
+    def __init__(self, times_of_day: tuple, timezone, day: time.LocalDay, index: int) -> None:
+        # shares the already sorted times of day instead of sorting them again
+        self.times_of_day = times_of_day
+        self.timezone = timezone
+        if index >= len(times_of_day):
+            day = day.following()
+            index = 0
+        self.day = day
+        self.index = index
+        self.activation = day.to_epoch_millis(times_of_day[index])
+
+    def activate(self, now=None) -> ActiveTimeInstantListTrigger:
         if now is None:
-            now = wx.DateTime.Now()
+            now = time.now_millis()
         else:
-            now = time.to_date_time(now)
-        triggers = [time.set_to_future(wx.DateTime(trigger.trigger_time), now) for trigger in self.sub_trigger]
-        triggers.sort()
-        return TimeInstantListTrigger(triggers)
+            now = time.to_milli_seconds(now)
+        if now <= self.activation:
+            return self
+        if now >= self.day.end:
+            return TimeInstantListTrigger.activate(self, now)
+        next_index = self.index + 1
+        if next_index < len(self.times_of_day) and self.day.to_epoch_millis(self.times_of_day[next_index]) < now:
+            next_index = self._search(self.day, next_index, now)
+        return ActiveTimeInstantListTrigger(self.times_of_day, self.timezone, self.day, next_index)
 
     def millis_until_activation(self, now=None) -> int:
-        return self.sub_trigger[0].millis_until_activation(now)
+        if now is None:
+            now = time.now_millis()
+        return self.activation - time.to_milli_seconds(now)
+
+    def __eq__(self, other):
+        if isinstance(other, ActiveTimeInstantListTrigger):
+            return self.activation == other.activation
+        else:
+            return ActiveTimeTrigger.__eq__(self, other)
+
+    def __lt__(self, other):
+        if isinstance(other, ActiveTimeInstantListTrigger):
+            return self.activation < other.activation
+        else:
+            return ActiveTimeTrigger.__lt__(self, other)
+
+
+class CronTrigger(TimeTrigger):
+
+    def __init__(self, expressions, timezone=None) -> None:
+        """
+        :param expressions: cron expressions, the trigger fires whenever any of them matches
+        :param timezone: timezone of the wall clock, None for the local timezone of the system
+        """
+        self.expressions = tuple(expressions)
+        if not self.expressions:
+            raise ValueError()
+        self.timezone = timezone
+
+    def activate(self, now=None) -> ActiveCronTrigger:
+        if now is None:
+            now = time.now_millis()
+        else:
+            now = time.to_milli_seconds(now)
+        activation = cron.next_occurrence(self.expressions, now, self.timezone)
+        return ActiveCronTrigger(self.expressions, activation, self.timezone)
+
+
+class ActiveCronTrigger(CronTrigger, ActiveTimeTrigger):
+
+    def __init__(self, expressions, activation: int, timezone=None) -> None:
+        super().__init__(expressions, timezone)
+        self.activation = activation
+
+    def activate(self, now=None) -> ActiveCronTrigger:
+        if now is not None and time.to_milli_seconds(now) <= self.activation:
+            return self
+        return super().activate(now)
+
+    def millis_until_activation(self, now=None) -> int:
+        if now is None:
+            now = time.now_millis()
+        return self.activation - time.to_milli_seconds(now)
+
+    def __eq__(self, other):
+        if isinstance(other, ActiveCronTrigger):
+            return self.activation == other.activation
+        else:
+            return ActiveTimeTrigger.__eq__(self, other)
+
+    def __lt__(self, other):
+        if isinstance(other, ActiveCronTrigger):
+            return self.activation < other.activation
+        else:
+            return ActiveTimeTrigger.__lt__(self, other)
 
 
 class IntervalTrigger(TimeTrigger):
@@ -135,6 +281,26 @@ class IntervalTrigger(TimeTrigger):
         return ActiveIntervalTrigger(self.interval, now)
 
 
+class DelayTrigger(IntervalTrigger):
+    """
+    Fires once, the given number of milliseconds after it was scheduled.
+    """
+
+    repeat = False
+
+
+class AnimationTrigger(IntervalTrigger):
+    """
+    Shows the next frame of an animated asset after every interval, frames missed while the system slept are skipped.
+    """
+
+    misfire = MISFIRE_SKIP
+
+    def __init__(self, milli_seconds_interval, asset_id) -> None:
+        super().__init__(milli_seconds_interval)
+        self.asset_id = asset_id
+
+
 class ActiveIntervalTrigger(IntervalTrigger, ActiveTimeTrigger):
 
     def __init__(self, milli_seconds_interval, now) -> None:
@@ -170,12 +336,38 @@ class ActiveIntervalTrigger(IntervalTrigger, ActiveTimeTrigger):
             return super().__lt__(other)
 
 
+def _parse_duration(config, key):
+    try:
+        return time.parse_time_duration(config[key])
+    except time.TimeException as exception:
+        raise denormalize.UnsupportedException(exception, config=config,
+                                               message=f'Invalid {key}: {config[key]!r}. {exception.get_message()}')
+
+
+def _apply_trigger_options(time_trigger: TimeTrigger, config) -> TimeTrigger:
+    misfire = config.get('misfire', MISFIRE_ONCE)
+    if misfire not in MISFIRE_POLICIES:
+        raise denormalize.UnsupportedException(config=config, message='Unknown misfire policy: ' + str(misfire))
+    time_trigger.misfire = misfire
+    if 'slack' in config:
+        time_trigger.slack = _parse_duration(config, 'slack')
+    if 'action' in config and 'actions' in config:
+        raise denormalize.UnsupportedException(config=config, message='Use either action or actions.')
+    action_names = config.get('actions', [config['action']] if 'action' in config else [])
+    if isinstance(action_names, str) or not all(isinstance(name, str) for name in action_names):
+        raise denormalize.UnsupportedException(config=config, message='Actions have to be a list of action names.')
+    time_trigger.actions = tuple(action_names)
+    return time_trigger
+
+
 class IntervalTriggerDenormalizer(denormalize.Denormalizer):
 
     def denormalize(self, config):
-        trigger_interval = config['every']
-        millis_interval = time.parse_time_duration(trigger_interval)
-        return IntervalTrigger(millis_interval)
+        millis_interval = _parse_duration(config, 'every')
+        if millis_interval <= 0:
+            raise denormalize.UnsupportedException(config=config, message=f'Invalid every: {config["every"]!r}. '
+                                                                          'The interval has to be positive.')
+        return _apply_trigger_options(IntervalTrigger(millis_interval), config)
 
     def supports_denormalization(self, config) -> bool:
         try:
@@ -183,26 +375,41 @@ class IntervalTriggerDenormalizer(denormalize.Denormalizer):
         except TypeError:
             return False
 
+    def discriminating_keys(self) -> tuple:
+        return 'every',
 
-def _create_instant_trigger(trigger_instant):
+
+def _parse_time_instant(trigger_instant):
     try:
-        trigger_time = time.parse_time_instant(trigger_instant)
-        return TimeInstantTrigger(trigger_time)
+        return time.parse_time_instant(trigger_instant)
     except time.InvalidInstantException as exception:
-        raise denormalize.UnsupportedException(exception, message=exception.get_message())
+        raise denormalize.UnsupportedException(exception, message=f'Invalid on: {trigger_instant!r}. '
+                                                                  + exception.get_message())
+
+
+def _load_timezone(config):
+    try:
+        return time.get_timezone(config.get('timezone'))
+    except time.InvalidTimezoneException as exception:
+        raise denormalize.UnsupportedException(exception, message=exception.get_message(), config=config)
 
 
 class InstantTriggerDenormalizer(denormalize.Denormalizer):
 
     def denormalize(self, config):
         trigger_instant = config['on']
+        timezone = _load_timezone(config)
         if isinstance(trigger_instant, str):
-            return _create_instant_trigger(trigger_instant)
-        trigger_list = []
-        for single_trigger_instant in trigger_instant:
-            single_trigger = _create_instant_trigger(single_trigger_instant)
-            trigger_list.append(single_trigger)
-        return TimeInstantListTrigger(trigger_list)
+            time_trigger = TimeInstantTrigger(_parse_time_instant(trigger_instant), timezone)
+        elif isinstance(trigger_instant, list):
+            times_of_day = [_parse_time_instant(single_trigger_instant) for single_trigger_instant in trigger_instant]
+            if not times_of_day:
+                raise denormalize.UnsupportedException(config=config, message='Empty list of instants.')
+            time_trigger = TimeInstantListTrigger(times_of_day, timezone)
+        else:
+            raise denormalize.UnsupportedException(
+                config=config, message=f'Invalid on: {trigger_instant!r}. Use a time or a list of times.')
+        return _apply_trigger_options(time_trigger, config)
 
     def supports_denormalization(self, config) -> bool:
         try:
@@ -210,6 +417,36 @@ class InstantTriggerDenormalizer(denormalize.Denormalizer):
         except TypeError:
             return False
 
+    def discriminating_keys(self) -> tuple:
+        return 'on',
+
+
+class CronTriggerDenormalizer(denormalize.Denormalizer):
+
+    def denormalize(self, config):
+        cron_expressions = config['cron']
+        if isinstance(cron_expressions, str):
+            cron_expressions = [cron_expressions]
+        elif not isinstance(cron_expressions, list):
+            raise denormalize.UnsupportedException(
+                config=config, message=f'Invalid cron: {cron_expressions!r}. Use one or a list of expressions.')
+        try:
+            expressions = [cron.CronExpression(expression) for expression in cron_expressions]
+        except cron.InvalidCronException as exception:
+            raise denormalize.UnsupportedException(exception, message=exception.get_message(), config=config)
+        if not expressions:
+            raise denormalize.UnsupportedException(config=config, message='Empty list of cron expressions.')
+        return _apply_trigger_options(CronTrigger(expressions, _load_timezone(config)), config)
+
+    def supports_denormalization(self, config) -> bool:
+        try:
+            return 'cron' in config
+        except TypeError:
+            return False
+
+    def discriminating_keys(self) -> tuple:
+        return 'cron',
+
 
 def _supply_trigger_list():
     return TriggerList()
@@ -218,10 +455,15 @@ def _supply_trigger_list():
 _single_trigger_denormalizer = denormalize.PriorityDenormalizer()
 _single_trigger_denormalizer.register(IntervalTriggerDenormalizer())
 _single_trigger_denormalizer.register(InstantTriggerDenormalizer())
+_single_trigger_denormalizer.register(CronTriggerDenormalizer())
 
 _trigger_denormalizer = denormalize.ListDenormalizer(_single_trigger_denormalizer, _supply_trigger_list)
 
 
 def load_trigger(config) -> TriggerList:
-    if _trigger_denormalizer.supports_denormalization(config):
-        return _trigger_denormalizer.denormalize(config)
+    """
+    Denormalize the trigger section of the configuration in a single pass.
+
+    :raise denormalize.UnsupportedException: listing every trigger that cannot be loaded
+    """
+    return _trigger_denormalizer.denormalize(config)
@@ -0,0 +1,216 @@
+"""
+Watch files for changes, with inotify on Linux and by polling their status elsewhere.
+"""
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import threading
+from abc import ABC
+
+# inotify event masks from <sys/inotify.h>
+_IN_ATTRIB = 0x4
+_IN_CLOSE_WRITE = 0x8
+_IN_MOVED_FROM = 0x40
+_IN_MOVED_TO = 0x80
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_IN_Q_OVERFLOW = 0x4000
+# editors often save by writing a new file and renaming it over the old one, so directories are watched
+_WATCH_MASK = _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+_EVENT_HEADER = struct.Struct('iIII')
+_READ_SIZE = 64 * 1024
+
+
+class Watcher(ABC):
+    """
+    Reports which of a set of files changed since the last poll.
+
+    Polling never blocks, so it can be called from a timer of the user interface. Watchers notified of changes can
+    instead :meth:`wait` for them in a background thread.
+    """
+
+    def __init__(self) -> None:
+        # watched paths by their absolute path
+        self._paths = {}
+
+    def set_paths(self, paths):
+        """
+        Replace the watched files.
+
+        :param paths: paths of the files to watch, they do not have to exist
+        """
+        self._paths = {os.path.abspath(path): path for path in paths}
+
+    def poll(self) -> set:
+        """
+        :return: watched paths that changed since the last poll, as they were passed to :meth:`set_paths`
+        """
+        raise NotImplementedError()
+
+    def wait(self) -> set:
+        """
+        Block until watched files change or the watcher is closed.
+
+        :return: watched paths that changed, an empty set once the watcher is closed
+        """
+        raise NotImplementedError()
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def _file_signature(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+
+class PollingWatcher(Watcher):
+    """
+    Detects changes by comparing modification time, size and inode of the files on every poll.
+    """
+
+    def __init__(self, paths=()) -> None:
+        super().__init__()
+        self._signatures = {}
+        self.set_paths(paths)
+
+    def set_paths(self, paths):
+        super().set_paths(paths)
+        self._signatures = {path: _file_signature(path) for path in self._paths}
+
+    def poll(self) -> set:
+        changed = set()
+        for path in self._paths:
+            signature = _file_signature(path)
+            if signature != self._signatures[path]:
+                self._signatures[path] = signature
+                changed.add(self._paths[path])
+        return changed
+
+
+class InotifyWatcher(Watcher):
+    """
+    Receives changes from the Linux kernel, a poll only reads the pending events.
+
+    The watched paths may be replaced while another thread waits for changes.
+
+    :raise OSError: when inotify is not available
+    """
+
+    def __init__(self, paths=()) -> None:
+        super().__init__()
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self._descriptor = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._descriptor < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+        # written to on close to wake up a waiting thread
+        self._wakeup_read, self._wakeup_write = os.pipe()
+        self._lock = threading.Lock()
+        # watched directories by their watch descriptor
+        self._directories = {}
+        self.set_paths(paths)
+
+    def set_paths(self, paths):
+        with self._lock:
+            self._set_paths(paths)
+
+    def _set_paths(self, paths):
+        super().set_paths(paths)
+        if self._descriptor < 0:
+            return
+        directories = {os.path.dirname(path) for path in self._paths}
+        for watch, directory in list(self._directories.items()):
+            if directory not in directories:
+                self._libc.inotify_rm_watch(self._descriptor, watch)
+                del self._directories[watch]
+        for directory in directories - set(self._directories.values()):
+            watch = self._libc.inotify_add_watch(self._descriptor, os.fsencode(directory), _WATCH_MASK)
+            if watch >= 0:
+                self._directories[watch] = directory
+
+    def fileno(self) -> int:
+        return self._descriptor
+
+    def poll(self) -> set:
+        with self._lock:
+            if self._descriptor < 0:
+                return set()
+            return self._read_events()
+
+    def wait(self) -> set:
+        while True:
+            try:
+                readable, _, _ = select.select([self._descriptor, self._wakeup_read], [], [])
+            except (OSError, ValueError):
+                # the descriptors were closed before select was called
+                readable = []
+            if self._descriptor < 0 or self._wakeup_read in readable:
+                return set()
+            changed = self.poll()
+            if changed:
+                return changed
+
+    def _read_events(self) -> set:
+        changed = set()
+        while True:
+            try:
+                data = os.read(self._descriptor, _READ_SIZE)
+            except BlockingIOError:
+                break
+            except OSError as exception:
+                if exception.errno == errno.EINTR:
+                    continue
+                raise
+            offset = 0
+            while offset < len(data):
+                watch, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b'\0')
+                offset += length
+                if mask & _IN_Q_OVERFLOW:
+                    # events were lost, every file may have changed
+                    changed.update(self._paths.values())
+                    continue
+                directory = self._directories.get(watch)
+                if directory is not None:
+                    path = os.path.join(directory, os.fsdecode(name))
+                    if path in self._paths:
+                        changed.add(self._paths[path])
+        return changed
+
+    def close(self):
+        with self._lock:
+            if self._descriptor >= 0:
+                os.write(self._wakeup_write, b'\0')
+                for descriptor in (self._descriptor, self._wakeup_read, self._wakeup_write):
+                    os.close(descriptor)
+                self._descriptor = -1
+
+
+def create_watcher(paths=()) -> Watcher:
+    """
+    Create the most efficient watcher available on this platform.
+
+    :param paths: paths of the files to watch
+    """
+    if sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(paths)
+        except (OSError, AttributeError):
+            # AttributeError when the C library has no inotify functions
+            pass
+    return PollingWatcher(paths)
@@ -0,0 +1,96 @@
+import unittest
+from desktop_buddy import action, denormalize, scheduler, trigger
+
+
+def _trigger_with_actions(interval, *names):
+    time_trigger = trigger.IntervalTrigger(interval)
+    time_trigger.actions = names
+    return time_trigger
+
+
+class LoadActionsTest(unittest.TestCase):
+
+    def test_load_actions(self):
+        actions = action.load_actions({
+            'greet': {'assets': {'bubble': 'show', 'arm': 'toggle'}, 'for': '10s', 'priority': 2},
+            'hide': {'assets': {'bubble': False}},
+        })
+        self.assertEqual(['greet', 'hide'], list(actions))
+        self.assertEqual(10000, actions['greet'].duration)
+        self.assertEqual(2, actions['greet'].priority)
+        self.assertEqual({'bubble', 'arm'}, actions['greet'].asset_ids())
+        self.assertIsNone(actions['hide'].duration)
+
+    def test_all_errors_are_reported(self):
+        with self.assertRaises(denormalize.DenormalizationErrors) as context:
+            action.load_actions({
+                'unknown_change': {'assets': {'bubble': 'wiggle'}},
+                'no_assets': {'for': '1s'},
+                'ok': {'assets': {'bubble': 'hide'}},
+            })
+        self.assertEqual(['unknown_change', 'no_assets'], [name for name, _ in context.exception.get_errors()])
+
+    def test_invalid_duration(self):
+        for duration in (5, 'bad unit'):
+            with self.subTest(duration=duration), self.assertRaises(denormalize.DenormalizationErrors) as context:
+                action.load_actions({'greet': {'assets': {'bubble': 'show'}, 'for': duration}})
+            self.assertEqual(['greet'], [name for name, _ in context.exception.get_errors()])
+
+    def test_check_actions(self):
+        actions = action.load_actions({'greet': {'assets': {'bubble': 'show'}}})
+        action.check_actions(actions, [_trigger_with_actions(1000, 'greet')], ['bubble'])
+        with self.assertRaises(denormalize.UnsupportedException):
+            action.check_actions(actions, [_trigger_with_actions(1000, 'wave')], ['bubble'])
+        with self.assertRaises(denormalize.UnsupportedException):
+            action.check_actions(actions, [], ['character'])
+
+
+class TransactionTest(unittest.TestCase):
+
+    def test_changes_only_contain_differences(self):
+        transaction = action.Transaction({'bubble': False, 'arm': True})
+        action.AssetAction('bubble').activate(transaction)
+        action.AssetAction('bubble').activate(transaction)
+        action.SetAssetAction('arm', False).activate(transaction)
+        self.assertEqual({'arm': False}, transaction.changes())
+
+    def test_inverted_set_restores_previous_state(self):
+        transaction = action.Transaction({'bubble': True})
+        show = action.SetAssetAction('bubble', True)
+        inverted = show.create_inverted_action(transaction)
+        show.activate(transaction)
+        inverted.activate(transaction)
+        self.assertEqual({}, transaction.changes())
+
+
+class ActionEngineTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.scheduler = scheduler.Scheduler()
+        self.actions = action.load_actions({
+            'show': {'assets': {'bubble': 'show'}, 'priority': 1},
+            'hide': {'assets': {'bubble': 'hide'}},
+            'speak': {'assets': {'bubble': 'show'}, 'for': '500ms'},
+        })
+        self.engine = action.ActionEngine(self.actions, self.scheduler)
+        self.states = {'bubble': False}
+
+    def _run(self, now):
+        transaction = self.engine.run_due(self.states, now)
+        self.states.update(transaction.changes())
+        return transaction
+
+    def test_higher_priority_wins(self):
+        self.engine.add_triggers([_trigger_with_actions(1000, 'show'), _trigger_with_actions(1000, 'hide')], now=0)
+        transaction = self._run(1000)
+        self.assertEqual(2, len(transaction.firings))
+        self.assertEqual({'bubble': True}, transaction.changes())
+
+    def test_duration_is_inverted_through_scheduler(self):
+        self.engine.add_triggers([_trigger_with_actions(10000, 'speak')], now=0)
+        self.assertEqual({'bubble': True}, self._run(10000).changes())
+        self.assertEqual(10500, self.scheduler.next_deadline())
+        self.assertEqual({'bubble': False}, self._run(10500).changes())
+        # the one-shot trigger of the inversion is gone
+        self.assertEqual(20000, self.scheduler.next_deadline())
+        self.assertEqual(1, len(self.scheduler))
@@ -1,6 +1,216 @@
+import collections
+import importlib.util
+import pathlib
+import tempfile
 import unittest
-from desktop_buddy import asset
+import numpy
+from PIL import Image
+from desktop_buddy import asset, cache
 
 
-class AssetTest(unittest.TestCase):
-    pass
+class PrepareAssetsTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        directory = pathlib.Path(self.temporary_directory.name)
+        self.file_cache = cache.FileCache(directory / 'cache')
+        self.assets_config = collections.OrderedDict()
+        for index in range(3):
+            pixels = numpy.zeros((8, 10, 4), dtype=numpy.uint8)
+            pixels[2:6, index + 1:index + 5, 3] = 255
+            image_file = str(directory / f'image{index}.png')
+            Image.fromarray(pixels, 'RGBA').save(image_file)
+            self.assets_config[f'asset{index}'] = {'file': image_file, 'position': {'x': 20, 'y': 30}}
+
+    def tearDown(self) -> None:
+        self.temporary_directory.cleanup()
+
+    def test_prepare_asset(self):
+        prepared = asset.prepare_asset(self.assets_config['asset1'], self.file_cache)
+        self.assertEqual((10, 8), prepared.size)
+        self.assertEqual([[2, 2, 4, 4]], prepared.rectangles.tolist())
+        # the top left corner of the region lies at the configured position
+        self.assertEqual(asset.Point(18, 28), prepared.offset)
+        self.assertTrue(prepared.active)
+
+    def test_prepare_scaled_asset(self):
+        # resampling blurs the edges of the image, half transparent pixels decide the region
+        asset_config = dict(self.assets_config['asset1'], scale=2, mask={'threshold': 128})
+        prepared = asset.prepare_asset(asset_config, self.file_cache)
+        self.assertEqual((20, 16), prepared.size)
+        self.assertEqual([[4, 4, 8, 8]], prepared.rectangles.tolist())
+        self.assertEqual(asset.Point(16, 26), prepared.offset)
+        self.assertEqual(2, prepared.scale)
+        self.assertNotEqual(asset_config['file'], prepared.image)
+
+    def test_rasterize_image(self):
+        image_file = self.assets_config['asset0']['file']
+        self.assertEqual(image_file, asset.rasterize_image(image_file, self.file_cache))
+        scaled_file = asset.rasterize_image(image_file, self.file_cache, 1.5)
+        self.assertEqual((15, 12), Image.open(scaled_file).size)
+        self.assertEqual(scaled_file, asset.rasterize_image(image_file, self.file_cache, 1.5))
+
+    def test_load_scale(self):
+        self.assertEqual(1.0, asset.load_scale({}))
+        self.assertEqual(0.5, asset.load_scale({'scale': 0.5}))
+        for scale in (0, -1, float('nan'), float('inf')):
+            with self.subTest(scale=scale), self.assertRaises(ValueError):
+                asset.load_scale({'scale': scale})
+
+    def test_parallel_preparation_matches_serial(self):
+        serial = asset.prepare_assets(self.assets_config, self.file_cache, workers=1)
+        parallel = asset.prepare_assets(self.assets_config, self.file_cache, workers=2)
+        self.assertEqual(list(self.assets_config), list(parallel))
+        for asset_id in self.assets_config:
+            self.assertEqual(serial[asset_id].offset, parallel[asset_id].offset)
+            numpy.testing.assert_array_equal(serial[asset_id].rectangles, parallel[asset_id].rectangles)
+
+    def test_unknown_asset(self):
+        with self.assertRaises(NotImplementedError):
+            asset.prepare_assets({'text': {'content': 'hello'}}, self.file_cache, workers=2)
+
+    def test_load_loading_options(self):
+        self.assertEqual(asset.LoadingOptions(0, True, True), asset.load_loading_options(None))
+        self.assertEqual(asset.LoadingOptions(4, False, True), asset.load_loading_options({'workers': 4, 'lazy': False}))
+        with self.assertRaises(ValueError):
+            asset.load_loading_options({'workers': -1})
+        with self.assertRaises(ValueError):
+            asset.load_loading_options({'bitmap_memory': -1})
+
+
+class AnimationTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.directory = pathlib.Path(self.temporary_directory.name)
+        self.file_cache = cache.FileCache(self.directory / 'cache')
+        # two by two frames of 6x4 pixels, frame i has an opaque block i + 1 pixels wide
+        sheet = numpy.zeros((8, 12, 4), dtype=numpy.uint8)
+        for index in range(4):
+            row, column = divmod(index, 2)
+            sheet[row * 4 + 1:row * 4 + 3, column * 6:column * 6 + index + 1, 3] = 255
+            Image.fromarray(sheet[row * 4:row * 4 + 4, column * 6:column * 6 + 6], 'RGBA').save(
+                self.directory / f'frame_{index + 1:02}.png')
+        Image.fromarray(sheet, 'RGBA').save(self.directory / 'sheet.png')
+
+    def tearDown(self) -> None:
+        self.temporary_directory.cleanup()
+
+    def test_load_animation_options(self):
+        options = asset.load_animation_options({'sheet': 'sheet.png', 'columns': 2, 'rows': 2, 'interval': '1s'})
+        self.assertEqual(asset.AnimationOptions('sheet.png', (), 2, 2, 4, 1000), options)
+        options = asset.load_animation_options({'files': 'frame_{:02}.png', 'frames': 3})
+        self.assertEqual(('frame_01.png', 'frame_02.png', 'frame_03.png'), options.files)
+        self.assertEqual((2, 2, 3, 100), options[2:])
+        for config in ({}, {'sheet': 'sheet.png', 'files': []}, {'sheet': 'sheet.png', 'frames': 5},
+                       {'files': []}, {'files': 'frame_{}.png'}, {'files': ['a.png'], 'interval': 0}):
+            with self.subTest(config=config), self.assertRaises(ValueError):
+                asset.load_animation_options(config)
+
+    def test_frame_boxes(self):
+        options = asset.AnimationOptions('sheet.png', (), 2, 2, 3, 100)
+        self.assertEqual([[0, 0, 6, 4], [6, 0, 6, 4], [0, 4, 6, 4]], asset.frame_boxes(12, 8, options).tolist())
+        self.assertEqual([[0, 0, 12, 8], [12, 0, 12, 8], [0, 8, 12, 8]], asset.frame_boxes(24, 16, options).tolist())
+
+    def assert_frames(self, prepared):
+        self.assertEqual((6, 4), prepared.size)
+        self.assertEqual(4, len(prepared.frame_rectangles))
+        for index, rectangles in enumerate(prepared.frame_rectangles):
+            self.assertEqual([[0, 1, index + 1, 2]], rectangles.tolist())
+        # the region of all frames determines the layout
+        self.assertEqual(asset.Point(10, 19), prepared.offset)
+
+    def test_prepare_sprite_sheet(self):
+        prepared = asset.prepare_asset({'animation': {'sheet': str(self.directory / 'sheet.png'), 'columns': 2,
+                                                      'rows': 2},
+                                        'position': {'x': 10, 'y': 20}}, self.file_cache)
+        self.assertIsInstance(prepared, asset.PreparedAnimation)
+        self.assertEqual(str(self.directory / 'sheet.png'), prepared.image)
+        self.assert_frames(prepared)
+
+    def test_prepare_file_sequence(self):
+        asset_config = {'animation': {'files': str(self.directory / 'frame_{:02}.png'), 'frames': 4},
+                        'position': {'x': 10, 'y': 20}}
+        prepared = asset.prepare_asset(asset_config, self.file_cache)
+        self.assertEqual((12, 8), Image.open(prepared.image).size)
+        self.assert_frames(prepared)
+        self.assertEqual([str(self.directory / f'frame_{index:02}.png') for index in range(1, 5)],
+                         asset.source_files(asset_config))
+
+
+@unittest.skipUnless(importlib.util.find_spec('wx'), 'wxPython is not installed')
+class GraphicAssetTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        import wx
+        self.app = wx.App()
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        pixels = numpy.zeros((8, 10, 4), dtype=numpy.uint8)
+        pixels[2:6, 1:5, 3] = 255
+        image_file = str(pathlib.Path(self.temporary_directory.name) / 'image.png')
+        Image.fromarray(pixels, 'RGBA').save(image_file)
+        self.file_cache = cache.FileCache(pathlib.Path(self.temporary_directory.name) / 'cache')
+        self.prepared = asset.prepare_asset({'file': image_file, 'active': False}, self.file_cache)
+
+    def tearDown(self) -> None:
+        self.temporary_directory.cleanup()
+        self.app.Destroy()
+
+    def test_lazy_asset_materializes_on_first_use(self):
+        lazy_asset = asset.GraphicAsset(self.prepared, lazy=True)
+        lazy_asset.move(5, 5)
+        self.assertFalse(lazy_asset.is_materialized)
+        self.assertEqual((5, 5, 4, 4), tuple(lazy_asset.region_bounds))
+        self.assertEqual((5, 5, 4, 4), tuple(lazy_asset.region.GetBox()))
+        self.assertTrue(lazy_asset.is_materialized)
+
+    def test_assets_share_bitmap_and_region(self):
+        store = asset.AssetStore(self.file_cache)
+        first = asset.GraphicAsset(self.prepared, store=store)
+        second = asset.GraphicAsset(self.prepared._replace(offset=asset.Point(20, 0)), store=store)
+        self.assertIs(first.image, second.image)
+        self.assertEqual((21, 2, 4, 4), tuple(second.region.GetBox()))
+        report = store.memory_report()
+        self.assertEqual(['bitmap', 'region'], [usage.kind for usage in report.resources])
+        self.assertEqual([2, 2], [usage.references for usage in report.resources])
+        self.assertEqual(10 * 8 * 4, report.bitmap_bytes)
+        first.release()
+        second.release()
+        self.assertEqual(0, store.memory_report().references)
+        self.assertEqual(1, len(store.memory_report().resources))
+
+    def test_store_keeps_unused_scales_within_memory(self):
+        store = asset.AssetStore(self.file_cache, max_bytes=20 * 16 * 4)
+        graphic_asset = asset.GraphicAsset(self.prepared, store=store)
+        self.assertEqual((10, 8), tuple(graphic_asset.image.GetSize()))
+        graphic_asset.set_pixel_scale(2)
+        scaled_bitmap = graphic_asset.image
+        self.assertEqual((20, 16), tuple(scaled_bitmap.GetSize()))
+        graphic_asset.set_pixel_scale(1)
+        graphic_asset.materialize()
+        self.assertIs(scaled_bitmap, store.acquire_bitmap(self.prepared, 2))
+        store.release_bitmap(self.prepared, 2)
+        graphic_asset.set_pixel_scale(3)
+        graphic_asset.materialize()
+        self.assertLessEqual(store.unused_bytes, store.max_bytes)
+
+    def test_animated_asset_swaps_frame_regions(self):
+        pixels = numpy.zeros((4, 12, 4), dtype=numpy.uint8)
+        pixels[1:3, 0:1, 3] = 255
+        pixels[1:3, 6:9, 3] = 255
+        sheet = str(pathlib.Path(self.temporary_directory.name) / 'sheet.png')
+        Image.fromarray(pixels, 'RGBA').save(sheet)
+        prepared = asset.prepare_asset({'animation': {'sheet': sheet, 'columns': 2}}, self.file_cache)
+        animated = asset.create_asset(prepared)
+        self.assertIsInstance(animated, asset.AnimatedAsset)
+        animated.move(5, 5)
+        self.assertEqual((5, 5, 1, 2), tuple(animated.region.GetBox()))
+        animated.advance()
+        self.assertEqual((5, 5, 3, 2), tuple(animated.region.GetBox()))
+        animated.advance()
+        self.assertEqual(0, animated.frame)
+
+    def test_eager_asset(self):
+        eager_asset = asset.GraphicAsset(self.prepared)
+        self.assertTrue(eager_asset.is_materialized)
+        self.assertEqual(tuple(eager_asset.region_bounds), tuple(eager_asset.region.GetBox()))
@@ -0,0 +1,94 @@
+import os
+import tempfile
+import unittest
+from desktop_buddy import cache
+
+
+def _write_file(name, content):
+    def writer(directory):
+        (directory / name).write_bytes(content)
+    return writer
+
+
+class FileCacheTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.file_cache = cache.FileCache(self.temporary_directory.name, max_size=100)
+
+    def tearDown(self) -> None:
+        self.temporary_directory.cleanup()
+
+    def test_lookup_missing_entry(self):
+        self.assertIsNone(self.file_cache.lookup('missing', 'file'))
+
+    def test_lookup_stored_entry(self):
+        stored = self.file_cache.store('key', _write_file('file', b'content'))
+        found = self.file_cache.lookup('key', 'file')
+        self.assertEqual(stored, found)
+        self.assertEqual(b'content', (found / 'file').read_bytes())
+
+    def test_lookup_incomplete_entry(self):
+        self.file_cache.store('key', _write_file('file', b'content'))
+        self.assertIsNone(self.file_cache.lookup('key', 'file', 'other'))
+
+    def test_store_leaves_no_temporary_files(self):
+        self.file_cache.store('key', _write_file('file', b'content'))
+        self.assertEqual(['key'], os.listdir(self.temporary_directory.name))
+
+    def test_failed_store_leaves_no_entry(self):
+        def failing_writer(directory):
+            (directory / 'file').write_bytes(b'partial')
+            raise RuntimeError()
+        with self.assertRaises(RuntimeError):
+            self.file_cache.store('key', failing_writer)
+        self.assertEqual([], os.listdir(self.temporary_directory.name))
+
+    def test_evict_least_recently_used(self):
+        self.file_cache.store('first', _write_file('file', b'x' * 40))
+        self.file_cache.store('second', _write_file('file', b'x' * 40))
+        os.utime(self.file_cache.entry_path('first'), ns=(1, 1))
+        os.utime(self.file_cache.entry_path('second'), ns=(2, 2))
+        self.file_cache.lookup('first', 'file')
+        self.file_cache.store('third', _write_file('file', b'x' * 40))
+        self.assertIsNotNone(self.file_cache.lookup('first', 'file'))
+        self.assertIsNone(self.file_cache.lookup('second', 'file'))
+        self.assertIsNotNone(self.file_cache.lookup('third', 'file'))
+
+
+class CacheKeyTest(unittest.TestCase):
+
+    def test_equal_parts_equal_key(self):
+        self.assertEqual(cache.cache_key('a', 1, None), cache.cache_key('a', 1, None))
+
+    def test_different_parts_different_key(self):
+        self.assertNotEqual(cache.cache_key('a', 1), cache.cache_key('a', 2))
+        self.assertNotEqual(cache.cache_key('ab', 'c'), cache.cache_key('a', 'bc'))
+
+
+class LruCacheTest(unittest.TestCase):
+
+    def test_get_missing(self):
+        self.assertIsNone(cache.LruCache(2).get('missing'))
+
+    def test_put_and_get(self):
+        lru_cache = cache.LruCache(2)
+        lru_cache.put('key', 'value')
+        self.assertEqual('value', lru_cache.get('key'))
+
+    def test_evict_least_recently_used(self):
+        lru_cache = cache.LruCache(2)
+        lru_cache.put('first', 1)
+        lru_cache.put('second', 2)
+        lru_cache.get('first')
+        lru_cache.put('third', 3)
+        self.assertIn('first', lru_cache)
+        self.assertNotIn('second', lru_cache)
+        self.assertIn('third', lru_cache)
+        self.assertEqual(2, len(lru_cache))
+
+    def test_clear(self):
+        lru_cache = cache.LruCache(2)
+        lru_cache.put('key', 'value')
+        lru_cache.clear()
+        self.assertEqual(0, len(lru_cache))
@@ -0,0 +1,15 @@
+import unittest
+from desktop_buddy import clock
+
+
+class VirtualClockTest(unittest.TestCase):
+
+    def test_advance(self):
+        virtual_clock = clock.VirtualClock(1000)
+        virtual_clock.advance(500)
+        self.assertEqual(1500, virtual_clock.now_millis())
+
+    def test_cannot_go_backwards(self):
+        virtual_clock = clock.VirtualClock(1000)
+        with self.assertRaises(ValueError):
+            virtual_clock.set(999)
@@ -0,0 +1,22 @@
+import pathlib
+import tempfile
+import unittest
+from desktop_buddy import config
+
+
+class ToPlainTest(unittest.TestCase):
+
+    def test_converts_loaded_config(self):
+        with tempfile.TemporaryDirectory() as directory:
+            config_file = pathlib.Path(directory) / 'config.yaml'
+            config_file.write_text('window:\n  background: 0x00ff00  # green\ntrigger:\n  - every: 5s\n    slack: 1.5\n')
+            plain = config.to_plain(config.load_config(config_file))
+        self.assertEqual({'window': {'background': 0x00ff00}, 'trigger': [{'every': '5s', 'slack': 1.5}]}, plain)
+        self.assertIs(dict, type(plain))
+        self.assertIs(list, type(plain['trigger']))
+        self.assertIs(int, type(plain['window']['background']))
+        self.assertIs(float, type(plain['trigger'][0]['slack']))
+
+    def test_keeps_booleans(self):
+        self.assertIs(False, config.to_plain(False))
+        self.assertIsNone(config.to_plain(None))
@@ -0,0 +1,77 @@
+import datetime
+import unittest
+import zoneinfo
+from desktop_buddy import cron, time
+
+berlin = zoneinfo.ZoneInfo('Europe/Berlin')
+
+
+def _epoch_millis(year, month, day, hour, minute):
+    return time.to_milli_seconds(datetime.datetime(year, month, day, hour, minute, tzinfo=berlin))
+
+
+def _occurrences(expressions, start, count):
+    occurrences = []
+    now = start
+    for _ in range(count):
+        now = cron.next_occurrence([cron.CronExpression(e) for e in expressions], now, berlin)
+        occurrences.append(datetime.datetime.fromtimestamp(now / 1000, berlin).strftime('%a %d %H:%M'))
+        now += 1
+    return occurrences
+
+
+class CronExpressionTest(unittest.TestCase):
+
+    def test_every_minute(self):
+        expression = cron.CronExpression('* * * * *')
+        self.assertEqual(0, expression.next_minute_of_day(0))
+        self.assertEqual(1439, expression.next_minute_of_day(1439))
+
+    def test_steps_and_ranges(self):
+        expression = cron.CronExpression('*/15 13-16 * * *')
+        self.assertEqual(13 * 60, expression.next_minute_of_day(0))
+        self.assertEqual(13 * 60 + 15, expression.next_minute_of_day(13 * 60 + 1))
+        self.assertIsNone(expression.next_minute_of_day(16 * 60 + 46))
+
+    def test_weekday_names(self):
+        expression = cron.CronExpression('0 9 * * mon-fri')
+        self.assertTrue(expression.matches_date(datetime.date(2026, 10, 16)))
+        self.assertFalse(expression.matches_date(datetime.date(2026, 10, 17)))
+
+    def test_sunday_as_seven(self):
+        expression = cron.CronExpression('0 9 * * 7')
+        self.assertTrue(expression.matches_date(datetime.date(2026, 10, 18)))
+
+    def test_day_of_month_or_day_of_week(self):
+        expression = cron.CronExpression('0 0 1 * sun')
+        self.assertTrue(expression.matches_date(datetime.date(2026, 10, 1)))
+        self.assertTrue(expression.matches_date(datetime.date(2026, 10, 18)))
+        self.assertFalse(expression.matches_date(datetime.date(2026, 10, 19)))
+
+    def test_macro(self):
+        self.assertEqual(cron.CronExpression('0 0 * * *').minutes_of_day, cron.CronExpression('@daily').minutes_of_day)
+
+    def test_invalid_expressions(self):
+        for invalid in ('* * * *', '60 * * * *', '* * * foo *', '*/0 * * * *', '0 0 30 feb *'):
+            with self.assertRaises(cron.InvalidCronException):
+                cron.CronExpression(invalid)
+
+
+class NextOccurrenceTest(unittest.TestCase):
+
+    def test_workday_schedule(self):
+        expressions = ['0 9 * * mon-fri', '*/15 13-16 * * mon-fri', '0 17 * * mon-fri']
+        occurrences = _occurrences(expressions, _epoch_millis(2026, 10, 16, 16, 50), 4)
+        self.assertEqual(['Fri 16 17:00', 'Mon 19 09:00', 'Mon 19 13:00', 'Mon 19 13:15'], occurrences)
+
+    def test_now_on_full_minute(self):
+        now = _epoch_millis(2026, 10, 16, 9, 0)
+        self.assertEqual(now, cron.next_occurrence([cron.CronExpression('0 9 * * *')], now, berlin))
+
+    def test_leap_day(self):
+        occurrences = _occurrences(['0 12 29 feb *'], _epoch_millis(2026, 10, 16, 0, 0), 1)
+        self.assertEqual(['Tue 29 12:00'], occurrences)
+
+    def test_skipped_minute_fires_at_clock_change(self):
+        occurrences = _occurrences(['30 2 * * *'], _epoch_millis(2026, 3, 29, 0, 0), 2)
+        self.assertEqual(['Sun 29 03:00', 'Mon 30 02:30'], occurrences)
@@ -0,0 +1,93 @@
+import unittest
+from desktop_buddy import denormalize
+
+
+class KeyDenormalizer(denormalize.Denormalizer):
+
+    def __init__(self, key, indexed=True) -> None:
+        self.key = key
+        self.indexed = indexed
+        self.checked = 0
+
+    def denormalize(self, config):
+        if self.key not in config:
+            raise denormalize.UnsupportedException(config=config, message='missing ' + self.key)
+        return self.key, config[self.key]
+
+    def supports_denormalization(self, config) -> bool:
+        self.checked += 1
+        return self.key in config
+
+    def discriminating_keys(self) -> tuple:
+        return (self.key,) if self.indexed else ()
+
+
+class PriorityDenormalizerTest(unittest.TestCase):
+
+    def test_dispatch_by_key(self):
+        first = KeyDenormalizer('first')
+        second = KeyDenormalizer('second')
+        priority_denormalizer = denormalize.PriorityDenormalizer().register(first).register(second)
+        self.assertEqual(('second', 2), priority_denormalizer.denormalize({'second': 2}))
+        self.assertEqual(0, first.checked)
+
+    def test_priority_decides_between_candidates(self):
+        low = KeyDenormalizer('low')
+        high = KeyDenormalizer('high')
+        priority_denormalizer = denormalize.PriorityDenormalizer().register(low).register(high, priority=1)
+        self.assertEqual(('high', 2), priority_denormalizer.denormalize({'low': 1, 'high': 2}))
+
+    def test_unindexed_denormalizer_is_always_a_candidate(self):
+        unindexed = KeyDenormalizer('free', indexed=False)
+        priority_denormalizer = denormalize.PriorityDenormalizer().register(KeyDenormalizer('other'))
+        priority_denormalizer.register(unindexed)
+        self.assertEqual(('free', 1), priority_denormalizer.denormalize({'free': 1}))
+
+    def test_no_candidate(self):
+        priority_denormalizer = denormalize.PriorityDenormalizer().register(KeyDenormalizer('key'))
+        with self.assertRaises(denormalize.UnsupportedException):
+            priority_denormalizer.denormalize({'unknown': 1})
+        self.assertFalse(priority_denormalizer.supports_denormalization({'unknown': 1}))
+
+
+class ListDenormalizerTest(unittest.TestCase):
+
+    def test_single_pass(self):
+        item_denormalizer = KeyDenormalizer('key')
+        list_denormalizer = denormalize.ListDenormalizer(item_denormalizer)
+        self.assertEqual([('key', 1), ('key', 2)], list_denormalizer.denormalize([{'key': 1}, {'key': 2}]))
+        self.assertEqual(0, item_denormalizer.checked)
+
+    def test_collect_all_errors(self):
+        list_denormalizer = denormalize.ListDenormalizer(KeyDenormalizer('key'))
+        with self.assertRaises(denormalize.DenormalizationErrors) as context:
+            list_denormalizer.denormalize([{'other': 1}, {'key': 2}, {'other': 3}])
+        self.assertEqual([0, 2], [index for index, _ in context.exception.get_errors()])
+
+    def test_error_message_lists_every_item(self):
+        list_denormalizer = denormalize.ListDenormalizer(denormalize.DictDenormalizer(KeyDenormalizer('key')))
+        with self.assertRaises(denormalize.DenormalizationErrors) as context:
+            list_denormalizer.denormalize([{'a': {'other': 1}}, {'b': {'key': 2}}, 5])
+        expected = ('2 item(s) cannot be denormalized:\n'
+                    '0: 1 item(s) cannot be denormalized:\n'
+                    '    a: missing key\n'
+                    '2: Config is not a mapping.')
+        self.assertEqual(expected, context.exception.get_message())
+        self.assertEqual(expected, str(context.exception))
+
+    def test_not_a_list(self):
+        with self.assertRaises(denormalize.UnsupportedException):
+            denormalize.ListDenormalizer(KeyDenormalizer('key')).denormalize({'key': 1})
+
+
+class DictDenormalizerTest(unittest.TestCase):
+
+    def test_denormalize_values(self):
+        dict_denormalizer = denormalize.DictDenormalizer(KeyDenormalizer('key'))
+        self.assertEqual({'a': ('key', 1)}, dict_denormalizer.denormalize({'a': {'key': 1}}))
+
+    def test_collect_all_errors(self):
+        dict_denormalizer = denormalize.DictDenormalizer(KeyDenormalizer('key'))
+        with self.assertRaises(denormalize.DenormalizationErrors) as context:
+            dict_denormalizer.denormalize({'a': {'other': 1}, 'b': {'key': 2}})
+        self.assertEqual(['a'], [name for name, _ in context.exception.get_errors()])
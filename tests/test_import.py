@@ -0,0 +1,26 @@
+import subprocess
+import sys
+import unittest
+
+HEAVY_MODULES = ('wx', 'PIL', 'ruamel', 'numpy')
+
+
+def _imported_heavy_modules(module):
+    code = f'import sys, {module}; print(" ".join(name for name in {HEAVY_MODULES!r} if name in sys.modules))'
+    return subprocess.run([sys.executable, '-c', code], check=True, capture_output=True, text=True).stdout.split()
+
+
+class LazyImportTest(unittest.TestCase):
+
+    def test_scheduling_modules_are_light(self):
+        for module in ('time', 'cron', 'clock', 'trigger', 'scheduler', 'simulate', 'denormalize'):
+            with self.subTest(module=module):
+                self.assertEqual([], _imported_heavy_modules('desktop_buddy.' + module))
+
+    def test_tooling_modules_are_light(self):
+        for module in ('__main__', 'config', 'cache', 'snapshot'):
+            with self.subTest(module=module):
+                self.assertEqual([], _imported_heavy_modules('desktop_buddy.' + module))
+
+    def test_asset_preparation_defers_toolkits(self):
+        self.assertEqual(['numpy'], _imported_heavy_modules('desktop_buddy.asset'))
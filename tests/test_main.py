@@ -0,0 +1,32 @@
+import contextlib
+import io
+import pathlib
+import tempfile
+import unittest
+from unittest import mock
+from desktop_buddy import __main__, config, snapshot
+
+
+class MainTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.directory = pathlib.Path(self.temporary_directory.name)
+        self.config_file = self.directory / 'other.yaml'
+        self.config_file.write_text('trigger:\n  - every: 5s\n')
+
+    def tearDown(self) -> None:
+        self.temporary_directory.cleanup()
+
+    def test_compile_uses_config_and_snapshot_options(self):
+        snapshot_file = self.directory / 'other.snapshot'
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(0, __main__.main(['--config', str(self.config_file), '--snapshot', str(snapshot_file),
+                                               'compile']))
+        compiled = snapshot.load_snapshot(snapshot_file)
+        self.assertEqual([str(self.config_file)], list(compiled.sources))
+
+    def test_simulate_uses_config_option(self):
+        with mock.patch.object(config, 'load_config', wraps=config.load_config) as load_config:
+            __main__.main(['--config', str(self.config_file), 'simulate', '--duration', '10s', '--quiet'])
+        load_config.assert_called_once_with(str(self.config_file))
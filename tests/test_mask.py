@@ -0,0 +1,58 @@
+import unittest
+import numpy
+from desktop_buddy import mask
+
+
+class CreateMaskTest(unittest.TestCase):
+
+    def test_default_threshold_keeps_every_visible_pixel(self):
+        alpha = numpy.array([[0, 1, 255]], dtype=numpy.uint8)
+        self.assertEqual([[False, True, True]], mask.create_mask(alpha).tolist())
+
+    def test_threshold(self):
+        alpha = numpy.array([[0, 127, 128, 255]], dtype=numpy.uint8)
+        created = mask.create_mask(alpha, mask.MaskOptions(threshold=128))
+        self.assertEqual([[False, False, True, True]], created.tolist())
+
+    def test_erode_removes_specks(self):
+        region_mask = numpy.zeros((7, 7), dtype=bool)
+        region_mask[1:6, 1:6] = True
+        region_mask[0, 6] = True
+        eroded = mask.erode(region_mask)
+        expected = numpy.zeros((7, 7), dtype=bool)
+        expected[2:5, 2:5] = True
+        numpy.testing.assert_array_equal(expected, eroded)
+
+    def test_erode_keeps_border(self):
+        region_mask = numpy.ones((3, 3), dtype=bool)
+        numpy.testing.assert_array_equal(region_mask, mask.erode(region_mask))
+
+    def test_dilate(self):
+        region_mask = numpy.zeros((5, 5), dtype=bool)
+        region_mask[2, 2] = True
+        expected = numpy.zeros((5, 5), dtype=bool)
+        expected[1:4, 1:4] = True
+        numpy.testing.assert_array_equal(expected, mask.dilate(region_mask))
+
+    def test_opening_restores_shape_without_specks(self):
+        alpha = numpy.zeros((9, 9), dtype=numpy.uint8)
+        alpha[2:7, 2:7] = 255
+        alpha[0, 8] = 255
+        created = mask.create_mask(alpha, mask.MaskOptions(erode=1, dilate=1))
+        expected = numpy.zeros((9, 9), dtype=bool)
+        expected[2:7, 2:7] = True
+        numpy.testing.assert_array_equal(expected, created)
+
+
+class LoadMaskOptionsTest(unittest.TestCase):
+
+    def test_defaults(self):
+        self.assertEqual(mask.MaskOptions(1, 0, 0), mask.load_mask_options(None))
+
+    def test_config(self):
+        options = mask.load_mask_options({'threshold': 64, 'erode': 2})
+        self.assertEqual(mask.MaskOptions(64, 2, 0), options)
+
+    def test_invalid_threshold(self):
+        with self.assertRaises(ValueError):
+            mask.load_mask_options({'threshold': 256})
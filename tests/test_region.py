@@ -0,0 +1,109 @@
+import unittest
+import numpy
+from desktop_buddy import region
+
+
+def _covered_mask(rectangles, shape):
+    mask = numpy.zeros(shape, dtype=bool)
+    for x, y, width, height in rectangles.tolist():
+        mask[y:y + height, x:x + width] = True
+    return mask
+
+
+class MaskRectanglesTest(unittest.TestCase):
+
+    def test_empty_mask(self):
+        rectangles = region.mask_rectangles(numpy.zeros((3, 4), dtype=bool))
+        self.assertEqual((0, 4), rectangles.shape)
+
+    def test_runs_per_row(self):
+        mask = numpy.array([
+            [1, 1, 0, 1],
+            [0, 0, 0, 0],
+            [0, 1, 1, 1],
+        ], dtype=bool)
+        rectangles = region.mask_rectangles(mask)
+        self.assertEqual([[0, 0, 2, 1], [3, 0, 1, 1], [1, 2, 3, 1]], rectangles.tolist())
+
+    def test_rectangles_cover_mask(self):
+        mask = numpy.random.default_rng(7).random((40, 30)) > 0.5
+        rectangles = region.mask_rectangles(mask)
+        numpy.testing.assert_array_equal(mask, _covered_mask(rectangles, mask.shape))
+
+
+class BoundingBoxTest(unittest.TestCase):
+
+    def test_no_rectangles(self):
+        self.assertEqual((0, 0, 0, 0), region.bounding_box(numpy.empty((0, 4), dtype=numpy.int32)))
+
+    def test_bounding_box(self):
+        rectangles = numpy.array([[3, 1, 2, 1], [1, 4, 1, 2]])
+        self.assertEqual((1, 1, 4, 5), region.bounding_box(rectangles))
+
+
+class SimplifyTest(unittest.TestCase):
+
+    def test_merge_equal_spans(self):
+        mask = numpy.zeros((6, 6), dtype=bool)
+        mask[1:5, 2:5] = True
+        simplified = region.simplify(region.mask_rectangles(mask))
+        self.assertEqual([[2, 1, 3, 4]], simplified.tolist())
+
+    def test_default_options_are_lossless(self):
+        mask = numpy.random.default_rng(3).random((30, 30)) > 0.3
+        simplified = region.simplify(region.mask_rectangles(mask))
+        numpy.testing.assert_array_equal(mask, _covered_mask(simplified, mask.shape))
+
+    def test_different_spans_are_not_merged_without_tolerance(self):
+        rectangles = numpy.array([[0, 0, 4, 1], [1, 1, 4, 1]])
+        simplified = region.simplify(rectangles)
+        self.assertEqual(rectangles.tolist(), simplified.tolist())
+
+    def test_merge_within_tolerance(self):
+        rectangles = numpy.array([[0, 0, 4, 1], [1, 1, 4, 1]])
+        simplified = region.simplify(rectangles, region.RegionOptions(tolerance=1))
+        self.assertEqual([[0, 0, 5, 2]], simplified.tolist())
+
+    def test_merge_covers_original_area(self):
+        mask = numpy.zeros((20, 20), dtype=bool)
+        for row in range(20):
+            mask[row, row // 3:20 - row // 4] = True
+        simplified = region.simplify(region.mask_rectangles(mask), region.RegionOptions(tolerance=2))
+        covered = _covered_mask(simplified, mask.shape)
+        self.assertTrue(covered[mask].all())
+        self.assertLess(len(simplified), 20)
+
+    def test_merge_tolerance_does_not_accumulate(self):
+        # edges moving by one pixel per row must not collapse into a single rectangle
+        triangle = numpy.zeros((200, 400), dtype=bool)
+        for row in range(200):
+            triangle[row, 199 - row:201 + row] = True
+        disc_y, disc_x = numpy.mgrid[-100:101, -100:101]
+        disc = disc_x ** 2 + disc_y ** 2 <= 100 ** 2
+        for tolerance in (1, 3):
+            for mask in (triangle, disc):
+                with self.subTest(tolerance=tolerance, shape=mask.shape):
+                    options = region.RegionOptions(tolerance=tolerance)
+                    covered = _covered_mask(region.simplify(region.mask_rectangles(mask), options), mask.shape)
+                    self.assertTrue(covered[mask].all())
+                    extra = covered.sum(axis=1) - mask.sum(axis=1)
+                    self.assertLessEqual(extra.max(), 2 * tolerance)
+
+    def test_drop_slivers(self):
+        rectangles = numpy.array([[0, 0, 4, 1], [0, 1, 4, 1], [8, 1, 1, 1]])
+        simplified = region.simplify(rectangles, region.RegionOptions(min_area=2))
+        self.assertEqual([[0, 0, 4, 2]], simplified.tolist())
+
+    def test_no_rectangles(self):
+        simplified = region.simplify(numpy.empty((0, 4), dtype=numpy.int32))
+        self.assertEqual((0, 4), simplified.shape)
+
+
+class LoadRegionOptionsTest(unittest.TestCase):
+
+    def test_defaults(self):
+        self.assertEqual(region.RegionOptions(0, 0), region.load_region_options(None))
+
+    def test_negative_tolerance(self):
+        with self.assertRaises(ValueError):
+            region.load_region_options({'tolerance': -1})
@@ -0,0 +1,75 @@
+import pathlib
+import tempfile
+import unittest
+import numpy
+from PIL import Image
+from desktop_buddy import reload, snapshot
+
+
+class MatchTriggersTest(unittest.TestCase):
+
+    def test_pairs_equal_configs(self):
+        old = [{'every': '5s'}, {'cron': '* * * * *'}, {'every': '5s'}]
+        new = [{'every': '5s'}, {'every': '10s'}, {'cron': '* * * * *'}]
+        matches, removed = reload.match_triggers(old, new)
+        self.assertEqual([0, None, 1], matches)
+        self.assertEqual([2], removed)
+
+    def test_ignores_key_order(self):
+        matches, removed = reload.match_triggers([{'every': '5s', 'action': 'a'}], [{'action': 'a', 'every': '5s'}])
+        self.assertEqual([0], matches)
+        self.assertEqual([], removed)
+
+
+class DiffTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.directory = pathlib.Path(self.temporary_directory.name)
+        for name in ('a', 'b'):
+            pixels = numpy.full((4, 4, 4), 255, dtype=numpy.uint8)
+            Image.fromarray(pixels, 'RGBA').save(self.directory / f'{name}.png')
+        self.config_file = self.directory / 'config.yaml'
+        self.write_config(a={}, b={})
+
+    def tearDown(self) -> None:
+        self.temporary_directory.cleanup()
+
+    def write_config(self, trigger='every: 5s', **assets):
+        self.config_file.write_text(
+            f'cache:\n  directory: "{self.directory / "cache"}"\n'
+            'loading:\n  workers: 1\n'
+            f'trigger:\n  - {trigger}\n'
+            'assets:\n' + ''.join(
+                f'  {name}:\n    file: "{self.directory / name}.png"\n'
+                + ''.join(f'    {key}: {value}\n' for key, value in options.items())
+                for name, options in assets.items()))
+
+    def test_unchanged_config_keeps_everything(self):
+        old = snapshot.compile_config(self.config_file)
+        new = snapshot.recompile(self.config_file, old)
+        config_diff = reload.diff(old, new)
+        self.assertEqual(['a', 'b'], config_diff.kept_assets)
+        self.assertEqual([], config_diff.changed_assets + config_diff.added_assets + config_diff.removed_assets)
+        self.assertEqual([0], config_diff.trigger_matches)
+        self.assertFalse(config_diff.window_changed)
+        self.assertIs(old.prepared_assets['a'], new.prepared_assets['a'])
+
+    def test_prepares_only_changed_assets(self):
+        old = snapshot.compile_config(self.config_file)
+        self.write_config(trigger='every: 10s', b={'position': '{x: 3, y: 4}'})
+        config_diff = reload.diff(old, snapshot.recompile(self.config_file, old))
+        self.assertEqual([], config_diff.kept_assets)
+        self.assertEqual(['b'], config_diff.changed_assets)
+        self.assertEqual(['a'], config_diff.removed_assets)
+        self.assertEqual([None], config_diff.trigger_matches)
+        self.assertEqual([0], config_diff.removed_triggers)
+
+    def test_changed_image_is_prepared_again(self):
+        old = snapshot.compile_config(self.config_file)
+        pixels = numpy.zeros((4, 4, 4), dtype=numpy.uint8)
+        pixels[:2, :2] = 255
+        Image.fromarray(pixels, 'RGBA').save(self.directory / 'b.png')
+        config_diff = reload.diff(old, snapshot.recompile(self.config_file, old))
+        self.assertEqual(['a'], config_diff.kept_assets)
+        self.assertEqual(['b'], config_diff.changed_assets)
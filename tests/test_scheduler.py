@@ -0,0 +1,119 @@
+import unittest
+from desktop_buddy import scheduler, trigger
+
+
+def _with_misfire(time_trigger, misfire):
+    time_trigger.misfire = misfire
+    return time_trigger
+
+
+class SchedulerTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.scheduler = scheduler.Scheduler()
+
+    def test_empty_scheduler(self):
+        self.assertIsNone(self.scheduler.next_deadline())
+        self.assertIsNone(self.scheduler.millis_until_next(0))
+        self.assertEqual([], self.scheduler.pop_due(0))
+
+    def test_next_deadline_is_earliest_trigger(self):
+        self.scheduler.add_all([trigger.IntervalTrigger(300), trigger.IntervalTrigger(100)], now=1000)
+        self.assertEqual(1100, self.scheduler.next_deadline())
+        self.assertEqual(60, self.scheduler.millis_until_next(1040))
+
+    def test_pop_before_deadline(self):
+        self.scheduler.add(trigger.IntervalTrigger(100), now=1000)
+        self.assertEqual([], self.scheduler.pop_due(1099))
+
+    def test_pop_rearms_only_fired_trigger(self):
+        fast = self.scheduler.add(trigger.IntervalTrigger(100), now=1000)
+        slow = self.scheduler.add(trigger.IntervalTrigger(300), now=1000)
+        self.assertEqual([scheduler.Firing(fast, 1100)], self.scheduler.pop_due(1100))
+        self.assertEqual(1200, fast.deadline)
+        self.assertEqual(1300, slow.deadline)
+        self.assertEqual([scheduler.Firing(fast, 1200)], self.scheduler.pop_due(1200))
+
+    def test_pop_all_due_triggers(self):
+        fast = self.scheduler.add(trigger.IntervalTrigger(100), now=1000)
+        slow = self.scheduler.add(trigger.IntervalTrigger(150), now=1000)
+        firings = self.scheduler.pop_due(1150)
+        self.assertEqual([scheduler.Firing(fast, 1100), scheduler.Firing(slow, 1150)], firings)
+        self.assertEqual(1200, self.scheduler.next_deadline())
+
+    def test_misfire_once(self):
+        missed = self.scheduler.add(_with_misfire(trigger.IntervalTrigger(1000), trigger.MISFIRE_ONCE), now=0)
+        self.assertEqual([scheduler.Firing(missed, 1000)], self.scheduler.pop_due(10500))
+        self.assertEqual(11000, missed.deadline)
+
+    def test_misfire_all(self):
+        missed = self.scheduler.add(_with_misfire(trigger.IntervalTrigger(1000), trigger.MISFIRE_ALL), now=0)
+        firings = self.scheduler.pop_due(3500)
+        self.assertEqual([scheduler.Firing(missed, deadline) for deadline in (1000, 2000, 3000)], firings)
+        self.assertEqual(4000, missed.deadline)
+
+    def test_misfire_skip(self):
+        missed = self.scheduler.add(_with_misfire(trigger.IntervalTrigger(1000), trigger.MISFIRE_SKIP), now=0)
+        self.assertEqual([], self.scheduler.pop_due(3500))
+        self.assertEqual(4000, missed.deadline)
+
+    def test_animation_skips_missed_frames(self):
+        animation = self.scheduler.add(trigger.AnimationTrigger(100, 'idle'), now=0)
+        self.assertEqual([], self.scheduler.pop_due(5050))
+        self.assertEqual(5100, animation.deadline)
+        self.assertEqual('idle', animation.trigger.asset_id)
+
+    def test_skip_fires_within_grace_period(self):
+        late = self.scheduler.add(_with_misfire(trigger.IntervalTrigger(1000), trigger.MISFIRE_SKIP), now=0)
+        self.assertEqual([scheduler.Firing(late, 1000)], self.scheduler.pop_due(1000 + scheduler.DEFAULT_MISFIRE_GRACE))
+
+    def test_removed_trigger_does_not_fire(self):
+        removed = self.scheduler.add(trigger.IntervalTrigger(100), now=1000)
+        self.scheduler.add(trigger.IntervalTrigger(300), now=1000)
+        self.scheduler.remove(removed)
+        self.assertEqual(1300, self.scheduler.next_deadline())
+        self.assertEqual(1, len(self.scheduler))
+
+
+def _with_slack(time_trigger, slack):
+    time_trigger.slack = slack
+    return time_trigger
+
+
+class SlackTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.scheduler = scheduler.Scheduler()
+
+    def test_wakeup_is_delayed_by_slack(self):
+        self.scheduler.add(_with_slack(trigger.IntervalTrigger(1000), 200), now=0)
+        self.assertEqual(1000, self.scheduler.next_deadline())
+        self.assertEqual(1200, self.scheduler.next_wakeup())
+
+    def test_triggers_within_slack_share_wakeup(self):
+        early = self.scheduler.add(_with_slack(trigger.IntervalTrigger(1000), 500), now=0)
+        late = self.scheduler.add(trigger.IntervalTrigger(1300), now=0)
+        wakeup = self.scheduler.next_wakeup()
+        self.assertEqual(1300, wakeup)
+        firings = self.scheduler.pop_due(wakeup)
+        self.assertEqual([scheduler.Firing(early, 1000), scheduler.Firing(late, 1300)], firings)
+        self.assertEqual(1, self.scheduler.wakeups)
+        self.assertEqual(2, self.scheduler.firings)
+        self.assertEqual(1, self.scheduler.saved_wakeups)
+
+    def test_rearmed_trigger_updates_wakeup(self):
+        self.scheduler.add(_with_slack(trigger.IntervalTrigger(1000), 100), now=0)
+        self.scheduler.pop_due(1100)
+        self.assertEqual(2100, self.scheduler.next_wakeup())
+
+    def test_slack_is_not_a_misfire(self):
+        slow = _with_misfire(trigger.IntervalTrigger(1000), trigger.MISFIRE_SKIP)
+        scheduled = self.scheduler.add(_with_slack(slow, 5000), now=0)
+        self.assertEqual([scheduler.Firing(scheduled, 1000)], self.scheduler.pop_due(6000))
+
+    def test_delay_trigger_fires_once(self):
+        scheduled = self.scheduler.add(trigger.DelayTrigger(500), now=1000)
+        self.assertEqual([scheduler.Firing(scheduled, 1500)], self.scheduler.pop_due(1500))
+        self.assertTrue(scheduled.cancelled)
+        self.assertIsNone(self.scheduler.next_deadline())
+        self.assertEqual(0, len(self.scheduler))
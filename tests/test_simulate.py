@@ -0,0 +1,41 @@
+import unittest
+from desktop_buddy import action, simulate, time, trigger
+
+
+class SimulateTest(unittest.TestCase):
+    start = 1_780_272_000_000
+
+    def test_interval_firings(self):
+        triggers = [trigger.IntervalTrigger(3600000)]
+        result = simulate.simulate(triggers, self.start, self.start + time.MILLIS_PER_DAY)
+        self.assertEqual(24, len(result.firings))
+        self.assertEqual(self.start + 3600000, result.firings[0].time)
+        self.assertEqual(0, result.firings[0].trigger_index)
+
+    def test_firing_log_is_ordered(self):
+        triggers = [trigger.IntervalTrigger(7000), trigger.IntervalTrigger(3000)]
+        result = simulate.simulate(triggers, self.start, self.start + 60000)
+        times = [record.time for record in result.firings]
+        self.assertEqual(sorted(times), times)
+        self.assertEqual(8 + 20, len(result.firings))
+
+    def test_simultaneous_firings_share_wakeup(self):
+        triggers = [trigger.IntervalTrigger(1000), trigger.IntervalTrigger(2000)]
+        result = simulate.simulate(triggers, self.start, self.start + 10000)
+        self.assertEqual(15, len(result.firings))
+        self.assertEqual(10, result.wakeups)
+        self.assertEqual(5, result.saved_wakeups)
+
+    def test_actions_change_assets(self):
+        speak = trigger.IntervalTrigger(60000)
+        speak.actions = ('speak',)
+        actions = action.load_actions({'speak': {'assets': {'bubble': 'show'}, 'for': '10s'}})
+        result = simulate.simulate([speak], self.start, self.start + 125000, actions, {'bubble': False})
+        self.assertEqual([
+            simulate.ChangeRecord(self.start + 60000, 'bubble', True),
+            simulate.ChangeRecord(self.start + 70000, 'bubble', False),
+            simulate.ChangeRecord(self.start + 120000, 'bubble', True),
+        ], result.changes)
+        self.assertEqual(3, result.commits)
+        # the inversions are not firings of configured triggers
+        self.assertEqual(2, len(result.firings))
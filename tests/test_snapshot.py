@@ -0,0 +1,96 @@
+import collections
+import os
+import pathlib
+import tempfile
+import unittest
+import numpy
+from PIL import Image
+from desktop_buddy import snapshot, trigger
+
+
+class SnapshotTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.directory = pathlib.Path(self.temporary_directory.name)
+        self.config_file = self.directory / 'config.yaml'
+        self.config_file.write_text('trigger:\n  - every: 5s\n')
+        self.snapshot_file = self.directory / 'config.snapshot'
+
+    def tearDown(self) -> None:
+        self.temporary_directory.cleanup()
+
+    def _compiled(self):
+        sources = {str(self.config_file): snapshot.source_signature(self.config_file)}
+        triggers = trigger.load_trigger([{'every': '5s'}]).trigger_list
+        return snapshot.CompiledConfig({'trigger': [{'every': '5s'}]}, collections.OrderedDict(), triggers, sources)
+
+    def test_load_saved_snapshot(self):
+        snapshot.save_snapshot(self._compiled(), self.snapshot_file)
+        loaded = snapshot.load_snapshot(self.snapshot_file)
+        self.assertEqual({'trigger': [{'every': '5s'}]}, loaded.settings)
+        self.assertEqual(5000, loaded.triggers[0].interval)
+        self.assertEqual(['config.snapshot', 'config.yaml'], sorted(os.listdir(self.directory)))
+
+    def test_load_missing_snapshot(self):
+        self.assertIsNone(snapshot.load_snapshot(self.snapshot_file))
+
+    def test_load_foreign_file(self):
+        self.snapshot_file.write_bytes(b'not a snapshot')
+        self.assertIsNone(snapshot.load_snapshot(self.snapshot_file))
+
+    def test_changed_source_invalidates_snapshot(self):
+        snapshot.save_snapshot(self._compiled(), self.snapshot_file)
+        self.config_file.write_text('trigger:\n  - every: 10s\n')
+        self.assertIsNone(snapshot.load_snapshot(self.snapshot_file))
+
+    def test_touched_source_keeps_snapshot(self):
+        snapshot.save_snapshot(self._compiled(), self.snapshot_file)
+        stat = self.config_file.stat()
+        os.utime(self.config_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        self.assertIsNotNone(snapshot.load_snapshot(self.snapshot_file))
+
+    def test_default_snapshot_path_depends_on_config(self):
+        self.assertNotEqual(snapshot.default_snapshot_path('a.yaml'), snapshot.default_snapshot_path('b.yaml'))
+        self.assertEqual(snapshot.default_snapshot_path('a.yaml'), snapshot.default_snapshot_path('./a.yaml'))
+
+
+class ProgressiveCompilationTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        directory = pathlib.Path(self.temporary_directory.name)
+        for name in ('a', 'b', 'c'):
+            pixels = numpy.full((4, 4, 4), 255, dtype=numpy.uint8)
+            Image.fromarray(pixels, 'RGBA').save(directory / f'{name}.png')
+        self.config_file = directory / 'config.yaml'
+        self.config_file.write_text(
+            f'cache:\n  directory: "{directory / "cache"}"\n'
+            'loading:\n  workers: 1\n  primary: b\n'
+            'assets:\n' + ''.join(f'  {name}:\n    file: "{directory / name}.png"\n' for name in ('a', 'b', 'c')))
+        self.snapshot_file = directory / 'config.snapshot'
+
+    def tearDown(self) -> None:
+        self.temporary_directory.cleanup()
+
+    def test_prepares_primary_asset_first(self):
+        compiled, compilation = snapshot.load_or_start_compilation(self.config_file, self.snapshot_file)
+        self.assertEqual(['b'], list(compiled.prepared_assets))
+        self.assertEqual(['a', 'c'], [asset_id for asset_id, _ in snapshot.finish_compilation(compilation,
+                                                                                            self.snapshot_file)])
+        self.assertEqual(['a', 'b', 'c'], list(compilation.compiled.prepared_assets))
+        # the configuration returned to the caller is not changed by the background compilation
+        self.assertEqual(['b'], list(compiled.prepared_assets))
+        self.assertNotIn(str(self.config_file.parent / 'a.png'), compiled.sources)
+        self.assertIn(str(self.config_file.parent / 'a.png'), compilation.compiled.sources)
+
+        compiled, compilation = snapshot.load_or_start_compilation(self.config_file, self.snapshot_file)
+        self.assertIsNone(compilation)
+        self.assertEqual(['a', 'b', 'c'], list(compiled.prepared_assets))
+
+    def test_compile_everything_without_progressive_loading(self):
+        self.config_file.write_text(self.config_file.read_text().replace('  primary: b', '  progressive: false'))
+        compiled, compilation = snapshot.load_or_start_compilation(self.config_file, self.snapshot_file)
+        self.assertIsNone(compilation)
+        self.assertEqual(['a', 'b', 'c'], list(compiled.prepared_assets))
+        self.assertTrue(self.snapshot_file.exists())
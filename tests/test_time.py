@@ -1,4 +1,6 @@
+import datetime
 import unittest
+import zoneinfo
 from desktop_buddy import time
 
 
@@ -26,3 +28,92 @@ class TimeParseTest(unittest.TestCase):
     def test_parse_seconds_full_unit(self):
         parsed = time.parse_time_duration('23seconds')
         self.assertEqual(23000, parsed)
+
+    def test_parse_combined_units(self):
+        self.assertEqual(150000, time.parse_time_duration('2 minutes, 30 seconds'))
+
+    def test_parse_invalid_duration(self):
+        for invalid in ('', 'bad unit', '5s later', '-5s', 5, None):
+            with self.subTest(invalid=invalid), self.assertRaises(time.InvalidDurationException):
+                time.parse_time_duration(invalid)
+
+    def test_parse_unknown_unit(self):
+        with self.assertRaises(time.InvalidUnitException):
+            time.parse_time_duration('5 foo')
+
+
+class TimeInstantParseTest(unittest.TestCase):
+    def test_parse_hours_and_minutes(self):
+        self.assertEqual((13 * 60 + 2) * 60000, time.parse_time_instant('13:02'))
+
+    def test_parse_seconds(self):
+        self.assertEqual(((15 * 60 + 55) * 60 + 55) * 1000, time.parse_time_instant('15:55:55'))
+
+    def test_parse_milli_seconds(self):
+        self.assertEqual(1250, time.parse_time_instant('0:00:01.25'))
+
+    def test_parse_meridiem(self):
+        self.assertEqual(13 * 3600000, time.parse_time_instant('1 pm'))
+        self.assertEqual(30 * 60000, time.parse_time_instant('12:30am'))
+
+    def test_parse_named_instant(self):
+        self.assertEqual(12 * 3600000, time.parse_time_instant('noon'))
+
+    def test_parse_invalid_instant(self):
+        for invalid in ('24:00', '13', '12:60', 'later'):
+            with self.assertRaises(time.InvalidInstantException):
+                time.parse_time_instant(invalid)
+
+
+def _epoch_millis(year, month, day, hour, minute, timezone):
+    return time.to_milli_seconds(datetime.datetime(year, month, day, hour, minute, tzinfo=timezone))
+
+
+class LocalDayTest(unittest.TestCase):
+    berlin = zoneinfo.ZoneInfo('Europe/Berlin')
+
+    def test_regular_day(self):
+        day = time.local_day(_epoch_millis(2026, 6, 1, 12, 0, self.berlin), self.berlin)
+        self.assertEqual(_epoch_millis(2026, 6, 1, 0, 0, self.berlin), day.midnight)
+        self.assertEqual(time.MILLIS_PER_DAY, day.end - day.midnight)
+        self.assertEqual(0, day.weekday())
+
+    def test_skipped_time_resolves_to_transition(self):
+        day = time.local_day(_epoch_millis(2026, 3, 29, 12, 0, self.berlin), self.berlin)
+        self.assertEqual(23 * 3600000, day.end - day.midnight)
+        skipped = day.to_epoch_millis(time.parse_time_instant('02:30'))
+        self.assertEqual(_epoch_millis(2026, 3, 29, 3, 0, self.berlin), skipped)
+        after = day.to_epoch_millis(time.parse_time_instant('03:30'))
+        self.assertEqual(_epoch_millis(2026, 3, 29, 3, 30, self.berlin), after)
+
+    def test_repeated_time_resolves_to_first_occurrence(self):
+        day = time.local_day(_epoch_millis(2026, 10, 25, 12, 0, self.berlin), self.berlin)
+        self.assertEqual(25 * 3600000, day.end - day.midnight)
+        repeated = day.to_epoch_millis(time.parse_time_instant('02:30'))
+        self.assertEqual(_epoch_millis(2026, 10, 25, 0, 30, datetime.timezone.utc), repeated)
+        after = day.to_epoch_millis(time.parse_time_instant('12:00'))
+        self.assertEqual(_epoch_millis(2026, 10, 25, 12, 0, self.berlin), after)
+        self.assertEqual(time.parse_time_instant('12:00'), day.time_of_day(after))
+
+    def test_skipped_midnight(self):
+        # clocks in Santiago jump from 00:00 to 01:00 on 2025-09-07
+        santiago = zoneinfo.ZoneInfo('America/Santiago')
+        day = time.local_day(_epoch_millis(2025, 9, 7, 12, 0, santiago), santiago)
+        self.assertEqual(23 * 3600000, day.end - day.midnight)
+        skipped = day.to_epoch_millis(time.parse_time_instant('0:30'))
+        self.assertEqual(_epoch_millis(2025, 9, 7, 1, 0, santiago), skipped)
+        five = day.to_epoch_millis(time.parse_time_instant('5:00'))
+        self.assertEqual(_epoch_millis(2025, 9, 7, 8, 0, datetime.timezone.utc), five)
+        self.assertEqual(time.parse_time_instant('5:00'), day.time_of_day(five))
+
+    def test_next_time_of_day(self):
+        now = _epoch_millis(2026, 6, 1, 12, 0, self.berlin)
+        later_today = time.next_time_of_day(time.parse_time_instant('13:00'), now, self.berlin)
+        self.assertEqual(_epoch_millis(2026, 6, 1, 13, 0, self.berlin), later_today)
+        tomorrow = time.next_time_of_day(time.parse_time_instant('11:00'), now, self.berlin)
+        self.assertEqual(_epoch_millis(2026, 6, 2, 11, 0, self.berlin), tomorrow)
+        self.assertEqual(now, time.next_time_of_day(time.parse_time_instant('12:00'), now, self.berlin))
+
+    def test_invalid_timezone(self):
+        with self.assertRaises(time.InvalidTimezoneException):
+            time.get_timezone('Nowhere/Special')
@@ -1,6 +1,123 @@
+import datetime
 import unittest
 from desktop_buddy import trigger
 
 
 class TriggerTest(unittest.TestCase):
     pass
+
+
+class TriggerOptionsTest(unittest.TestCase):
+
+    def test_default_misfire_policy(self):
+        loaded = trigger.load_trigger([{'every': '5s'}])
+        self.assertEqual(trigger.MISFIRE_ONCE, loaded.trigger_list[0].misfire)
+
+    def test_misfire_policy(self):
+        loaded = trigger.load_trigger([{'every': '5s', 'misfire': 'all'}])
+        self.assertEqual(trigger.MISFIRE_ALL, loaded.trigger_list[0].misfire)
+
+    def test_slack(self):
+        loaded = trigger.load_trigger([{'every': '2min 30s', 'slack': '5s'}])
+        self.assertEqual(5000, loaded.trigger_list[0].slack)
+
+    def test_actions(self):
+        loaded = trigger.load_trigger([{'every': '5s'}, {'every': '5s', 'action': 'wave'},
+                                       {'every': '5s', 'actions': ['wave', 'speak']}])
+        self.assertEqual([(), ('wave',), ('wave', 'speak')], [t.actions for t in loaded.trigger_list])
+
+    def test_invalid_actions(self):
+        for config in ({'every': '5s', 'actions': 'wave'}, {'every': '5s', 'action': 'wave', 'actions': ['speak']}):
+            with self.subTest(config=config), self.assertRaises(trigger.denormalize.UnsupportedException):
+                trigger.load_trigger([config])
+
+    def test_invalid_interval_options(self):
+        for config in ({'every': '0'}, {'every': '0s 0ms'}, {'every': 5}, {'every': 'soon'},
+                       {'every': '5s', 'slack': 5}, {'every': '5s', 'slack': '5 foo'}, {'every': '5s', 'slack': '-1s'}):
+            with self.subTest(config=config), self.assertRaises(trigger.denormalize.UnsupportedException):
+                trigger.load_trigger([config])
+
+    def test_collect_invalid_entries(self):
+        configs = [{'every': '5 foo'}, {'on': 'bad'}, {'every': '5s'}, {'cron': 5}, {'on': ['1:00', 5]},
+                   {'every': 5}, {'cron': ['0 9 * * *', None]}, {'on': 7}]
+        with self.assertRaises(trigger.denormalize.DenormalizationErrors) as context:
+            trigger.load_trigger(configs)
+        self.assertEqual([0, 1, 3, 4, 5, 6, 7], [index for index, _ in context.exception.get_errors()])
+
+
+class TimeInstantTriggerTest(unittest.TestCase):
+    utc = datetime.timezone.utc
+
+    def test_activate_today(self):
+        now = datetime.datetime(2026, 6, 1, 12, 0, tzinfo=self.utc)
+        active = trigger.TimeInstantTrigger(13 * 3600000, self.utc).activate(now)
+        self.assertEqual(3600000, active.millis_until_activation(now))
+
+    def test_activate_tomorrow(self):
+        now = datetime.datetime(2026, 6, 1, 12, 0, tzinfo=self.utc)
+        active = trigger.TimeInstantTrigger(11 * 3600000, self.utc).activate(now)
+        self.assertEqual(23 * 3600000, active.millis_until_activation(now))
+
+    def test_load_with_timezone(self):
+        loaded = trigger.load_trigger([{'on': '18:00', 'timezone': 'Europe/Berlin'}])
+        instant_trigger = loaded.trigger_list[0]
+        self.assertEqual(18 * 3600000, instant_trigger.time_of_day)
+        self.assertEqual('Europe/Berlin', str(instant_trigger.timezone))
+
+
+class TimeInstantListTriggerTest(unittest.TestCase):
+    utc = datetime.timezone.utc
+    midnight = 1_780_272_000_000
+
+    def setUp(self) -> None:
+        hours = [18, 9, 13, 9]
+        self.list_trigger = trigger.TimeInstantListTrigger([hour * 3600000 for hour in hours], self.utc)
+
+    def test_times_are_sorted_once(self):
+        self.assertEqual((9 * 3600000, 13 * 3600000, 18 * 3600000), self.list_trigger.times_of_day)
+
+    def test_activate_next_time_of_today(self):
+        active = self.list_trigger.activate(self.midnight + 10 * 3600000)
+        self.assertEqual(self.midnight + 13 * 3600000, active.activation)
+
+    def test_activate_after_last_time_of_today(self):
+        active = self.list_trigger.activate(self.midnight + 19 * 3600000)
+        self.assertEqual(self.midnight + 33 * 3600000, active.activation)
+
+    def test_rearm_advances_cursor(self):
+        active = self.list_trigger.activate(self.midnight)
+        activations = []
+        for _ in range(4):
+            activations.append(active.activation)
+            active = active.activate(active.activation + 1)
+        hours = [(activation - self.midnight) // 3600000 for activation in activations]
+        self.assertEqual([9, 13, 18, 33], hours)
+
+    def test_activate_before_activation_keeps_cursor(self):
+        active = self.list_trigger.activate(self.midnight)
+        self.assertIs(active, active.activate(self.midnight + 1000))
+
+    def test_rearm_after_long_pause(self):
+        active = self.list_trigger.activate(self.midnight)
+        active = active.activate(self.midnight + 3 * 24 * 3600000 + 14 * 3600000)
+        self.assertEqual(self.midnight + 3 * 24 * 3600000 + 18 * 3600000, active.activation)
+
+    def test_load_list(self):
+        loaded = trigger.load_trigger([{'on': ['15:55:55', '13:02']}])
+        self.assertEqual((46_920_000, 57_355_000), loaded.trigger_list[0].times_of_day)
+
+    def test_load_single_item_list(self):
+        loaded = trigger.load_trigger([{'on': ['13:02']}])
+        self.assertEqual((46_920_000,), loaded.trigger_list[0].times_of_day)
+
+
+class CronTriggerTest(unittest.TestCase):
+
+    def test_load_cron_trigger(self):
+        loaded = trigger.load_trigger([{'cron': ['0 9 * * mon-fri', '*/15 13-16 * * mon-fri'], 'timezone': 'UTC'}])
+        cron_trigger = loaded.trigger_list[0]
+        self.assertIsInstance(cron_trigger, trigger.CronTrigger)
+        tuesday_noon = 1_792_497_600_000
+        active = cron_trigger.activate(tuesday_noon)
+        self.assertEqual(3600000, active.millis_until_activation(tuesday_noon))
+        self.assertEqual(tuesday_noon + 3600000 + 900000, active.activate(active.activation + 1).activation)
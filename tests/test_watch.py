@@ -0,0 +1,75 @@
+import os
+import pathlib
+import sys
+import tempfile
+import threading
+import unittest
+from desktop_buddy import watch
+
+
+class WatcherTestMixin:
+
+    def create_watcher(self, paths) -> watch.Watcher:
+        raise NotImplementedError()
+
+    def setUp(self) -> None:
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.directory = pathlib.Path(self.temporary_directory.name)
+        self.file = self.directory / 'config.yaml'
+        self.file.write_text('first')
+        self.other_file = self.directory / 'other.yaml'
+        self.other_file.write_text('other')
+        self.watcher = self.create_watcher([str(self.file)])
+
+    def tearDown(self) -> None:
+        self.watcher.close()
+        self.temporary_directory.cleanup()
+
+    def test_nothing_changed(self):
+        self.assertEqual(set(), self.watcher.poll())
+
+    def test_write(self):
+        self.file.write_text('second, longer')
+        self.assertEqual({str(self.file)}, self.watcher.poll())
+        self.assertEqual(set(), self.watcher.poll())
+
+    def test_replace(self):
+        replacement = self.directory / 'replacement'
+        replacement.write_text('second, longer')
+        os.replace(replacement, self.file)
+        self.assertEqual({str(self.file)}, self.watcher.poll())
+
+    def test_delete(self):
+        self.file.unlink()
+        self.assertEqual({str(self.file)}, self.watcher.poll())
+
+    def test_ignores_other_files(self):
+        self.other_file.write_text('other, longer')
+        self.assertEqual(set(), self.watcher.poll())
+
+    def test_set_paths(self):
+        self.watcher.set_paths([str(self.other_file)])
+        self.file.write_text('second, longer')
+        self.other_file.write_text('other, longer')
+        self.assertEqual({str(self.other_file)}, self.watcher.poll())
+
+
+class PollingWatcherTest(WatcherTestMixin, unittest.TestCase):
+
+    def create_watcher(self, paths) -> watch.Watcher:
+        return watch.PollingWatcher(paths)
+
+
+@unittest.skipUnless(sys.platform.startswith('linux'), 'inotify is only available on Linux')
+class InotifyWatcherTest(WatcherTestMixin, unittest.TestCase):
+
+    def create_watcher(self, paths) -> watch.Watcher:
+        return watch.InotifyWatcher(paths)
+
+    def test_wait(self):
+        threading.Timer(0.05, self.file.write_text, ['second, longer']).start()
+        self.assertEqual({str(self.file)}, self.watcher.wait())
+
+    def test_close_ends_wait(self):
+        threading.Timer(0.05, self.watcher.close).start()
+        self.assertEqual(set(), self.watcher.wait())